@@ -5,7 +5,7 @@ from typing import List, Tuple, Dict
 import cv2
 import numpy as np
 from matplotlib import pyplot as plt
-from rdp import rdp
+from my_rdp import rdp
 
 
 class Point:
@@ -0,0 +1,53 @@
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+
+from Utils import chaikin_smooth, load_strokes
+from chaikin import chaikin_smooth_adaptive, chaikin_smooth_one_pass
+
+REPEATS = 5
+THRESHOLD = 0.1
+
+# all the strokes one after another, i.e. one long stroke
+stroke = np.concatenate(list(load_strokes().values()))
+
+
+def measure(function, *args):
+    """Best time (s) of `REPEATS` calls, and the peak memory (bytes) allocated by one call."""
+    durations = []
+
+    for _ in range(REPEATS):
+        start = datetime.now()
+        result = function(*args)
+        durations.append((datetime.now() - start).total_seconds())
+
+    tracemalloc.start()
+    function(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return result, min(durations), peak
+
+
+chaikin_smooth_one_pass(stroke, 1, use_numba=True)  # compiling
+
+print(f'{len(stroke)} points')
+print(f'{"k":>2} {"points":>8} {"chaikin_smooth":>22} {"one pass":>22} {"one pass (Numba)":>22} {"adaptive":>30}')
+
+for k in range(1, 7):
+    reference, reference_duration, reference_peak = measure(chaikin_smooth, stroke, k)
+    one_pass, one_pass_duration, one_pass_peak = measure(chaikin_smooth_one_pass, stroke, k)
+    numba, numba_duration, numba_peak = measure(chaikin_smooth_one_pass, stroke, k, None, True)
+    adaptive, adaptive_duration, adaptive_peak = measure(chaikin_smooth_adaptive, stroke, k, THRESHOLD)
+
+    assert np.array_equal(one_pass, reference) and np.array_equal(numba, reference), k
+    assert np.array_equal(chaikin_smooth_adaptive(stroke, k, 0), reference), k
+
+    print(
+        f'{k:>2} {len(reference):>8} '
+        f'{reference_duration * 1e3:>8.2f} ms {reference_peak / 1024:>7.0f} KiB '
+        f'{one_pass_duration * 1e3:>8.2f} ms {one_pass_peak / 1024:>7.0f} KiB '
+        f'{numba_duration * 1e3:>8.2f} ms {numba_peak / 1024:>7.0f} KiB '
+        f'{adaptive_duration * 1e3:>8.2f} ms {adaptive_peak / 1024:>7.0f} KiB {len(adaptive):>6} pts'
+    )
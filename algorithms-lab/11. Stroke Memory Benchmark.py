@@ -0,0 +1,79 @@
+import json
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import List, Tuple, Dict
+
+import cv2
+import numpy as np
+
+from Utils import Stroke
+
+COPIES = 100  # the corpus is small, so every stroke is loaded this many times
+
+
+# the previous Stroke: a list of Points without __slots__
+class ListPoint:
+    x: int
+    y: int
+
+    def __init__(self, x: int, y: int):
+        self.x = x
+        self.y = y
+
+    def to_py(self) -> Tuple[int, int]:
+        return self.x, self.y
+
+
+class ListStroke:
+    def __init__(self, dict_points: List[Dict[str, int]]) -> None:
+        self.points = [ListPoint(round(point['x']), round(point['y'])) for point in dict_points]
+
+    def to_py(self) -> List[Tuple[int, int]]:
+        return [point.to_py() for point in self.points]
+
+    def to_matplotlib(self) -> Tuple[List[int], List[int]]:
+        return [point.x for point in self.points], [point.y for point in self.points]
+
+    def draw_cv(self, img: np.ndarray, color: Tuple[int, int, int] = (0, 0, 0)):
+        for point, next_point in zip(self.points[:-1], self.points[1:]):
+            cv2.line(img, point.to_py(), next_point.to_py(), color, 2, cv2.LINE_4)
+
+
+def timed(function) -> float:
+    start = datetime.now()
+    function()
+    return (datetime.now() - start).total_seconds()
+
+
+corpus = []
+for path in sorted(Path('strokes').glob('*.json')):
+    try:
+        with open(path) as stroke_f:
+            corpus.append(json.load(stroke_f))
+    except json.JSONDecodeError:
+        continue  # square.json is only a fragment
+
+corpus *= COPIES
+n_points = sum(len(points) for points in corpus)
+canvas = np.zeros((800, 1400), dtype=np.uint8)
+
+print(f'{len(corpus)} strokes, {n_points} points')
+
+for name, cls in (('List of Points', ListStroke), ('Array', Stroke)):
+    tracemalloc.start()
+    strokes = [cls(dict_points=points) for points in corpus]
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    build = timed(lambda: [cls(dict_points=points) for points in corpus])
+    to_py = timed(lambda: [stroke.to_py() for stroke in strokes])
+    to_matplotlib = timed(lambda: [stroke.to_matplotlib() for stroke in strokes])
+    draw_cv = timed(lambda: [stroke.draw_cv(canvas) for stroke in strokes])
+
+    print(f'{name}:')
+    print(f'  memory: {memory / n_points:.1f} B per point')
+    print(f'  building: {n_points / build / 1e6:.2f} M points/s')
+    print(f'  to_py: {n_points / to_py / 1e6:.2f} M points/s')
+    print(f'  to_matplotlib: {n_points / to_matplotlib / 1e6:.2f} M points/s')
+    print(f'  draw_cv: {n_points / draw_cv / 1e6:.2f} M points/s')
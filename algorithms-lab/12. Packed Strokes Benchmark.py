@@ -0,0 +1,61 @@
+import json
+import shutil
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from Utils import Stroke, load_strokes
+from packed_strokes import load_packed_strokes, pack_strokes
+
+COPIES = 150  # the corpus is small, so it's copied to get thousands of strokes
+
+# a big corpus: every stroke of strokes/ COPIES times
+directory = Path(tempfile.mkdtemp())
+for path in Path('strokes').glob('*.json'):
+    for i in range(COPIES):
+        shutil.copy(path, directory / f'{path.stem}_{i}.json')
+
+packed_path = directory / 'strokes.bin'
+
+start = datetime.now()
+pack_strokes(directory, packed_path)
+pack_duration = (datetime.now() - start).total_seconds()
+
+# what the scripts do now: json.load every file, then a Stroke
+start = datetime.now()
+strokes = []
+for path in sorted(directory.glob('*.json')):
+    try:
+        with open(path) as stroke_f:
+            strokes.append(Stroke(dict_points=json.load(stroke_f)))
+    except json.JSONDecodeError:
+        continue
+json_stroke_duration = (datetime.now() - start).total_seconds()
+
+start = datetime.now()
+json_strokes = load_strokes(str(directory))
+json_duration = (datetime.now() - start).total_seconds()
+
+start = datetime.now()
+packed_strokes = load_packed_strokes(packed_path)
+packed_duration = (datetime.now() - start).total_seconds()
+
+# the mapping is only read when the points are used
+start = datetime.now()
+sum(float(points.sum()) for points in packed_strokes.values())
+packed_read_duration = (datetime.now() - start).total_seconds()
+
+assert list(json_strokes) == list(packed_strokes)
+assert all(np.allclose(json_strokes[name], packed_strokes[name], atol=1e-4, rtol=0) for name in json_strokes)
+
+n_points = sum(len(points) for points in packed_strokes.values())
+print(f'{len(packed_strokes)} strokes, {n_points} points, {packed_path.stat().st_size / 1024:.0f} KiB packed')
+print(f'Packing took: {pack_duration:.4f} s')
+print(f'JSON -> Stroke took: {json_stroke_duration:.4f} s')
+print(f'JSON -> arrays (load_strokes) took: {json_duration:.4f} s')
+print(f'Packed took: {packed_duration:.4f} s ({json_duration / packed_duration:.0f}x), '
+      f'{packed_duration + packed_read_duration:.4f} s with reading every point')
+
+shutil.rmtree(directory)
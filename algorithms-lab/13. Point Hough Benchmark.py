@@ -0,0 +1,87 @@
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+from Utils import Stroke, load_strokes
+from my_hough import hough_vec, hough_points_np, hough_points_numba
+
+CANVAS_WIDTH = 1400
+CANVAS_HEIGHT = 800
+REPEATS = 5
+
+thetas = np.linspace(
+    start=-np.pi / 2,
+    stop=np.pi / 2,
+    num=720,
+    endpoint=False
+)
+
+
+def raster_hough(points: np.ndarray):
+    """What `my_hough.py` does: draw the stroke, threshold the canvas, and vote with every pixel."""
+    canvas = np.ones(shape=(CANVAS_HEIGHT, CANVAS_WIDTH, 3), dtype=np.uint8) * 255
+    Stroke(tuple_points=points).draw_cv(canvas)
+
+    edges = np.asarray(cv2.bitwise_not(
+        cv2.threshold(
+            cv2.cvtColor(
+                canvas,
+                cv2.COLOR_BGR2GRAY
+            ),
+            10,
+            255,
+            type=cv2.THRESH_BINARY
+        )[1]
+    ) / 255, dtype=np.uint8)
+
+    return edges.sum(), hough_vec(edges, thetas=thetas)
+
+
+def best_time(function, *args) -> float:
+    durations = []
+
+    for _ in range(REPEATS):
+        start = datetime.now()
+        function(*args)
+        durations.append((datetime.now() - start).total_seconds())
+
+    return min(durations)
+
+
+strokes = load_strokes()
+hough_points_numba((CANVAS_HEIGHT, CANVAS_WIDTH), strokes['line_1'], thetas)  # compiling
+
+print(f'{"stroke":>10} {"pixels":>7} {"raster":>9} {"NumPy":>9} {"Numba":>9}')
+
+raster_total = np_total = numba_total = 0
+
+for name, points in strokes.items():
+    # the raster is of the rounded points, like Stroke draws them
+    rounded = np.rint(points)
+
+    n_pixels, (_, rhos, raster_accumulator) = raster_hough(rounded)
+    _, _, points_accumulator = hough_points_np((CANVAS_HEIGHT, CANVAS_WIDTH), rounded, thetas)
+    _, _, numba_accumulator = hough_points_numba((CANVAS_HEIGHT, CANVAS_WIDTH), rounded, thetas)
+
+    # the same votes, so the same peaks
+    assert np.array_equal(points_accumulator, raster_accumulator), name
+    assert np.array_equal(numba_accumulator, raster_accumulator), name
+    assert np.argmax(points_accumulator) == np.argmax(raster_accumulator), name
+
+    raster_duration = best_time(raster_hough, rounded)
+    np_duration = best_time(hough_points_np, (CANVAS_HEIGHT, CANVAS_WIDTH), rounded, thetas)
+    numba_duration = best_time(hough_points_numba, (CANVAS_HEIGHT, CANVAS_WIDTH), rounded, thetas)
+
+    raster_total += raster_duration
+    np_total += np_duration
+    numba_total += numba_duration
+
+    print(
+        f'{name:>10} {n_pixels:>7} '
+        f'{raster_duration * 1e3:>6.1f} ms {np_duration * 1e3:>6.1f} ms {numba_duration * 1e3:>6.1f} ms'
+    )
+
+print(f'Raster took: {raster_total:.3f} s')
+print(f'Points (NumPy) took: {np_total:.3f} s ({raster_total / np_total:.1f}x)')
+print(f'Points (Numba) took: {numba_total:.3f} s ({raster_total / numba_total:.1f}x)')
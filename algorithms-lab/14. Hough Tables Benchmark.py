@@ -0,0 +1,83 @@
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+from Utils import Stroke, load_strokes
+from my_hough import HoughTables, hough_tables, thetas_tables, hough_vec, hough_numba, hough_points_np, hough_points_numba
+
+CANVAS_WIDTH = 1400
+CANVAS_HEIGHT = 800
+NUM_THETAS = 720
+COPIES = 5  # every stroke of the corpus is processed this many times, like a stream of strokes on one canvas
+
+thetas = np.linspace(
+    start=-np.pi / 2,
+    stop=np.pi / 2,
+    num=NUM_THETAS,
+    endpoint=False
+)
+
+
+def edges_of(points: np.ndarray) -> np.ndarray:
+    canvas = np.ones(shape=(CANVAS_HEIGHT, CANVAS_WIDTH, 3), dtype=np.uint8) * 255
+    Stroke(tuple_points=points).draw_cv(canvas)
+
+    return np.asarray(cv2.bitwise_not(
+        cv2.threshold(
+            cv2.cvtColor(
+                canvas,
+                cv2.COLOR_BGR2GRAY
+            ),
+            10,
+            255,
+            type=cv2.THRESH_BINARY
+        )[1]
+    ) / 255, dtype=np.uint8)
+
+
+strokes = list(load_strokes().values()) * COPIES
+images = [edges_of(points) for points in strokes]
+
+shape = (CANVAS_HEIGHT, CANVAS_WIDTH)
+backends = [
+    ('hough_vec', hough_vec, images, lambda img: (img,)),
+    ('hough_numba', hough_numba, images, lambda img: (img,)),
+    ('hough_points_np', hough_points_np, strokes, lambda points: (shape, points)),
+    ('hough_points_numba', hough_points_numba, strokes, lambda points: (shape, points)),
+]
+
+# compiling
+hough_numba(images[0], thetas=thetas)
+hough_points_numba(shape, strokes[0], thetas=thetas)
+
+start = datetime.now()
+hough_tables(shape, NUM_THETAS).x_cos, hough_tables(shape, NUM_THETAS).y_sin
+print(f'Building the tables took: {(datetime.now() - start).total_seconds() * 1e3:.2f} ms')
+print(f'{len(strokes)} strokes')
+
+for name, backend, inputs, args in backends:
+    # the tables are built on every call
+    start = datetime.now()
+    uncached = [backend(*args(item), tables=HoughTables(shape, thetas))[2] for item in inputs]
+    uncached_duration = (datetime.now() - start).total_seconds()
+
+    # thetas: the tables are looked up by their value
+    start = datetime.now()
+    by_thetas = [backend(*args(item), thetas=thetas)[2] for item in inputs]
+    by_thetas_duration = (datetime.now() - start).total_seconds()
+
+    start = datetime.now()
+    cached = [backend(*args(item), tables=hough_tables(shape, NUM_THETAS))[2] for item in inputs]
+    cached_duration = (datetime.now() - start).total_seconds()
+
+    assert all(np.array_equal(a, b) and np.array_equal(a, c) for a, b, c in zip(uncached, by_thetas, cached)), name
+
+    print(
+        f'{name}: {uncached_duration / len(inputs) * 1e3:.2f} ms -> '
+        f'{by_thetas_duration / len(inputs) * 1e3:.2f} ms (thetas=) / {cached_duration / len(inputs) * 1e3:.2f} ms '
+        f'(tables=) per call ({(uncached_duration - cached_duration) / len(inputs) * 1e3:.2f} ms saved)'
+    )
+
+print(hough_tables.cache_info())
+print(thetas_tables.cache_info())
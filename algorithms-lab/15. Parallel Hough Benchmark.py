@@ -0,0 +1,55 @@
+from datetime import datetime
+
+import cv2
+import numba
+import numpy as np
+
+from Utils import Stroke, load_strokes
+from my_hough import hough_tables, hough_numba, hough_numba_parallel
+
+CANVAS_WIDTH = 1400
+CANVAS_HEIGHT = 800
+NUM_THETAS = 720
+
+
+def edges_of(points: np.ndarray) -> np.ndarray:
+    canvas = np.ones(shape=(CANVAS_HEIGHT, CANVAS_WIDTH, 3), dtype=np.uint8) * 255
+    Stroke(tuple_points=points).draw_cv(canvas)
+
+    return np.asarray(cv2.bitwise_not(
+        cv2.threshold(
+            cv2.cvtColor(
+                canvas,
+                cv2.COLOR_BGR2GRAY
+            ),
+            10,
+            255,
+            type=cv2.THRESH_BINARY
+        )[1]
+    ) / 255, dtype=np.uint8)
+
+
+images = [edges_of(points) for points in load_strokes().values()]
+tables = hough_tables((CANVAS_HEIGHT, CANVAS_WIDTH), NUM_THETAS)
+
+# compiling
+hough_numba(images[0], tables=tables)
+hough_numba_parallel(images[0], tables=tables)
+
+start = datetime.now()
+serial_results = [hough_numba(img, tables=tables)[2] for img in images]
+serial_duration = (datetime.now() - start).total_seconds()
+
+print(f'{len(images)} canvases, {numba.config.NUMBA_NUM_THREADS} threads available')
+print(f'Serial: {serial_duration:.3f} s')
+
+for n_threads in range(1, numba.config.NUMBA_NUM_THREADS + 1):
+    numba.set_num_threads(n_threads)
+
+    start = datetime.now()
+    parallel_results = [hough_numba_parallel(img, tables=tables)[2] for img in images]
+    parallel_duration = (datetime.now() - start).total_seconds()
+
+    assert all(np.array_equal(a, b) for a, b in zip(serial_results, parallel_results)), f'{n_threads} threads differ'
+
+    print(f'Parallel, {n_threads} thread(s): {parallel_duration:.3f} s ({serial_duration / parallel_duration:.2f}x)')
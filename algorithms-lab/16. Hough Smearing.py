@@ -0,0 +1,118 @@
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+from Utils import Stroke, load_strokes
+from my_hough import hough_tables, hough_py, hough_np, hough_numba, hough_numba_parallel, hough_vec, smear_accumulator
+
+CANVAS_WIDTH = 1400
+CANVAS_HEIGHT = 800
+NUM_THETAS = 720
+
+
+def edges_of(points: np.ndarray, shape=(CANVAS_HEIGHT, CANVAS_WIDTH)) -> np.ndarray:
+    canvas = np.ones(shape=shape + (3,), dtype=np.uint8) * 255
+    Stroke(tuple_points=points).draw_cv(canvas)
+
+    return np.asarray(cv2.bitwise_not(
+        cv2.threshold(
+            cv2.cvtColor(
+                canvas,
+                cv2.COLOR_BGR2GRAY
+            ),
+            10,
+            255,
+            type=cv2.THRESH_BINARY
+        )[1]
+    ) / 255, dtype=np.uint8)
+
+
+def brute_smear(accumulator: np.ndarray, k_size: int, decrease_f: int, weight, wrap: bool) -> np.ndarray:
+    """The definition: every cell adds `decrease_f * weight(dr, di) * votes` to its neighbours."""
+    rows, cols = accumulator.shape
+    result = accumulator.astype(np.float64)
+
+    for r, i in zip(*np.nonzero(accumulator)):
+        for dr in range(-k_size, k_size + 1):
+            for di in range(-k_size, k_size + 1):
+                new_r, new_i = r + dr, i + di
+
+                if wrap and not 0 <= new_i < cols:
+                    new_r, new_i = rows - new_r, new_i % cols  # theta +- pi is the line at -rho
+
+                if 0 <= new_r < rows and 0 <= new_i < cols:
+                    result[new_r, new_i] += decrease_f * weight(dr, di) * accumulator[r, i]
+
+    return result
+
+
+strokes = load_strokes()
+tables = hough_tables((CANVAS_HEIGHT, CANVAS_WIDTH), NUM_THETAS)
+images = [edges_of(points) for points in strokes.values()]
+
+# the box pass is the same as smearing every vote: pure Python and NumPy on a small canvas, the others on all of them
+small = edges_of(strokes['corner'] / 4, (200, 350))
+small_thetas = np.linspace(-np.pi / 2, np.pi / 2, 90, endpoint=False)
+
+for k_size, decrease_f in ((1, 1), (2, 1), (2, 3)):
+    votes = hough_np(small, small_thetas, True, k_size, decrease_f)[2]
+    assert np.array_equal(hough_np(small, small_thetas, True, k_size, decrease_f, quantize_mode='box')[2], votes)
+    assert np.array_equal(np.array(hough_py(small.tolist(), list(small_thetas), True, k_size, decrease_f)[2]), votes)
+    assert np.array_equal(
+        np.array(hough_py(small.tolist(), list(small_thetas), True, k_size, decrease_f, quantize_mode='box')[2]),
+        votes
+    )
+
+    for img in images:
+        votes = hough_numba(img, None, True, k_size, decrease_f, tables)[2]
+
+        for backend in (hough_vec, hough_numba_parallel):
+            assert np.array_equal(backend(img, None, True, k_size, decrease_f, tables=tables)[2], votes)
+        assert np.array_equal(hough_numba(img, None, True, k_size, decrease_f, tables, quantize_mode='box')[2], votes)
+
+print('Box pass == smearing every vote')
+
+# triangle and wrapping the thetas against their definition
+plain = hough_np(small, small_thetas)[2]
+
+for k_size in (1, 2, 3):
+    def triangle(dr, di):
+        return (k_size + 1 - abs(dr)) * (k_size + 1 - abs(di)) / (k_size + 1) ** 2
+
+    for wrap in (False, True):
+        assert np.allclose(
+            smear_accumulator(plain, k_size, 2, 'triangle', wrap),
+            brute_smear(plain, k_size, 2, triangle, wrap)
+        ), (k_size, wrap)
+        assert np.array_equal(
+            smear_accumulator(plain, k_size, 2, 'box', wrap),
+            brute_smear(plain, k_size, 2, lambda dr, di: 1, wrap)
+        ), (k_size, wrap)
+
+print('Triangle and wrapped passes == their definition')
+
+# timing
+hough_numba(images[0], None, True, 1, 1, tables)  # compiling
+
+for k_size in (1, 2, 3):
+    start = datetime.now()
+    for img in images:
+        hough_numba(img, None, True, k_size, 1, tables)
+    votes_duration = (datetime.now() - start).total_seconds()
+
+    start = datetime.now()
+    for img in images:
+        hough_numba(img, None, True, k_size, 1, tables, quantize_mode='box')
+    box_duration = (datetime.now() - start).total_seconds()
+
+    start = datetime.now()
+    for img in images:
+        hough_numba(img, None, True, k_size, 1, tables, quantize_mode='triangle', wrap_thetas=True)
+    triangle_duration = (datetime.now() - start).total_seconds()
+
+    print(
+        f'k_size={k_size}: smearing every vote {votes_duration:.3f} s, '
+        f'box pass {box_duration:.3f} s ({votes_duration / box_duration:.1f}x), '
+        f'wrapped triangle pass {triangle_duration:.3f} s ({votes_duration / triangle_duration:.1f}x)'
+    )
@@ -0,0 +1,89 @@
+import tracemalloc
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+from Utils import Stroke, load_strokes
+from my_hough import HoughTables, hough_vec, hough_peaks, hough_peaks_banded
+
+CANVAS_WIDTH = 1400
+CANVAS_HEIGHT = 800
+STROKES = ('6', 'circle_3', 'corner', 'line_2')
+
+
+def edges_of(points: np.ndarray) -> np.ndarray:
+    canvas = np.ones(shape=(CANVAS_HEIGHT, CANVAS_WIDTH, 3), dtype=np.uint8) * 255
+    Stroke(tuple_points=points).draw_cv(canvas)
+
+    return np.asarray(cv2.bitwise_not(
+        cv2.threshold(
+            cv2.cvtColor(
+                canvas,
+                cv2.COLOR_BGR2GRAY
+            ),
+            10,
+            255,
+            type=cv2.THRESH_BINARY
+        )[1]
+    ) / 255, dtype=np.uint8)
+
+
+def full(img: np.ndarray, tables: HoughTables):
+    thetas, rhos, accumulator = hough_vec(img, quantize=True, k_size=2, tables=tables)
+    return hough_peaks(thetas, rhos, accumulator), accumulator
+
+
+def banded(img: np.ndarray, tables: HoughTables):
+    return hough_peaks_banded(img, quantize=True, k_size=2, tables=tables)
+
+
+def measure(function, *args):
+    """The result, the time (s) and the peak memory (bytes) of a call."""
+    tracemalloc.start()
+    start = datetime.now()
+    result = function(*args)
+    duration = (datetime.now() - start).total_seconds()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return result, duration, peak
+
+
+strokes = load_strokes()
+images = [edges_of(strokes[name]) for name in STROKES]
+
+print(f'{"thetas":>6} {"full":>20} {"banded":>20} {"same peak votes":>16}')
+
+for num_thetas in (360, 720, 1440, 2880):
+    thetas = np.linspace(
+        start=-np.pi / 2,
+        stop=np.pi / 2,
+        num=num_thetas,
+        endpoint=False
+    )
+
+    full_duration = banded_duration = full_peak = banded_peak = 0
+    same = 0
+
+    for img in images:
+        # the tables (and so their x * cos / y * sin) are built in the calls
+        ((full_thetas, full_rhos), accumulator), duration, peak = measure(full, img, HoughTables(img.shape, thetas))
+        full_duration, full_peak = full_duration + duration, max(full_peak, peak)
+
+        (banded_thetas, banded_rhos), duration, peak = measure(banded, img, HoughTables(img.shape, thetas))
+        banded_duration, banded_peak = banded_duration + duration, max(banded_peak, peak)
+
+        # the peaks can be other cells of a plateau, so they're compared by their votes
+        def votes(peak_thetas, peak_rhos):
+            return sorted(
+                accumulator[rho + len(accumulator) // 2, np.searchsorted(thetas, theta)]
+                for theta, rho in zip(peak_thetas, peak_rhos)
+            )
+
+        same += votes(full_thetas, full_rhos) == votes(banded_thetas, banded_rhos)
+
+    print(
+        f'{num_thetas:>6} {full_duration:>7.3f} s {full_peak / 2 ** 20:>7.1f} MiB '
+        f'{banded_duration:>7.3f} s {banded_peak / 2 ** 20:>7.1f} MiB {same:>10}/{len(images)}'
+    )
@@ -0,0 +1,75 @@
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+from Utils import Stroke, load_strokes
+from my_hough import hough_tables, hough_vec, hough_peaks, prominent_peaks, fast_peaks
+
+CANVAS_WIDTH = 1400
+CANVAS_HEIGHT = 800
+REPEATS = 3
+
+
+def edges_of(points: np.ndarray) -> np.ndarray:
+    canvas = np.ones(shape=(CANVAS_HEIGHT, CANVAS_WIDTH, 3), dtype=np.uint8) * 255
+    Stroke(tuple_points=points).draw_cv(canvas)
+
+    return np.asarray(cv2.bitwise_not(
+        cv2.threshold(
+            cv2.cvtColor(
+                canvas,
+                cv2.COLOR_BGR2GRAY
+            ),
+            10,
+            255,
+            type=cv2.THRESH_BINARY
+        )[1]
+    ) / 255, dtype=np.uint8)
+
+
+def best_time(function, *args, **kwargs) -> float:
+    durations = []
+
+    for _ in range(REPEATS):
+        start = datetime.now()
+        function(*args, **kwargs)
+        durations.append((datetime.now() - start).total_seconds())
+
+    return min(durations)
+
+
+images = [edges_of(points) for points in load_strokes().values()]
+
+print(f'{"thetas":>6} {"labels":>10} {"fast":>16} {"fast_numba":>16} {"same peak votes":>16}')
+
+for num_thetas in (360, 720, 1440, 2880):
+    tables = hough_tables((CANVAS_HEIGHT, CANVAS_WIDTH), num_thetas)
+    accumulators = [hough_vec(img, quantize=True, k_size=2, tables=tables)[2] for img in images]
+
+    hough_peaks(tables.thetas, tables.rhos, accumulators[0], method='fast_numba')  # compiling
+
+    labels_duration = fast_duration = numba_duration = 0
+    same = 0
+
+    for accumulator in accumulators:
+        fast = hough_peaks(tables.thetas, tables.rhos, accumulator, method='fast')
+        fast_numba = hough_peaks(tables.thetas, tables.rhos, accumulator, method='fast_numba')
+
+        assert all(np.array_equal(a, b) for a, b in zip(fast, fast_numba))
+
+        # on a plateau, labeling takes its centroid and the fast peaks its first cell, so they're compared by votes
+        labels_votes = prominent_peaks(accumulator.copy(), min_x_dist=10, min_y_dist=9, num_peaks=5)[0]
+        fast_votes = fast_peaks(accumulator, min_x_dist=10, min_y_dist=9, num_peaks=5)[0]
+        same += np.array_equal(np.sort(labels_votes), np.sort(fast_votes))
+
+        labels_duration += best_time(hough_peaks, tables.thetas, tables.rhos, accumulator)
+        fast_duration += best_time(hough_peaks, tables.thetas, tables.rhos, accumulator, method='fast')
+        numba_duration += best_time(hough_peaks, tables.thetas, tables.rhos, accumulator, method='fast_numba')
+
+    print(
+        f'{num_thetas:>6} {labels_duration:>8.3f} s '
+        f'{fast_duration:>7.3f} s {labels_duration / fast_duration:>5.1f}x '
+        f'{numba_duration:>7.3f} s {labels_duration / numba_duration:>5.1f}x '
+        f'{same:>10}/{len(accumulators)}'
+    )
@@ -0,0 +1,110 @@
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+from Utils import Stroke, load_strokes
+from my_hough import hough_tables, hough_numba, hough_peaks, hough_probabilistic
+
+CANVAS_WIDTH = 1400
+CANVAS_HEIGHT = 800
+NUM_THETAS = 360
+STROKES = ('line_1', 'line_2', 'corner', 'square')
+REPEATS = 5
+
+THRESHOLD = 50
+MIN_LINE_LENGTH = 50
+MAX_LINE_GAP = 10
+
+
+def edges_of(points: np.ndarray) -> np.ndarray:
+    canvas = np.ones(shape=(CANVAS_HEIGHT, CANVAS_WIDTH, 3), dtype=np.uint8) * 255
+    Stroke(tuple_points=points).draw_cv(canvas)
+
+    return np.asarray(cv2.bitwise_not(
+        cv2.threshold(
+            cv2.cvtColor(
+                canvas,
+                cv2.COLOR_BGR2GRAY
+            ),
+            10,
+            255,
+            type=cv2.THRESH_BINARY
+        )[1]
+    ) / 255, dtype=np.uint8)
+
+
+def best_time(function, *args, **kwargs) -> float:
+    durations = []
+
+    for _ in range(REPEATS):
+        start = datetime.now()
+        function(*args, **kwargs)
+        durations.append((datetime.now() - start).total_seconds())
+
+    return min(durations)
+
+
+def full_hough(img: np.ndarray):
+    """What `my_hough.py` does: the whole accumulator, then its peaks (lines without endpoints)."""
+    thetas, rhos, accumulator = hough_numba(img, quantize=True, k_size=2, tables=tables)
+    return hough_peaks(thetas, rhos, accumulator)
+
+
+def longest(lines: np.ndarray) -> float:
+    lines = np.asarray(lines, dtype=np.float64).reshape(-1, 4)
+    return np.hypot(lines[:, 2] - lines[:, 0], lines[:, 3] - lines[:, 1]).max(initial=0)
+
+
+strokes = load_strokes()
+tables = hough_tables((CANVAS_HEIGHT, CANVAS_WIDTH), NUM_THETAS)
+
+# compiling
+hough_numba(edges_of(strokes['line_1']), tables=tables)
+hough_probabilistic(edges_of(strokes['line_1']), tables=tables)
+
+print(f'{"stroke":>8} {"full + peaks":>13} {"first segment":>14} {"all segments":>13} {"HoughLinesP":>12} '
+      f'{"segments":>9} {"longest":>8} {"cv2 segments":>13} {"cv2 longest":>12}')
+
+for name in STROKES:
+    if name not in strokes:
+        print(f'{name:>8} skipped, the JSON file is broken')
+        continue
+
+    img = edges_of(strokes[name])
+    kwargs = dict(threshold=THRESHOLD, min_line_length=MIN_LINE_LENGTH, max_line_gap=MAX_LINE_GAP, tables=tables)
+
+    # the same seed, so the same segments every time
+    first = hough_probabilistic(img, max_lines=1, **kwargs)
+    segments = hough_probabilistic(img, **kwargs)
+    assert np.array_equal(segments, hough_probabilistic(img, **kwargs))
+    assert np.array_equal(first, segments[:1])
+
+    cv2_segments = cv2.HoughLinesP(
+        img,
+        1,
+        np.pi / NUM_THETAS,
+        threshold=THRESHOLD,
+        minLineLength=MIN_LINE_LENGTH,
+        maxLineGap=MAX_LINE_GAP
+    )
+    cv2_segments = np.zeros((0, 4)) if cv2_segments is None else cv2_segments
+
+    full_duration = best_time(full_hough, img)
+    first_duration = best_time(hough_probabilistic, img, max_lines=1, **kwargs)
+    all_duration = best_time(hough_probabilistic, img, **kwargs)
+    cv2_duration = best_time(
+        cv2.HoughLinesP,
+        img,
+        1,
+        np.pi / NUM_THETAS,
+        threshold=THRESHOLD,
+        minLineLength=MIN_LINE_LENGTH,
+        maxLineGap=MAX_LINE_GAP
+    )
+
+    print(
+        f'{name:>8} {full_duration * 1e3:>10.2f} ms {first_duration * 1e3:>11.2f} ms {all_duration * 1e3:>10.2f} ms '
+        f'{cv2_duration * 1e3:>9.2f} ms {len(segments):>9} {longest(segments):>8.1f} '
+        f'{len(cv2_segments):>13} {longest(cv2_segments):>12.1f}'
+    )
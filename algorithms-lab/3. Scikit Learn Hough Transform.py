@@ -14,12 +14,10 @@ canvas = np.zeros((800, 1400))
 with open(f'strokes/line_1.json') as stroke_f:
     stroke = Stroke(dict_points=json.load(stroke_f))
 
-for i, point in enumerate(stroke.points):
-    if i == len(stroke) - 1:
-        continue
-
-    next_point = stroke.points[i + 1]
-    canvas[draw_line(point.y, point.x, next_point.y, next_point.x)] = 255
+# `stroke.points` builds a new list on every access, so the points are converted once
+points = stroke.to_py()
+for (x1, y1), (x2, y2) in zip(points[:-1], points[1:]):
+    canvas[draw_line(y1, x1, y2, x2)] = 255
 
 # classic straight-line hough transform
 thetas = np.linspace(
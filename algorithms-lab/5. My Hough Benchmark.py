@@ -5,7 +5,7 @@ import cv2
 import numpy as np
 
 from Utils import Stroke
-from my_hough import hough_py, hough_np, hough_numba
+from my_hough import hough_py, hough_np, hough_numba, hough_vec
 
 CANVAS_WIDTH = 1400
 CANVAS_HEIGHT = 800
@@ -44,19 +44,30 @@ np_start = datetime.now()
 thetas, rhos, accumulator = hough_np(edges, thetas=thetas_)
 np_end = datetime.now()
 
+hough_numba(edges, thetas=thetas_)  # compiling
+
 numba_start = datetime.now()
 thetas, rhos, accumulator = hough_numba(edges, thetas=thetas_)
 numba_end = datetime.now()
 
+vec_start = datetime.now()
+thetas, rhos, vec_accumulator = hough_vec(edges, thetas=thetas_)
+vec_end = datetime.now()
+
+assert np.array_equal(vec_accumulator, accumulator), 'vectorized accumulator differs'
+
 py_duration = (py_end - py_start).total_seconds()
 np_duration = (np_end - np_start).total_seconds()
 numba_duration = (numba_end - numba_start).total_seconds()
+vec_duration = (vec_end - vec_start).total_seconds()
 
 print(f'Pure Python implementation took: {py_duration:.3f} s')
 print(f'NumPy implementation took: {np_duration:.3f} s')
 print(f'Numba implementation took: {numba_duration:.3f} s')
+print(f'Vectorized NumPy implementation took: {vec_duration:.3f} s')
 
 # General performance -
 # Pure python - x s
 # NumPy - 10x s
 # Numba - x/10 s
+# Vectorized NumPy - x/17 s
@@ -0,0 +1,46 @@
+from datetime import datetime
+
+import numpy as np
+from rdp import rdp as rdp_package
+
+from Utils import chaikin_smooth, load_strokes
+from my_rdp import rdp, rdp_batch
+
+EPSILON = 0.75
+CHAIKIN_ITERATIONS = 5
+
+# every stroke after Chaikin, i.e. with thousands of points
+strokes = [chaikin_smooth(stroke, CHAIKIN_ITERATIONS) for stroke in load_strokes().values()]
+
+print(f'{len(strokes)} strokes, {sum(len(stroke) for stroke in strokes)} points')
+
+rdp(strokes[0], EPSILON, use_numba=True)  # compiling
+
+package_start = datetime.now()
+package_results = [rdp_package(stroke, epsilon=EPSILON) for stroke in strokes]
+package_end = datetime.now()
+
+np_start = datetime.now()
+np_results = [rdp(stroke, EPSILON) for stroke in strokes]
+np_end = datetime.now()
+
+numba_start = datetime.now()
+numba_results = [rdp(stroke, EPSILON, use_numba=True) for stroke in strokes]
+numba_end = datetime.now()
+
+batch_start = datetime.now()
+batch_results = rdp_batch(strokes, EPSILON, use_numba=True)
+batch_end = datetime.now()
+
+for results in (np_results, numba_results, batch_results):
+    assert all(np.array_equal(a, b) for a, b in zip(results, package_results)), 'results differ from the rdp package'
+
+package_duration = (package_end - package_start).total_seconds()
+np_duration = (np_end - np_start).total_seconds()
+numba_duration = (numba_end - numba_start).total_seconds()
+batch_duration = (batch_end - batch_start).total_seconds()
+
+print(f'rdp package took: {package_duration:.4f} s')
+print(f'NumPy implementation took: {np_duration:.4f} s ({package_duration / np_duration:.0f}x)')
+print(f'Numba implementation took: {numba_duration:.4f} s ({package_duration / numba_duration:.0f}x)')
+print(f'Numba batch took: {batch_duration:.4f} s ({package_duration / batch_duration:.0f}x)')
@@ -0,0 +1,79 @@
+from datetime import datetime
+
+import numpy as np
+from scipy.spatial.distance import directed_hausdorff
+
+from Utils import chaikin_smooth, load_strokes
+from my_rdp import rdp
+from streaming_simplifier import StreamingChaikin, StreamingSimplifier
+
+ITERATIONS = 4
+EPSILON = 0.75
+TOLERANCE = 2 * EPSILON  # both results are within EPSILON of the smoothed stroke
+
+
+def densify(polyline: np.ndarray, step: float = 0.25) -> np.ndarray:
+    """Points every `step` pixels along the polyline, so the Hausdorff distance is between lines, not vertices."""
+    points = [polyline[:1]]
+
+    for start, end in zip(polyline[:-1], polyline[1:]):
+        n = max(1, int(np.ceil(np.linalg.norm(end - start) / step)))
+        points.append(start + (end - start) * np.linspace(0, 1, n + 1)[1:, None])
+
+    return np.concatenate(points)
+
+
+def hausdorff(a: np.ndarray, b: np.ndarray) -> float:
+    a, b = densify(a), densify(b)
+    return max(directed_hausdorff(a, b)[0], directed_hausdorff(b, a)[0])
+
+
+strokes = load_strokes()
+
+print(f'{"stroke":>10} {"offline":>8} {"streaming":>10} {"distance (px)":>14}')
+
+for name, stroke in strokes.items():
+    # the streaming Chaikin is exact
+    smoothed = [tuple(point) for point in stroke]
+    for _ in range(ITERATIONS):
+        chaikin = StreamingChaikin()
+        smoothed = [p for point in smoothed for p in chaikin.push(point)] + chaikin.finish()
+    assert np.array_equal(np.array(smoothed), chaikin_smooth(stroke, ITERATIONS)), name
+
+    offline = rdp(chaikin_smooth(stroke, ITERATIONS), EPSILON)
+
+    simplifier = StreamingSimplifier(ITERATIONS, EPSILON)
+    streaming = np.array([p for point in stroke for p in simplifier.push(point)] + simplifier.finish())
+
+    # in chunks, like socket messages, gives the same result
+    simplifier = StreamingSimplifier(ITERATIONS, EPSILON)
+    chunked = [p for i in range(0, len(stroke), 5) for p in simplifier.extend(stroke[i:i + 5])] + simplifier.finish()
+    assert np.array_equal(np.array(chunked), streaming), name
+
+    # same end points, and the shapes are within the tolerance
+    assert np.array_equal(streaming[0], offline[0]) and np.array_equal(streaming[-1], offline[-1]), name
+    distance = hausdorff(offline, streaming)
+    assert distance <= TOLERANCE, f'{name}: {distance:.2f} px'
+
+    print(f'{name:>10} {len(offline):>8} {len(streaming):>10} {distance:>14.2f}')
+
+# per point cost
+points = np.concatenate(list(strokes.values()))
+
+for window in (16, 64, 256):
+    simplifier = StreamingSimplifier(ITERATIONS, EPSILON, window)
+
+    start = datetime.now()
+    for point in points:
+        simplifier.push(point)
+    simplifier.finish()
+    duration = (datetime.now() - start).total_seconds()
+
+    print(f'Window {window}: {duration / len(points) * 1e6:.1f} us per input point')
+
+start = datetime.now()
+for stroke in strokes.values():
+    rdp(chaikin_smooth(stroke, ITERATIONS), EPSILON)
+duration = (datetime.now() - start).total_seconds()
+
+print(f'Offline (after mouse-up): {duration / len(points) * 1e6:.1f} us per input point')
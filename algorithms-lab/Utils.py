@@ -1,4 +1,6 @@
+import json
 import random
+from pathlib import Path
 from typing import List, Tuple, Dict
 
 import cv2
@@ -31,6 +33,8 @@ CMOCEAN_CMAPS = [getattr(cm, cmap_name) for cmap_name in cm.cmapnames]
 
 
 class Point:
+    __slots__ = ('x', 'y')
+
     x: int
     y: int
 
@@ -43,53 +47,74 @@ class Point:
 
 
 class Stroke:
+    """
+    The points are kept in one (N, 2) int32 array, rounded like the `Point`s used to be. `x` and `y` are views into it,
+    and `points` builds `Point`s only for code which still wants them.
+    """
+
     def __init__(
             self,
             points: List[Point] | None = None,
-            tuple_points: List[Tuple[int, int]] | None = None,
+            tuple_points: List[Tuple[int, int]] | np.ndarray | None = None,
             dict_points: List[Dict[str, int]] | None = None
     ) -> None:
-        self.points: List[Point] = []
-
         if points is not None:
-            self.points = points
+            array = np.fromiter((c for point in points for c in (point.x, point.y)), np.float64, 2 * len(points))
         elif tuple_points is not None:
-            self.points = [Point(round(point[0]), round(point[1])) for point in tuple_points]
+            array = np.asarray(tuple_points, dtype=np.float64)
         elif dict_points is not None:
-            self.points = [Point(round(point['x']), round(point['y'])) for point in dict_points]
+            array = np.fromiter(
+                (c for point in dict_points for c in (point['x'], point['y'])),
+                np.float64,
+                2 * len(dict_points)
+            )
+        else:
+            array = np.empty(0)
+
+        self.array: np.ndarray = np.rint(array).astype(np.int32).reshape(-1, 2)
+
+    @classmethod
+    def from_json(cls, path: str | Path) -> 'Stroke':
+        with open(path) as stroke_f:
+            return cls(dict_points=json.load(stroke_f))
+
+    @property
+    def x(self) -> np.ndarray:
+        return self.array[:, 0]
+
+    @property
+    def y(self) -> np.ndarray:
+        return self.array[:, 1]
+
+    @property
+    def points(self) -> List[Point]:
+        return [Point(x, y) for x, y in self.array.tolist()]
 
     def __len__(self):
-        return len(self.points)
+        return len(self.array)
 
     def __str__(self) -> str:
         return str(self.to_py())
 
     def to_py(self) -> List[Tuple[int, int]]:
-        return [point.to_py() for point in self.points]
+        return list(map(tuple, self.array.tolist()))
 
-    def to_matplotlib(self) -> Tuple[List[int], List[int]]:
-        return (
-            [point.x for point in self.points],
-            [point.y for point in self.points],
-        )
+    def to_matplotlib(self) -> Tuple[np.ndarray, np.ndarray]:
+        return self.x, self.y
 
     def plot(self):
         x, y = self.to_matplotlib()
         plt.plot(x, y)
 
     def draw_cv(self, img: cv2.UMat | np.ndarray, color: Tuple[int, int, int] = (0, 0, 0)) -> cv2.UMat | np.ndarray:
-        for i, point in enumerate(self.points):
-            if i == len(self.points) - 1:
-                continue
-
-            cv2.line(
-                img=img,
-                pt1=point.to_py(),
-                pt2=self.points[i + 1].to_py(),
-                color=color,
-                thickness=2,
-                lineType=cv2.LINE_4
-            )
+        return cv2.polylines(
+            img=img,
+            pts=[self.array],
+            isClosed=False,
+            color=color,
+            thickness=2,
+            lineType=cv2.LINE_4
+        )
 
     def save(self, title: str):
         self.plot()
@@ -134,3 +159,36 @@ def linspace(start, stop, num=50, endpoint=True):
 
     for i in range(num):
         yield start + step * i
+
+
+def chaikin_smooth(points: List[Tuple[int, int]] | np.ndarray, iterations: int = 5) -> np.ndarray:
+    points = np.array(points)
+
+    for _ in range(iterations):
+        L = points.repeat(2, axis=0)
+        R = np.empty_like(L)
+
+        R[0] = L[0]
+        R[2::2] = L[1:-1:2]
+        R[1:-1:2] = L[2::2]
+        R[-1] = L[-1]
+
+        points = L * 0.75 + R * 0.25
+
+    return points
+
+
+def load_strokes(directory: str = 'strokes') -> Dict[str, np.ndarray]:
+    """Every stroke of the corpus as an (N, 2) array, without rounding the points like `Stroke` does."""
+    strokes = {}
+
+    for path in sorted(Path(directory).glob('*.json')):
+        try:
+            with open(path) as stroke_f:
+                points = json.load(stroke_f)
+        except json.JSONDecodeError:
+            continue  # square.json is only a fragment
+
+        strokes[path.stem] = np.array([(point['x'], point['y']) for point in points], dtype=np.float64)
+
+    return strokes
@@ -0,0 +1,158 @@
+# imports
+from functools import lru_cache
+from typing import Tuple
+
+import numpy as np
+from numba import jit
+
+from Utils import chaikin_smooth, load_strokes
+
+
+# functions
+def triangular(m: np.ndarray) -> np.ndarray:
+    m = np.maximum(m, 0)
+    return m * (m + 1) // 2
+
+
+@lru_cache
+def chaikin_weights(iterations: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Closed form of `iterations` Chaikin iterations (of `Utils.chaikin_smooth`), with N = 2 ** iterations:
+
+    - away from the ends, every input point p[i + 1] is replaced by the N points
+      (T(N - j) * p[i] + (N^2 - T(N - j) - T(j - 1)) * p[i + 1] + T(j - 1) * p[i + 2]) / N^2, j = 0..N-1
+    - the first N - 1 points are ((N^2 - T(j)) * p[0] + T(j) * p[1]) / N^2, j = 0..N-2
+    - the last N + 1 points are (T(j) * p[-2] + (N^2 - T(j)) * p[-1]) / N^2, j = N..0
+
+    where T(m) = m (m + 1) / 2 (0 for m < 0). Returns the weights of the first three and the cap weights T(j) / N^2.
+    """
+    n = 2 ** iterations
+    j = np.arange(n + 1)
+
+    first = triangular(n - j[:n]) / n ** 2
+    last = triangular(j[:n] - 1) / n ** 2
+    middle = 1 - first - last
+    cap = triangular(j) / n ** 2
+
+    return first, middle, last, cap
+
+
+@jit(nopython=True)
+def chaikin_numba(points: np.ndarray, first: np.ndarray, middle: np.ndarray, last: np.ndarray, cap: np.ndarray,
+                  out: np.ndarray) -> None:
+    n, size = len(points), len(first)
+
+    for j in range(size - 1):
+        for d in range(points.shape[1]):
+            out[j, d] = points[0, d] * (1 - cap[j]) + points[1, d] * cap[j]
+
+    for i in range(n - 2):
+        row = (i + 1) * size - 1
+        for j in range(size):
+            for d in range(points.shape[1]):
+                out[row + j, d] = points[i, d] * first[j] + points[i + 1, d] * middle[j] + points[i + 2, d] * last[j]
+
+    row = (n - 1) * size - 1
+    for j in range(size + 1):
+        for d in range(points.shape[1]):
+            out[row + j, d] = points[-1, d] * (1 - cap[size - j]) + points[-2, d] * cap[size - j]
+
+
+def chaikin_smooth_one_pass(points: np.ndarray, iterations: int = 5, out: np.ndarray | None = None,
+                            use_numba: bool = False) -> np.ndarray:
+    """
+    Same result as `Utils.chaikin_smooth`, but all the iterations are done at once from the closed form weights,
+    straight into one preallocated output (which can be passed in as `out`). Besides the output, only temporaries of
+    the input's size are allocated (none with `use_numba`), instead of every iteration's intermediate stroke.
+    """
+    points = np.asarray(points, dtype=np.float64)
+    n, size = len(points), 2 ** iterations
+
+    if out is None:
+        out = np.empty((n * size, points.shape[1]), dtype=np.float64)
+
+    if iterations == 0 or n == 1:
+        out[:] = points.repeat(size, axis=0)
+        return out
+
+    first, middle, last, cap = chaikin_weights(iterations)
+
+    if use_numba:
+        chaikin_numba(points, first, middle, last, cap, out)
+        return out
+
+    # interior: one output point per (input point, j), filled j by j so the temporaries have the input's size
+    interior = out[size - 1:(n - 1) * size - 1].reshape(n - 2, size, points.shape[1])
+    for j in range(size):
+        np.multiply(points[:-2], first[j], out=interior[:, j])
+        interior[:, j] += points[1:-1] * middle[j]
+        interior[:, j] += points[2:] * last[j]
+
+    # ends: on the first and the last segment
+    start = out[:size - 1]
+    np.multiply(points[0], 1 - cap[:size - 1, None], out=start)
+    start += points[1] * cap[:size - 1, None]
+
+    end = out[(n - 1) * size - 1:]
+    np.multiply(points[-1], 1 - cap[::-1, None], out=end)
+    end += points[-2] * cap[::-1, None]
+
+    return out
+
+
+def turning_angles(points: np.ndarray) -> np.ndarray:
+    """The angle (radians) the stroke turns by at every interior point."""
+    before = points[1:-1] - points[:-2]
+    after = points[2:] - points[1:-1]
+
+    cross = before[:, 0] * after[:, 1] - before[:, 1] * after[:, 0]
+    dot = (before * after).sum(axis=1)
+
+    return np.abs(np.arctan2(cross, dot))
+
+
+def chaikin_smooth_adaptive(points: np.ndarray, iterations: int = 5, threshold: float = 0.1) -> np.ndarray:
+    """
+    Only the corners which turn by at least `threshold` radians are subdivided. The N points replacing a straighter
+    corner (and the ends, which are straight) are cut down to their first and last one, which keeps the shape of
+    straight runs without multiplying their points. With `threshold` 0 it's the same as the full result.
+    """
+    points = np.asarray(points, dtype=np.float64)
+    n, size = len(points), 2 ** iterations
+
+    if threshold <= 0 or iterations == 0 or n < 3:
+        return chaikin_smooth_one_pass(points, iterations)
+
+    first, middle, last, cap = chaikin_weights(iterations)
+    subdivided = turning_angles(points) >= threshold
+
+    # j's to compute for every interior point: all of them, or the first and the last one
+    counts = np.where(subdivided, size, 2)
+    total = counts.sum()
+
+    out = np.empty((total + 4, points.shape[1]), dtype=np.float64)
+    out[0] = points[0]
+    out[1] = points[0] * (1 - cap[size - 2]) + points[1] * cap[size - 2]
+    out[-2] = points[-2] * cap[size] + points[-1] * (1 - cap[size])
+    out[-1] = points[-1]
+
+    i = np.repeat(np.arange(n - 2), counts)
+    j = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    j[~subdivided[i]] *= size - 1
+
+    interior = out[2:-2]
+    np.multiply(points[i], first[j, None], out=interior)
+    interior += points[i + 1] * middle[j, None]
+    interior += points[i + 2] * last[j, None]
+
+    return out
+
+
+# main
+if __name__ == '__main__':
+    stroke = load_strokes()['line_2']
+
+    print(f'Original: {len(stroke)} points')
+    print(f'Chaikin: {len(chaikin_smooth_one_pass(stroke, 4))} points, '
+          f'max difference {np.abs(chaikin_smooth_one_pass(stroke, 4) - chaikin_smooth(stroke, 4)).max():.2e}')
+    print(f'Adaptive Chaikin: {len(chaikin_smooth_adaptive(stroke, 4))} points')
@@ -1,50 +1,272 @@
 # imports
 import json
-import math
 import random
+from functools import cached_property, lru_cache
 from typing import Tuple, List
 
 import cv2
+import numpy as np
 import scipy.ndimage as ndi
 from matplotlib import pyplot as plt
-from numba import jit
+from numba import jit, prange, get_num_threads
 from skimage import measure
 
-from Utils import Stroke, linspace, rand_color_hex, Point, CMOCEAN_CMAPS, PYPLOT_CMAPS
+from Utils import Stroke, rand_color_hex, Point, CMOCEAN_CMAPS, PYPLOT_CMAPS
+
+
+# classes
+class HoughTables:
+    """
+    Everything about the parameter space of a canvas which doesn't depend on the image: the thetas, the rhos, cos / sin
+    of the thetas, and x * cos(theta) / y * sin(theta) for every column / row of the canvas, so a pixel's rho is a
+    single addition. Get them with `hough_tables` to share them between calls; the arrays are read-only.
+    """
+
+    def __init__(self, img_shape: Tuple[int, int], thetas: np.ndarray) -> None:
+        self.img_shape = (int(img_shape[0]), int(img_shape[1]))
+        self.rho_max = int(np.ceil(np.sqrt(img_shape[0] ** 2 + img_shape[1] ** 2)))  # diagonal of the image
+        self.acc_shape = (self.rho_max * 2, len(thetas))
+
+        self.thetas = self.read_only(np.array(thetas, dtype=np.float64))
+        self.rhos = self.read_only(np.arange(-self.rho_max, self.rho_max, 1))
+        self.cos_thetas = self.read_only(np.cos(self.thetas))
+        self.sin_thetas = self.read_only(np.sin(self.thetas))
+
+    @staticmethod
+    def read_only(array: np.ndarray) -> np.ndarray:
+        array.flags.writeable = False
+        return array
+
+    @cached_property
+    def x_cos(self) -> np.ndarray:
+        return self.read_only(np.arange(self.img_shape[1])[:, None] * self.cos_thetas)
+
+    @cached_property
+    def y_sin(self) -> np.ndarray:
+        return self.read_only(np.arange(self.img_shape[0])[:, None] * self.sin_thetas)
+
+    # lists, for the pure Python backends
+    @cached_property
+    def x_cos_py(self) -> List[List[float]]:
+        return self.x_cos.tolist()
+
+    @cached_property
+    def y_sin_py(self) -> List[List[float]]:
+        return self.y_sin.tolist()
+
+    @cached_property
+    def cos_sin_py(self) -> List[Tuple[float, float]]:
+        return list(zip(self.cos_thetas.tolist(), self.sin_thetas.tolist()))
+
+
+class HoughAccumulator:
+    """
+    The votes of a band of theta columns (all of them by default) in the smallest unsigned dtype which can't overflow
+    for `max_votes` per cell (see `accumulator_dtype`). The rhos are computed from the cos / sin of the band's thetas
+    only, so unlike with the x * cos / y * sin tables the memory doesn't grow with the number of thetas.
+    """
+
+    def __init__(self, tables: HoughTables, max_votes: int, theta_start: int = 0, theta_end: int = None) -> None:
+        self.tables = tables
+        self.theta_start = theta_start
+        self.theta_end = tables.acc_shape[1] if theta_end is None else theta_end
+        self.dtype = accumulator_dtype(max_votes)
+        self.votes = np.zeros((tables.acc_shape[0], self.theta_end - self.theta_start), dtype=self.dtype)
+
+    def vote(self, xs: np.ndarray, ys: np.ndarray, chunk_size: int = 1 << 20) -> None:
+        cos_thetas = self.tables.cos_thetas[self.theta_start:self.theta_end]
+        sin_thetas = self.tables.sin_thetas[self.theta_start:self.theta_end]
+        n_thetas = len(cos_thetas)
+        step = max(1, chunk_size // max(1, n_thetas))
+
+        for start in range(0, len(xs), step):
+            x = xs[start:start + step, None]
+            y = ys[start:start + step, None]
+
+            # same products and sums as the tables', so the same rhos
+            rho_is = np.rint(x * cos_thetas + y * sin_thetas).astype(np.intp) + self.tables.rho_max
+            self.votes += np.bincount(
+                (rho_is * n_thetas + np.arange(n_thetas)).ravel(),
+                minlength=self.votes.size
+            ).reshape(self.votes.shape).astype(self.dtype)
+
+    def smear(self, k_size: int = 1, decrease_f: int = 1) -> None:
+        """`smear_accumulator`'s box pass. The columns at the ends of a band only get the smearing from inside it."""
+        self.votes = smear_accumulator(self.votes, k_size, decrease_f).astype(self.dtype)
+
+    def candidates(self, min_rho: int, min_theta: int, start: int, end: int, count: int) -> (
+            np.ndarray,
+            np.ndarray,
+            np.ndarray
+    ):
+        """
+        The `count` strongest local maxima (over (2 * min_rho + 1) x (2 * min_theta + 1) cells) in the columns `start`
+        to `end` (of all the thetas, which need to have `min_theta` more columns of the band on both sides to be
+        exact): their votes, rho indices and theta indices.
+        """
+        local_max = ndi.maximum_filter(self.votes, size=(2 * min_rho + 1, 2 * min_theta + 1), mode='constant', cval=0)
+        is_max = (self.votes == local_max) & (self.votes > 0)
+        is_max[:, :start - self.theta_start] = False
+        is_max[:, end - self.theta_start:] = False
+
+        rho_is, theta_is = np.nonzero(is_max)
+        values = self.votes[rho_is, theta_is]
+
+        strongest = np.argsort(values, kind='stable')[::-1][:count]
+        return values[strongest], rho_is[strongest], theta_is[strongest] + self.theta_start
 
 
 # functions
+@lru_cache(maxsize=16)
+def hough_tables(
+        img_shape: Tuple[int, int],
+        num_thetas: int = 360,
+        theta_range: Tuple[float, float] = (-np.pi / 2, np.pi / 2),
+        endpoint: bool = False
+) -> HoughTables:
+    """The tables of `num_thetas` thetas over `theta_range` (end excluded by default), kept for the 16 last used keys."""
+    thetas = np.linspace(
+        start=theta_range[0],
+        stop=theta_range[1],
+        num=num_thetas,
+        endpoint=endpoint
+    )
+
+    return HoughTables(img_shape, thetas)
+
+
+@lru_cache(maxsize=16)
+def thetas_tables(img_shape: Tuple[int, int], thetas: Tuple[float, ...]) -> HoughTables:
+    """The tables of the given thetas, kept for the 16 last used keys."""
+    return HoughTables(img_shape, np.array(thetas))
+
+
+def get_hough_tables(
+        img_shape: Tuple[int, int],
+        thetas=None,
+        tables: HoughTables = None,
+        endpoint: bool = False
+) -> HoughTables:
+    """
+    The `tables` passed to a backend, else the cached ones of its `thetas` (by value), else the cached default ones
+    (`endpoint` tells whether they include pi / 2).
+    """
+    if tables is not None:
+        return tables
+
+    img_shape = (int(img_shape[0]), int(img_shape[1]))
+    if thetas is None:
+        return hough_tables(img_shape, endpoint=endpoint)
+
+    return thetas_tables(img_shape, tuple(np.asarray(thetas, dtype=np.float64).tolist()))
+
+
+def accumulator_dtype(max_votes: int) -> np.dtype:
+    """The smallest unsigned integer dtype which holds `max_votes`."""
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if max_votes <= np.iinfo(dtype).max:
+            return np.dtype(dtype)
+
+    return np.dtype(np.uint64)
+
+
+def max_cell_votes(n_pixels: int, quantize: bool = False, k_size: int = 1, decrease_f: int = 1) -> int:
+    """A pixel votes once per theta, so a cell gets at most a vote per pixel, plus its neighbours' when quantized."""
+    if quantize:
+        return n_pixels * (1 + decrease_f * (2 * k_size + 1) ** 2)
+
+    return n_pixels
+
+
+def check_quantize_mode(quantize_mode: str, wrap_thetas: bool) -> bool:
+    """Whether the loop backends smear every vote ('votes'), or leave it to `smear_accumulator` ('box', 'triangle')."""
+    if quantize_mode not in ('votes', 'box', 'triangle'):
+        raise ValueError(f'Unknown quantize mode: {quantize_mode}')
+    if quantize_mode == 'votes' and wrap_thetas:
+        raise ValueError("The 'votes' quantize mode doesn't wrap the thetas, use 'box'")
+
+    return quantize_mode == 'votes'
+
+
+def smear_accumulator(
+        accumulator: np.ndarray,
+        k_size: int = 1,
+        decrease_f: int = 1,
+        kernel: str = 'box',
+        wrap_thetas: bool = False
+) -> np.ndarray:
+    """
+    Quantization as one pass over the accumulator instead of a (2 * k_size + 1)^2 loop for every vote: the plain
+    votes plus `decrease_f` times their separable 'box' (same as the per-vote loop) or 'triangle' (weights falling
+    linearly to 1 / (k_size + 1) at the edge) filter. With `wrap_thetas`, the thetas are taken to span pi, so the
+    neighbours past one end are the other end's cells at -rho.
+    """
+    accumulator = np.asarray(accumulator)
+    offsets = np.arange(-k_size, k_size + 1)
+
+    if kernel == 'box':
+        weights = np.ones(len(offsets), dtype=accumulator.dtype)
+    elif kernel == 'triangle':
+        weights = (k_size + 1 - np.abs(offsets)) / (k_size + 1)
+        accumulator = accumulator.astype(np.float64)
+    else:
+        raise ValueError(f'Unknown kernel: {kernel}')
+
+    if k_size == 0:
+        return accumulator + decrease_f * accumulator
+
+    smeared = ndi.correlate1d(accumulator, weights, axis=0, mode='constant', cval=0)
+
+    if wrap_thetas:
+        # theta + pi is the line at -rho: index r of the rhos is 2 * rho_max - r
+        def reflected(columns: np.ndarray) -> np.ndarray:
+            result = np.zeros_like(columns)
+            result[1:] = columns[:0:-1]
+            return result
+
+        padded = np.hstack([reflected(smeared[:, -k_size:]), smeared, reflected(smeared[:, :k_size])])
+        smeared = ndi.correlate1d(padded, weights, axis=1, mode='constant', cval=0)[:, k_size:-k_size]
+    else:
+        smeared = ndi.correlate1d(smeared, weights, axis=1, mode='constant', cval=0)
+
+    return accumulator + decrease_f * smeared
+
+
 def hough_py(
         img: List[List[int]],
         thetas: List[int] = None,
         quantize: bool = False,
         k_size: int = 1,
-        decrease_f: int = 1
+        decrease_f: int = 1,
+        tables: HoughTables = None,
+        quantize_mode: str = 'votes',
+        wrap_thetas: bool = False
 ) -> (List[int], List[int], List[List[int]]):
-    rho_max = int(math.ceil(math.sqrt(len(img) ** 2 + len(img[0]) ** 2)))
+    tables = get_hough_tables((len(img), len(img[0])), thetas, tables)
+    rho_max = tables.rho_max
 
     if thetas is None:
-        thetas = list(linspace(
-            start=-math.pi / 2,
-            stop=math.pi / 2,
-            num=360,
-            endpoint=False
-        ))
+        thetas = tables.thetas.tolist()
     rhos = range(-rho_max, rho_max, 1)
     accumulator = [[0 for _ in range(len(thetas))] for __ in range(rho_max * 2)]
-    acc_shape = (rho_max * 2, len(thetas))
+    acc_shape = tables.acc_shape
+    smear_votes = quantize and check_quantize_mode(quantize_mode, wrap_thetas)
 
     for y, row in enumerate(img):
+        y_sin = tables.y_sin_py[y]
+
         for x, col in enumerate(row):
             if col == 0:
                 continue
 
-            for i, theta in enumerate(thetas):
-                rho = int(round(x * math.cos(theta) + y * math.sin(theta)))
+            x_cos = tables.x_cos_py[x]
+
+            for i in range(len(thetas)):
+                rho = int(round(x_cos[i] + y_sin[i]))
 
                 accumulator[rho + rho_max][i] += 1
 
-                if quantize:
+                if smear_votes:
                     for kr in range(-k_size, k_size + 1):
                         for ki in range(-k_size, k_size + 1):
                             new_rho = rho + rho_max + kr
@@ -52,10 +274,10 @@ def hough_py(
                             if 0 <= new_rho < acc_shape[0] and 0 <= new_i < acc_shape[1]:
                                 accumulator[new_rho][new_i] += 1 * decrease_f
 
-    return thetas, rhos, accumulator
+    if quantize and not smear_votes:
+        accumulator = smear_accumulator(accumulator, k_size, decrease_f, quantize_mode, wrap_thetas).tolist()
 
-
-import numpy as np
+    return thetas, rhos, accumulator
 
 
 def hough_np(
@@ -63,32 +285,34 @@ def hough_np(
         thetas: np.ndarray = None,
         quantize: bool = False,
         k_size: int = 1,
-        decrease_f: int = 1
+        decrease_f: int = 1,
+        tables: HoughTables = None,
+        quantize_mode: str = 'votes',
+        wrap_thetas: bool = False
 ) -> (np.ndarray, np.ndarray, np.ndarray):
-    rho_max = int(np.ceil(np.sqrt(img.shape[0] ** 2 + img.shape[1] ** 2)))
+    tables = get_hough_tables(img.shape, thetas, tables)
+    rho_max = tables.rho_max
 
-    if thetas is None:
-        thetas = np.linspace(
-            start=-np.pi / 2,
-            stop=np.pi / 2,
-            num=360,
-            endpoint=False
-        )
-    rhos = np.arange(-rho_max, rho_max, 1)
-    accumulator = np.zeros((rho_max * 2, len(thetas)), dtype=np.uint8)
-    acc_shape = (rho_max * 2, len(thetas))
+    thetas = tables.thetas
+    rhos = tables.rhos
+    accumulator = np.zeros(tables.acc_shape, dtype=np.int32)
+    acc_shape = tables.acc_shape
+    smear_votes = quantize and check_quantize_mode(quantize_mode, wrap_thetas)
 
     for y in range(img.shape[0]):
         for x in range(img.shape[1]):
             if img[y, x] == 0:
                 continue
 
-            for i, theta in enumerate(thetas):
-                rho = int(round(x * np.cos(theta) + y * np.sin(theta)))
+            x_cos = tables.x_cos[x]
+            y_sin = tables.y_sin[y]
+
+            for i in range(len(thetas)):
+                rho = int(round(x_cos[i] + y_sin[i]))
 
                 accumulator[rho + rho_max, i] += 1
 
-                if quantize:
+                if smear_votes:
                     for kr in range(-k_size, k_size + 1):
                         for ki in range(-k_size, k_size + 1):
                             new_rho = rho + rho_max + kr
@@ -96,36 +320,33 @@ def hough_np(
                             if 0 <= new_rho < acc_shape[0] and 0 <= new_i < acc_shape[1]:
                                 accumulator[new_rho, new_i] += 1 * decrease_f
 
+    if quantize and not smear_votes:
+        accumulator = smear_accumulator(accumulator, k_size, decrease_f, quantize_mode, wrap_thetas)
+
     return thetas, rhos, accumulator
 
 
 @jit(nopython=True)
-def hough_numba(
+def hough_numba_kernel(
         img: np.ndarray,
-        thetas: np.ndarray = None,
+        x_cos: np.ndarray,
+        y_sin: np.ndarray,
+        rho_max: int,
         quantize: bool = False,
         k_size: int = 1,
         decrease_f: int = 1
-) -> (np.ndarray, np.ndarray, np.ndarray):
-    rho_max = int(np.ceil(np.sqrt(img.shape[0] ** 2 + img.shape[1] ** 2)))
-
-    if thetas is None:
-        thetas = np.linspace(
-            start=-np.pi / 2,
-            stop=np.pi / 2,
-            num=360
-        )
-    rhos = np.arange(-rho_max, rho_max, 1)
-    accumulator = np.zeros((rho_max * 2, len(thetas)), dtype=np.int32)
-    acc_shape = (rho_max * 2, len(thetas))
+) -> np.ndarray:
+    n_thetas = x_cos.shape[1]
+    accumulator = np.zeros((rho_max * 2, n_thetas), dtype=np.int32)
+    acc_shape = (rho_max * 2, n_thetas)
 
     for y in range(img.shape[0]):
         for x in range(img.shape[1]):
             if img[y, x] == 0:
                 continue
 
-            for i, theta in enumerate(thetas):
-                rho = int(round(x * np.cos(theta) + y * np.sin(theta)))
+            for i in range(n_thetas):
+                rho = int(round(x_cos[x, i] + y_sin[y, i]))
 
                 accumulator[rho + rho_max, i] += 1
 
@@ -137,34 +358,444 @@ def hough_numba(
                             if 0 <= new_rho < acc_shape[0] and 0 <= new_i < acc_shape[1]:
                                 accumulator[new_rho, new_i] += 1 * decrease_f
 
-    return thetas, rhos, accumulator
+    return accumulator
+
+
+def hough_numba(
+        img: np.ndarray,
+        thetas: np.ndarray = None,
+        quantize: bool = False,
+        k_size: int = 1,
+        decrease_f: int = 1,
+        tables: HoughTables = None,
+        quantize_mode: str = 'votes',
+        wrap_thetas: bool = False
+) -> (np.ndarray, np.ndarray, np.ndarray):
+    # unlike the other backends, the default thetas go up to pi / 2 included
+    tables = get_hough_tables(img.shape, thetas, tables, endpoint=True)
+    smear_votes = quantize and check_quantize_mode(quantize_mode, wrap_thetas)
+
+    accumulator = hough_numba_kernel(img, tables.x_cos, tables.y_sin, tables.rho_max, smear_votes, k_size, decrease_f)
+
+    if quantize and not smear_votes:
+        accumulator = smear_accumulator(accumulator, k_size, decrease_f, quantize_mode, wrap_thetas)
+
+    return tables.thetas, tables.rhos, accumulator
+
+
+@jit(nopython=True, parallel=True)
+def hough_numba_parallel_kernel(
+        xs: np.ndarray,
+        ys: np.ndarray,
+        x_cos: np.ndarray,
+        y_sin: np.ndarray,
+        rho_max: int,
+        n_chunks: int
+) -> np.ndarray:
+    n_thetas = x_cos.shape[1]
+    n_rhos = rho_max * 2
 
+    # a private accumulator per chunk of pixels (one chunk per thread), so no two threads write the same cell
+    accumulators = np.zeros((n_chunks, n_rhos, n_thetas), dtype=np.int32)
 
-def hough_points_py(img_shape: Tuple[int, int], points: List[Point], thetas: List[int] = None) -> (
+    for c in prange(n_chunks):
+        accumulator = accumulators[c]
+
+        for p in range(c * len(xs) // n_chunks, (c + 1) * len(xs) // n_chunks):
+            x = xs[p]
+            y = ys[p]
+
+            for i in range(n_thetas):
+                rho = int(round(x_cos[x, i] + y_sin[y, i]))
+                accumulator[rho + rho_max, i] += 1
+
+    # reduced into the first one, by rho rows, in parallel too
+    for r in prange(n_rhos):
+        for c in range(1, n_chunks):
+            for i in range(n_thetas):
+                accumulators[0, r, i] += accumulators[c, r, i]
+
+    return accumulators[0]
+
+
+def hough_numba_parallel(
+        img: np.ndarray,
+        thetas: np.ndarray = None,
+        quantize: bool = False,
+        k_size: int = 1,
+        decrease_f: int = 1,
+        tables: HoughTables = None,
+        quantize_mode: str = 'box',
+        wrap_thetas: bool = False
+) -> (np.ndarray, np.ndarray, np.ndarray):
+    """
+    `hough_numba` on all of Numba's threads (`numba.set_num_threads`): the nonzero pixels are split between them, each
+    voting into its own accumulator, and the accumulators are summed at the end. The votes are integers, so the result
+    is the same as `hough_numba`'s whatever the number of threads (its default thetas too). Takes a thread-count's
+    accumulators of memory.
+    """
+    tables = get_hough_tables(img.shape, thetas, tables, endpoint=True)
+    ys, xs = np.nonzero(img)
+
+    accumulator = hough_numba_parallel_kernel(xs, ys, tables.x_cos, tables.y_sin, tables.rho_max, get_num_threads())
+
+    if quantize:
+        # the per-vote smearing is the same as the box one
+        kernel = 'box' if quantize_mode == 'votes' else quantize_mode
+        accumulator = smear_accumulator(accumulator, k_size, decrease_f, kernel, wrap_thetas)
+
+    return tables.thetas, tables.rhos, accumulator
+
+
+def hough_vec(
+        img: np.ndarray,
+        thetas: np.ndarray = None,
+        quantize: bool = False,
+        k_size: int = 1,
+        decrease_f: int = 1,
+        chunk_size: int = 1 << 22,
+        tables: HoughTables = None,
+        quantize_mode: str = 'box',
+        wrap_thetas: bool = False
+) -> (np.ndarray, np.ndarray, np.ndarray):
+    """
+    Vectorized `hough_np`, with the same accumulator: the nonzero pixels are gathered once and their rhos for every
+    theta are computed against the precomputed cos / sin of the thetas, then counted with `np.bincount`. The pixels go
+    through in chunks of about `chunk_size` (pixel, theta) pairs, so the temporaries stay bounded on big canvases.
+    """
+    tables = get_hough_tables(img.shape, thetas, tables)
+    rho_max = tables.rho_max
+    acc_shape = tables.acc_shape
+
+    theta_is = np.arange(acc_shape[1])
+
+    ys, xs = np.nonzero(img)
+    step = max(1, chunk_size // max(1, acc_shape[1]))
+
+    votes = np.zeros(acc_shape[0] * acc_shape[1], dtype=np.int64)
+    for start in range(0, len(xs), step):
+        # the same rounding (half to even) as `round` in the loops; multiplying is faster here than gathering the
+        # rows of the x_cos / y_sin tables
+        x = xs[start:start + step, None].astype(np.float64)
+        y = ys[start:start + step, None].astype(np.float64)
+        rho_is = np.rint(x * tables.cos_thetas + y * tables.sin_thetas).astype(np.intp)
+        votes += np.bincount(((rho_is + rho_max) * acc_shape[1] + theta_is).ravel(), minlength=len(votes))
+
+    accumulator = votes.reshape(acc_shape).astype(np.int32)
+
+    if quantize:
+        # the per-vote smearing is the same as the box one
+        kernel = 'box' if quantize_mode == 'votes' else quantize_mode
+        accumulator = smear_accumulator(accumulator, k_size, decrease_f, kernel, wrap_thetas)
+
+    return tables.thetas, tables.rhos, accumulator
+
+
+def hough_points_py(
+        img_shape: Tuple[int, int],
+        points: List[Point],
+        thetas: List[int] = None,
+        tables: HoughTables = None
+) -> (
         List[int],
         List[int],
         List[List[int]]
 ):
-    rho_max = int(math.ceil(math.sqrt(img_shape[0] ** 2 + img_shape[1] ** 2)))  # diagonal of the image
+    tables = get_hough_tables(img_shape, thetas, tables)
+    rho_max = tables.rho_max
 
     if thetas is None:
-        thetas = list(linspace(
-            start=-math.pi / 2,
-            stop=math.pi / 2,
-            num=360,
-            endpoint=False
-        ))
+        thetas = tables.thetas.tolist()
     rhos = range(-rho_max, rho_max, 1)
     accumulator = [[0 for _ in range(len(thetas))] for __ in range(rho_max * 2)]
 
     for point in points:
-        for i, theta in enumerate(thetas):
-            rho = int(round(point.x * math.cos(theta) + point.y * math.sin(theta)))
+        for i, (cos_theta, sin_theta) in enumerate(tables.cos_sin_py):
+            rho = int(round(point.x * cos_theta + point.y * sin_theta))
             accumulator[rho + rho_max][i] += 1
 
     return thetas, rhos, accumulator
 
 
+def stroke_pixels(img_shape: Tuple[int, int], points: np.ndarray) -> (np.ndarray, np.ndarray):
+    """
+    The xs and ys of the pixels `Stroke.draw_cv` draws for the points on a canvas of `img_shape`, found by drawing them
+    on a canvas of the stroke's bounding box only.
+    """
+    array = Stroke(tuple_points=points).array
+    if len(array) == 0:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+
+    # a margin of more than the line's thickness, so nothing is clipped
+    origin = array.min(axis=0) - 4
+    width, height = array.max(axis=0) - origin + 5
+
+    canvas = np.zeros((height, width), dtype=np.uint8)
+    Stroke(tuple_points=array - origin).draw_cv(canvas, color=(1, 1, 1))
+
+    ys, xs = np.nonzero(canvas)
+    xs += origin[0]
+    ys += origin[1]
+
+    inside = (xs >= 0) & (xs < img_shape[1]) & (ys >= 0) & (ys < img_shape[0])
+    return xs[inside], ys[inside]
+
+
+def hough_points_np(
+        img_shape: Tuple[int, int],
+        points: np.ndarray,
+        thetas: np.ndarray = None,
+        tables: HoughTables = None
+) -> (np.ndarray, np.ndarray, np.ndarray):
+    """
+    `hough_vec` of a stroke's (N, 2) points (e.g. `Stroke.array`) drawn on a canvas of `img_shape`, without the canvas:
+    only the stroke's bounding box is drawn (see `stroke_pixels`). The pixels' rhos are the same products and sums as
+    the x * cos / y * sin tables', rounded like `hough_np` does, so the accumulator is the same as the raster one's.
+    """
+    tables = get_hough_tables(img_shape, thetas, tables)
+    acc_shape = tables.acc_shape
+
+    xs, ys = stroke_pixels(img_shape, points)
+
+    x = xs[:, None].astype(np.float64)
+    y = ys[:, None].astype(np.float64)
+    rho_is = np.rint(x * tables.cos_thetas + y * tables.sin_thetas).astype(np.intp)
+    accumulator = np.bincount(
+        ((rho_is + tables.rho_max) * acc_shape[1] + np.arange(acc_shape[1])).ravel(),
+        minlength=acc_shape[0] * acc_shape[1]
+    ).reshape(acc_shape).astype(np.int32)
+
+    return tables.thetas, tables.rhos, accumulator
+
+
+@jit(nopython=True)
+def hough_pixels_numba_kernel(
+        xs: np.ndarray,
+        ys: np.ndarray,
+        x_cos: np.ndarray,
+        y_sin: np.ndarray,
+        rho_max: int
+) -> np.ndarray:
+    n_thetas = x_cos.shape[1]
+    accumulator = np.zeros((rho_max * 2, n_thetas), dtype=np.int32)
+
+    for p in range(len(xs)):
+        x = xs[p]
+        y = ys[p]
+
+        for i in range(n_thetas):
+            rho = int(round(x_cos[x, i] + y_sin[y, i]))
+            accumulator[rho + rho_max, i] += 1
+
+    return accumulator
+
+
+def hough_points_numba(
+        img_shape: Tuple[int, int],
+        points: np.ndarray,
+        thetas: np.ndarray = None,
+        tables: HoughTables = None
+) -> (np.ndarray, np.ndarray, np.ndarray):
+    """`hough_points_np` voting in a loop, so nothing but the accumulator is allocated for the votes."""
+    tables = get_hough_tables(img_shape, thetas, tables)
+
+    xs, ys = stroke_pixels(img_shape, points)
+    accumulator = hough_pixels_numba_kernel(xs, ys, tables.x_cos, tables.y_sin, tables.rho_max)
+
+    return tables.thetas, tables.rhos, accumulator
+
+
+def suppress_peaks(
+        values: np.ndarray,
+        rho_is: np.ndarray,
+        theta_is: np.ndarray,
+        acc_shape: Tuple[int, int],
+        min_rho: int = 9,
+        min_theta: int = 10,
+        num_peaks: int = 5
+) -> (np.ndarray, np.ndarray, np.ndarray):
+    """
+    Greedy non-maximum suppression of candidate peaks: the strongest one is kept and the ones within `min_rho` rhos
+    and `min_theta` thetas of it are dropped, and so on. The thetas wrap around like in `prominent_peaks`: past one
+    end is the other end, at -rho.
+    """
+    # strongest first, ties by rho and theta, so the order the candidates come in doesn't matter
+    order = np.lexsort((theta_is, rho_is, -values.astype(np.float64)))
+    kept = order[suppress_sorted(rho_is[order], theta_is[order], acc_shape, min_rho, min_theta, num_peaks)]
+
+    return values[kept], rho_is[kept], theta_is[kept]
+
+
+def suppress_sorted(
+        rho_is: np.ndarray,
+        theta_is: np.ndarray,
+        acc_shape: Tuple[int, int],
+        min_rho: int = 9,
+        min_theta: int = 10,
+        num_peaks: int = 5
+) -> np.ndarray:
+    """`suppress_peaks` of candidates already in order: the indices of the kept ones."""
+    n_rhos, n_thetas = acc_shape
+    alive = np.ones(len(rho_is), dtype=bool)
+    kept = []
+
+    for c in range(len(rho_is)):
+        if not alive[c]:
+            continue
+
+        kept.append(c)
+        if len(kept) == num_peaks:
+            break
+
+        # drop the later ones near it
+        d_theta = np.abs(theta_is[c + 1:].astype(np.int64) - int(theta_is[c]))
+        d_rho = np.abs(rho_is[c + 1:].astype(np.int64) - int(rho_is[c]))
+
+        wrapped = d_theta > n_thetas // 2
+        d_theta[wrapped] = n_thetas - d_theta[wrapped]
+        d_rho[wrapped] = np.abs(n_rhos - rho_is[c + 1:][wrapped].astype(np.int64) - int(rho_is[c]))
+
+        alive[c + 1:] &= ~((d_theta <= min_theta) & (d_rho <= min_rho))
+
+    return np.array(kept, dtype=np.int64)
+
+
+def local_maxima(
+        accumulator: np.ndarray,
+        rho_is: np.ndarray,
+        theta_is: np.ndarray,
+        min_rho: int,
+        min_theta: int,
+        chunk_size: int = 1 << 20
+) -> np.ndarray:
+    """Which of the cells are the maximum of the (2 * min_rho + 1) x (2 * min_theta + 1) cells around them."""
+    n_rhos, n_thetas = accumulator.shape
+    d_rhos = np.arange(-min_rho, min_rho + 1)
+    d_thetas = np.arange(-min_theta, min_theta + 1)
+
+    is_max = np.empty(len(rho_is), dtype=bool)
+    step = max(1, chunk_size // (len(d_rhos) * len(d_thetas)))
+
+    for start in range(0, len(rho_is), step):
+        # clipping repeats cells of the window, which doesn't change its maximum
+        rows = np.clip(rho_is[start:start + step, None] + d_rhos, 0, n_rhos - 1)
+        cols = np.clip(theta_is[start:start + step, None] + d_thetas, 0, n_thetas - 1)
+        window_max = accumulator[rows[:, :, None], cols[:, None, :]].max(axis=(1, 2))
+
+        is_max[start:start + step] = accumulator[rho_is[start:start + step], theta_is[start:start + step]] >= window_max
+
+    return is_max
+
+
+@jit(nopython=True)
+def fast_peaks_numba_kernel(
+        accumulator: np.ndarray,
+        rho_is: np.ndarray,
+        theta_is: np.ndarray,
+        min_rho: int,
+        min_theta: int,
+        num_peaks: int
+) -> np.ndarray:
+    """`local_maxima` and `suppress_peaks` of the candidates (strongest first) in one loop: the kept ones' indices."""
+    n_rhos, n_thetas = accumulator.shape
+    kept = np.empty(min(num_peaks, len(rho_is)), dtype=np.int64)
+    n_kept = 0
+
+    for c in range(len(rho_is)):
+        r = rho_is[c]
+        t = theta_is[c]
+        value = accumulator[r, t]
+
+        # suppressed by a kept one
+        suppressed = False
+        for k in range(n_kept):
+            d_theta = abs(t - theta_is[kept[k]])
+            d_rho = abs(r - rho_is[kept[k]])
+
+            if d_theta > n_thetas // 2:
+                d_theta = n_thetas - d_theta
+                d_rho = abs(n_rhos - r - rho_is[kept[k]])
+
+            if d_theta <= min_theta and d_rho <= min_rho:
+                suppressed = True
+                break
+
+        if suppressed:
+            continue
+
+        # a local maximum
+        is_max = True
+        for wr in range(max(0, r - min_rho), min(n_rhos, r + min_rho + 1)):
+            for wt in range(max(0, t - min_theta), min(n_thetas, t + min_theta + 1)):
+                if accumulator[wr, wt] > value:
+                    is_max = False
+                    break
+            if not is_max:
+                break
+
+        if is_max:
+            kept[n_kept] = c
+            n_kept += 1
+            if n_kept == len(kept):
+                break
+
+    return kept[:n_kept]
+
+
+def fast_peaks(
+        img: np.ndarray,
+        min_x_dist=1,
+        min_y_dist=1,
+        threshold=None,
+        num_peaks=np.inf,
+        use_numba: bool = False
+):
+    """
+    `prominent_peaks` without labeling the whole image: the local maxima above `threshold` (half the maximum by
+    default), strongest first, with the same neighbourhood suppression (reflected past the ends of the x axis).
+    Only the strongest cells above the threshold are looked at, found with `np.argpartition`: enough of them for
+    `num_peaks` peaks, and more if they weren't. On a plateau, the first cell (by y, then x) is the peak instead of the plateau's centroid.
+    """
+    cols = img.shape[1]
+    values = img.ravel()
+
+    if threshold is None:
+        threshold = 0.5 * np.max(img)
+
+    # only the cells above the threshold can be peaks, and there are few of them, so they're the ones partitioned
+    above = np.flatnonzero(values > threshold)
+    above_values = values[above]
+
+    n_above = len(above)
+    num_peaks = n_above if num_peaks == np.inf else min(int(num_peaks), n_above)
+    k = min(n_above, max(64, num_peaks * (2 * min_x_dist + 1) * (2 * min_y_dist + 1)))
+
+    candidates = kept = np.zeros(0, dtype=np.int64)
+
+    while k > 0:
+        # the k strongest cells, and any equal to the weakest of them, so they're a prefix of all the cells by votes
+        kth = above_values[np.argpartition(above_values, n_above - k)[n_above - k]]
+        candidates = above[above_values >= kth]
+        candidates = candidates[np.argsort(-values[candidates].astype(np.float64), kind='stable')]
+
+        y_coords, x_coords = np.divmod(candidates, cols)
+
+        if use_numba:
+            kept = fast_peaks_numba_kernel(img, y_coords, x_coords, min_y_dist, min_x_dist, num_peaks)
+        else:
+            is_max = np.flatnonzero(local_maxima(img, y_coords, x_coords, min_y_dist, min_x_dist))
+            kept = is_max[
+                suppress_sorted(y_coords[is_max], x_coords[is_max], img.shape, min_y_dist, min_x_dist, num_peaks)
+            ]
+
+        if len(kept) >= num_peaks or len(candidates) >= n_above:
+            break
+        k = min(n_above, 4 * k)
+
+    peaks = candidates[kept]
+    return values[peaks], peaks % cols, peaks // cols
+
+
 def prominent_peaks(
         img: np.ndarray,
         min_x_dist=1,
@@ -263,17 +894,31 @@ def hough_peaks(
         min_rho=9,
         min_theta=10,
         threshold=None,
-        num_peaks=5
+        num_peaks=5,
+        method: str = 'labels'
 ) -> (List[int], List[int]):
+    """`method`: 'labels' (`prominent_peaks`), or 'fast' / 'fast_numba' (`fast_peaks`, without and with Numba)."""
     min_theta = min(min_theta, accumulator.shape[1])
 
-    peaks, peak_theta_is, peak_rho_is = prominent_peaks(
-        accumulator.copy(),
-        min_x_dist=min_theta,
-        min_y_dist=min_rho,
-        threshold=threshold,
-        num_peaks=num_peaks
-    )
+    if method == 'labels':
+        peaks, peak_theta_is, peak_rho_is = prominent_peaks(
+            accumulator.copy(),
+            min_x_dist=min_theta,
+            min_y_dist=min_rho,
+            threshold=threshold,
+            num_peaks=num_peaks
+        )
+    elif method in ('fast', 'fast_numba'):
+        peaks, peak_theta_is, peak_rho_is = fast_peaks(
+            accumulator,
+            min_x_dist=min_theta,
+            min_y_dist=min_rho,
+            threshold=threshold,
+            num_peaks=num_peaks,
+            use_numba=method == 'fast_numba'
+        )
+    else:
+        raise ValueError(f'Unknown method: {method}')
 
     if len(peaks) > 0:
         return (
@@ -284,6 +929,237 @@ def hough_peaks(
     return [], []
 
 
+def hough_peaks_banded(
+        img: np.ndarray,
+        thetas: np.ndarray = None,
+        quantize: bool = False,
+        k_size: int = 1,
+        decrease_f: int = 1,
+        min_rho=9,
+        min_theta=10,
+        threshold=None,
+        num_peaks=5,
+        band_size: int = 90,
+        candidates_per_band: int = None,
+        tables: HoughTables = None
+) -> (List[int], List[int]):
+    """
+    `hough_peaks` of the transform, without ever holding all of it: the thetas are done `band_size` at a time (plus
+    the columns around the band the smearing and the local maxima need), and only the `candidates_per_band` (4 *
+    `num_peaks` by default) strongest local maxima of each band are kept for `suppress_peaks`. The memory is that of a
+    band, whatever the number of thetas. `threshold` defaults to half the strongest vote, like in `hough_peaks`.
+    """
+    tables = get_hough_tables(img.shape, thetas, tables)
+    n_thetas = tables.acc_shape[1]
+    min_theta = min(min_theta, n_thetas)
+
+    ys, xs = np.nonzero(img)
+    max_votes = max_cell_votes(len(xs), quantize, k_size, decrease_f)
+    halo = min_theta + (k_size if quantize else 0)
+
+    if candidates_per_band is None:
+        candidates_per_band = 4 * num_peaks
+
+    values, rho_is, theta_is = [], [], []
+
+    for start in range(0, n_thetas, band_size):
+        end = min(start + band_size, n_thetas)
+
+        band = HoughAccumulator(tables, max_votes, max(0, start - halo), min(n_thetas, end + halo))
+        band.vote(xs, ys)
+        if quantize:
+            band.smear(k_size, decrease_f)
+
+        band_values, band_rho_is, band_theta_is = band.candidates(min_rho, min_theta, start, end, candidates_per_band)
+        values.append(band_values)
+        rho_is.append(band_rho_is)
+        theta_is.append(band_theta_is)
+
+    values, rho_is, theta_is = np.concatenate(values), np.concatenate(rho_is), np.concatenate(theta_is)
+
+    if threshold is None:
+        threshold = 0.5 * values.max(initial=0)
+
+    above = values > threshold
+    _, peak_rho_is, peak_theta_is = suppress_peaks(
+        values[above],
+        rho_is[above],
+        theta_is[above],
+        tables.acc_shape,
+        min_rho,
+        min_theta,
+        num_peaks
+    )
+
+    return (
+        [tables.thetas[peak_theta_i] for peak_theta_i in peak_theta_is],
+        [tables.rhos[peak_rho_i] for peak_rho_i in peak_rho_is]
+    )
+
+
+@jit(nopython=True)
+def hough_probabilistic_kernel(
+        mask: np.ndarray,
+        xs: np.ndarray,
+        ys: np.ndarray,
+        x_cos: np.ndarray,
+        y_sin: np.ndarray,
+        cos_thetas: np.ndarray,
+        sin_thetas: np.ndarray,
+        rho_max: int,
+        threshold: int,
+        min_line_length: float,
+        max_line_gap: int,
+        max_lines: int
+) -> np.ndarray:
+    """
+    The progressive probabilistic Hough transform of the pixels of `mask` (1: not looked at yet), in the order of
+    `xs` / `ys`. Every pixel votes when it comes; once a cell reaches `threshold`, its line is walked from the pixel
+    both ways (until more than `max_line_gap` pixels in a row are off the mask), and the pixels of the segment are
+    taken off the mask, and their votes off the accumulator. Kept are the segments of at least `min_line_length`.
+    """
+    height, width = mask.shape
+    n_thetas = x_cos.shape[1]
+    accumulator = np.zeros((rho_max * 2, n_thetas), dtype=np.int32)
+    lines = np.empty((max_lines, 4), dtype=np.int32)
+    ends = np.empty((2, 2), dtype=np.int64)
+    n_lines = 0
+
+    for p in range(len(xs)):
+        x = xs[p]
+        y = ys[p]
+
+        # taken by a segment already
+        if mask[y, x] == 0:
+            continue
+
+        # voting (2: voted), and the strongest cell of the pixel
+        mask[y, x] = 2
+        best_votes = threshold - 1
+        best_i = -1
+
+        for i in range(n_thetas):
+            rho = int(round(x_cos[x, i] + y_sin[y, i])) + rho_max
+            accumulator[rho, i] += 1
+
+            if accumulator[rho, i] > best_votes:
+                best_votes = accumulator[rho, i]
+                best_i = i
+
+        if best_i < 0:
+            continue
+
+        # along the line, one pixel at a time on the longer axis
+        dx = -sin_thetas[best_i]
+        dy = cos_thetas[best_i]
+        longer = max(abs(dx), abs(dy))
+        dx /= longer
+        dy /= longer
+
+        for k in range(2):
+            sign = 1.0 if k == 0 else -1.0
+            ends[k, 0] = x
+            ends[k, 1] = y
+            gap = 0
+            step = 1
+
+            while True:
+                px = int(round(x + sign * step * dx))
+                py = int(round(y + sign * step * dy))
+                step += 1
+
+                if not (0 <= px < width and 0 <= py < height):
+                    break
+
+                if mask[py, px] != 0:
+                    ends[k, 0] = px
+                    ends[k, 1] = py
+                    gap = 0
+                else:
+                    gap += 1
+                    if gap > max_line_gap:
+                        break
+
+        good_line = np.hypot(ends[0, 0] - ends[1, 0], ends[0, 1] - ends[1, 1]) >= min_line_length
+
+        # taking the segment off the mask (and the votes of its pixels off the accumulator, if it's kept)
+        for k in range(2):
+            sign = 1.0 if k == 0 else -1.0
+            step = 0
+
+            while True:
+                px = int(round(x + sign * step * dx))
+                py = int(round(y + sign * step * dy))
+                step += 1
+
+                if good_line and mask[py, px] == 2:
+                    for i in range(n_thetas):
+                        rho = int(round(x_cos[px, i] + y_sin[py, i])) + rho_max
+                        accumulator[rho, i] -= 1
+                mask[py, px] = 0
+
+                if px == ends[k, 0] and py == ends[k, 1]:
+                    break
+
+        if good_line:
+            lines[n_lines, 0] = ends[0, 0]
+            lines[n_lines, 1] = ends[0, 1]
+            lines[n_lines, 2] = ends[1, 0]
+            lines[n_lines, 3] = ends[1, 1]
+            n_lines += 1
+
+            if n_lines == max_lines:
+                break
+
+    return lines[:n_lines]
+
+
+def hough_probabilistic(
+        img: np.ndarray,
+        threshold: int = 50,
+        min_line_length: float = 50,
+        max_line_gap: int = 10,
+        max_lines=np.inf,
+        thetas: np.ndarray = None,
+        tables: HoughTables = None,
+        seed: int = 0
+) -> np.ndarray:
+    """
+    Line segments of the image, like `cv2.HoughLinesP`: an (N, 4) array of x1, y1, x2, y2. Random pixels vote one at
+    a time, and a line is walked for its endpoints as soon as it has `threshold` votes, so only `max_lines` lines
+    stop it early (1: the first line found). Segments shorter than `min_line_length` (in pixels, end to end) are
+    dropped, and gaps of up to `max_line_gap` pixels are bridged. The same `seed` gives the same segments.
+    """
+    # the kernel writes the segments into an array of `max_lines` rows
+    if max_lines < 1:
+        raise ValueError(f'max_lines must be at least 1, not {max_lines}')
+
+    tables = get_hough_tables(img.shape, thetas, tables)
+
+    mask = np.asarray(img != 0, dtype=np.uint8)
+
+    # much faster than np.nonzero, and None for an empty image
+    points = cv2.findNonZero(mask)
+    points = np.zeros((0, 2), dtype=np.int32) if points is None else points.reshape(-1, 2)
+    points = points[np.random.default_rng(seed).permutation(len(points))]
+
+    return hough_probabilistic_kernel(
+        mask,
+        points[:, 0],
+        points[:, 1],
+        tables.x_cos,
+        tables.y_sin,
+        tables.cos_thetas,
+        tables.sin_thetas,
+        tables.rho_max,
+        threshold,
+        min_line_length,
+        max_line_gap,
+        # every segment takes at least one point
+        int(min(max_lines, len(points)))
+    )
+
+
 # main
 if __name__ == '__main__':
     print('Starting main.')
@@ -0,0 +1,152 @@
+# imports
+import json
+from typing import List, Tuple
+
+import numpy as np
+from numba import jit
+
+from Utils import Stroke
+
+
+# functions
+# the distances are computed exactly like `rdp.pldist` does, so the results are the same as the `rdp` package's
+def rdp_mask_np(points: np.ndarray, epsilon: float, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    mask = np.zeros(len(points), dtype=bool)
+    mask[starts] = True
+    mask[ends] = True
+
+    x = points[:, 0].astype(np.float64)
+    y = points[:, 1].astype(np.float64)
+
+    stack: List[Tuple[int, int]] = list(zip(starts.tolist(), ends.tolist()))
+
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+
+        sx, sy = x[start], y[start]
+        dx, dy = x[end] - sx, y[end] - sy
+
+        if dx == 0 and dy == 0:
+            distances = np.sqrt((x[start + 1:end] - sx) ** 2 + (y[start + 1:end] - sy) ** 2)
+        else:
+            distances = np.abs(dx * (sy - y[start + 1:end]) - dy * (sx - x[start + 1:end])) / np.sqrt(dx * dx + dy * dy)
+
+        # first farthest point, like the strict `d > dmax` of `rdp`
+        i = int(np.argmax(distances))
+
+        if distances[i] > epsilon:
+            index = start + 1 + i
+            mask[index] = True
+
+            stack.append((start, index))
+            stack.append((index, end))
+
+    return mask
+
+
+@jit(nopython=True)
+def rdp_mask_numba(points: np.ndarray, epsilon: float, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    mask = np.zeros(len(points), dtype=np.bool_)
+    stack = np.empty((len(points) + len(starts), 2), dtype=np.int64)
+    top = 0
+
+    for k in range(len(starts)):
+        mask[starts[k]] = True
+        mask[ends[k]] = True
+        stack[top, 0] = starts[k]
+        stack[top, 1] = ends[k]
+        top += 1
+
+    while top > 0:
+        top -= 1
+        start = stack[top, 0]
+        end = stack[top, 1]
+
+        sx = float(points[start, 0])
+        sy = float(points[start, 1])
+        dx = float(points[end, 0]) - sx
+        dy = float(points[end, 1]) - sy
+        length = np.sqrt(dx * dx + dy * dy)
+        same = dx == 0 and dy == 0
+
+        d_max = 0.0
+        index = start
+
+        for i in range(start + 1, end):
+            px = float(points[i, 0])
+            py = float(points[i, 1])
+
+            if same:
+                d = np.sqrt((px - sx) ** 2 + (py - sy) ** 2)
+            else:
+                d = abs(dx * (sy - py) - dy * (sx - px)) / length
+
+            if d > d_max:
+                index = i
+                d_max = d
+
+        if d_max > epsilon:
+            mask[index] = True
+
+            stack[top, 0] = start
+            stack[top, 1] = index
+            stack[top + 1, 0] = index
+            stack[top + 1, 1] = end
+            top += 2
+
+    return mask
+
+
+def rdp(points, epsilon: float = 0, use_numba: bool = False, return_mask: bool = False):
+    """
+    Drop-in replacement of `rdp.rdp`: a list in gives a list out, an array in gives an array out.
+    """
+    is_array = isinstance(points, np.ndarray)
+    array = points if is_array else np.array(points)
+
+    if len(array) == 0:
+        mask = np.zeros(0, dtype=bool)
+    else:
+        bounds = (np.array([0]), np.array([len(array) - 1]))
+        mask = rdp_mask_numba(array, epsilon, *bounds) if use_numba else rdp_mask_np(array, epsilon, *bounds)
+
+    if return_mask:
+        return mask
+
+    return array[mask] if is_array else array[mask].tolist()
+
+
+def rdp_batch(strokes: List[np.ndarray], epsilon: float = 0, use_numba: bool = False) -> List[np.ndarray]:
+    """
+    Simplifies many strokes in one call: they're concatenated and every stroke starts as its own segment on the same
+    stack, so there's only one kernel call (and one Python -> Numba crossing) for all of them.
+    """
+    if len(strokes) == 0:
+        return []
+
+    strokes = [np.asarray(stroke) for stroke in strokes]
+    lengths = np.array([len(stroke) for stroke in strokes])
+
+    points = np.concatenate(strokes)
+    ends = np.cumsum(lengths) - 1
+    starts = ends - lengths + 1
+
+    # empty strokes have no segment
+    non_empty = lengths > 0
+    starts, ends = starts[non_empty], ends[non_empty]
+
+    mask = rdp_mask_numba(points, epsilon, starts, ends) if use_numba else rdp_mask_np(points, epsilon, starts, ends)
+
+    return [stroke[stroke_mask] for stroke, stroke_mask in zip(strokes, np.split(mask, np.cumsum(lengths)[:-1]))]
+
+
+# main
+if __name__ == '__main__':
+    with open('strokes/line_2.json', 'r') as stroke_f:
+        stroke = Stroke(dict_points=json.load(stroke_f))
+
+    print(f'Original: {len(stroke)} points')
+    print(f'NumPy: {len(rdp(stroke.to_py(), epsilon=1))} points')
+    print(f'Numba: {len(rdp(stroke.to_py(), epsilon=1, use_numba=True))} points')
@@ -0,0 +1,80 @@
+# imports
+import sys
+from pathlib import Path
+from typing import Dict
+
+import numpy as np
+
+from Utils import load_strokes
+
+# file layout (little-endian):
+#   magic (8 bytes) | number of strokes n (u8) | size of the names (u8)
+#   offsets of the strokes in points (n + 1 x i8)
+#   names, '\n'-separated utf-8, padded to a multiple of 8 bytes
+#   points (offsets[-1] x 2 x f4)
+MAGIC = b'STROKES1'
+HEADER = np.dtype([('magic', 'S8'), ('n', '<u8'), ('names_size', '<u8')])
+
+
+# functions
+def pack_strokes(directory: str | Path = 'strokes', path: str | Path = 'strokes.bin') -> None:
+    """
+    Packs every stroke JSON of `directory` into one file. The coordinates are float32, which is exact for most recorded
+    ones (multiples of 1 / 2^k px) and within 1e-4 px of the rest.
+    """
+    strokes = load_strokes(str(directory))
+
+    names = '\n'.join(strokes).encode()
+    names += b'\0' * (-len(names) % 8)
+
+    header = np.array([(MAGIC, len(strokes), len(names))], dtype=HEADER)
+    offsets = np.concatenate([[0], np.cumsum([len(points) for points in strokes.values()])]).astype('<i8')
+    points = np.concatenate(list(strokes.values()) or [np.empty((0, 2))]).astype('<f4')
+
+    with open(path, 'wb') as packed_f:
+        packed_f.write(header.tobytes())
+        packed_f.write(offsets.tobytes())
+        packed_f.write(names)
+        packed_f.write(points.tobytes())
+
+
+def load_packed_strokes(path: str | Path = 'strokes.bin') -> Dict[str, np.ndarray]:
+    """
+    Same as `Utils.load_strokes`, but from a file made by `pack_strokes`: the points are memory-mapped, so only the
+    header, the offsets and the names are read, and every stroke is a (N, 2) float32 view into the mapping.
+    """
+    header = np.fromfile(path, dtype=HEADER, count=1)[0]
+    if header['magic'] != MAGIC:
+        raise ValueError(f'{path} is not a packed stroke file')
+
+    n, names_size = int(header['n']), int(header['names_size'])
+
+    offsets = np.fromfile(path, dtype='<i8', count=n + 1, offset=HEADER.itemsize)
+    with open(path, 'rb') as packed_f:
+        packed_f.seek(HEADER.itemsize + offsets.nbytes)
+        names = packed_f.read(names_size).rstrip(b'\0').decode().split('\n') if n > 0 else []
+
+    if offsets[-1] == 0:
+        return {name: np.empty((0, 2), dtype=np.float32) for name in names}
+
+    points = np.memmap(
+        path,
+        dtype='<f4',
+        mode='r',
+        offset=HEADER.itemsize + offsets.nbytes + names_size,
+        shape=(int(offsets[-1]), 2)
+    )
+
+    return {name: points[start:end] for name, start, end in zip(names, offsets[:-1], offsets[1:])}
+
+
+# main
+if __name__ == '__main__':
+    # python packed_strokes.py [directory] [file]
+    directory = sys.argv[1] if len(sys.argv) > 1 else 'strokes'
+    path = sys.argv[2] if len(sys.argv) > 2 else 'strokes.bin'
+
+    pack_strokes(directory, path)
+    strokes = load_packed_strokes(path)
+
+    print(f'Packed {len(strokes)} strokes ({sum(len(points) for points in strokes.values())} points) into {path}')
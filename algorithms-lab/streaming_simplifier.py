@@ -0,0 +1,158 @@
+# imports
+import math
+from typing import Iterable, List, Tuple
+
+from Utils import load_strokes
+
+PointT = Tuple[float, float]
+
+
+# classes
+class StreamingChaikin:
+    """
+    One iteration of `Utils.chaikin_smooth`, a point at a time. Every new point only adds the two points cut from the
+    corner with the previous one, so only that previous point has to be remembered and the output is exactly the same
+    as the offline one.
+    """
+
+    def __init__(self) -> None:
+        self.previous: PointT | None = None
+
+    def push(self, point: PointT) -> List[PointT]:
+        previous, self.previous = self.previous, point
+
+        if previous is None:
+            return [point]
+
+        (x0, y0), (x1, y1) = previous, point
+        return [
+            (x0 * 0.75 + x1 * 0.25, y0 * 0.75 + y1 * 0.25),
+            (x1 * 0.75 + x0 * 0.25, y1 * 0.75 + y0 * 0.25)
+        ]
+
+    def finish(self) -> List[PointT]:
+        return [self.previous] if self.previous is not None else []
+
+
+class StreamingRDP:
+    """
+    Sliding window simplification: the last final point is the anchor, and the points after it are dropped for as
+    long as all of them stay within `epsilon` of the line from the anchor towards the newest point. When a new point
+    breaks that, the point before it becomes final and the next anchor.
+
+    Instead of keeping the dropped points to check them again for every new point, each one narrows the range of
+    directions from the anchor which pass within `epsilon` of it (its angle +- asin(epsilon / distance)). A new point
+    fits if its direction is still in that range, so a point costs O(1) and the window is only counted: after `window`
+    dropped points the last one is made final anyway, which bounds how long a point can stay pending.
+    """
+
+    def __init__(self, epsilon: float, window: int = 64) -> None:
+        self.epsilon = epsilon
+        self.max_size = window
+        self.size = 0
+        self.anchor: PointT | None = None
+        self.last: PointT | None = None
+        # directions (relative to `reference`) of the lines from the anchor which pass all the dropped points
+        self.reference: float | None = None
+        self.low = -math.pi
+        self.high = math.pi
+
+    def direction(self, point: PointT) -> Tuple[float, float]:
+        dx, dy = point[0] - self.anchor[0], point[1] - self.anchor[1]
+        return math.atan2(dy, dx), math.hypot(dx, dy)
+
+    def fits(self, point: PointT) -> bool:
+        if self.reference is None:
+            return True
+
+        angle, distance = self.direction(point)
+        if distance == 0:
+            return False
+
+        relative = (angle - self.reference + math.pi) % (2 * math.pi) - math.pi
+        return self.low <= relative <= self.high
+
+    def narrow(self, point: PointT) -> None:
+        angle, distance = self.direction(point)
+        if distance <= self.epsilon:
+            return
+
+        if self.reference is None:
+            self.reference = angle
+
+        relative = (angle - self.reference + math.pi) % (2 * math.pi) - math.pi
+        spread = math.asin(self.epsilon / distance)
+        self.low = max(self.low, relative - spread)
+        self.high = min(self.high, relative + spread)
+
+    def push(self, point: PointT) -> List[PointT]:
+        if self.anchor is None:
+            self.anchor = point
+            return [point]
+
+        final = []
+
+        if self.size > 0 and (self.size == self.max_size or not self.fits(point)):
+            final.append(self.make_final())
+
+        self.narrow(point)
+        self.last = point
+        self.size += 1
+
+        return final
+
+    def make_final(self) -> PointT:
+        self.anchor = self.last
+        self.size = 0
+        self.reference = None
+        self.low, self.high = -math.pi, math.pi
+
+        return self.anchor
+
+    def finish(self) -> List[PointT]:
+        return [self.make_final()] if self.size > 0 else []
+
+
+class StreamingSimplifier:
+    """
+    Chaikin smoothing followed by RDP-style simplification of a stroke which is still being drawn. Points go in one at
+    a time or in chunks, and only the points which have become final come out, so they can be sent right away. The
+    memory used doesn't grow with the stroke: a point per Chaikin iteration and a few numbers for the RDP window.
+    """
+
+    def __init__(self, iterations: int = 4, epsilon: float = 0.75, window: int = 64) -> None:
+        self.chaikins = [StreamingChaikin() for _ in range(iterations)]
+        self.rdp = StreamingRDP(epsilon, window)
+
+    def push(self, point: PointT) -> List[PointT]:
+        points = [(float(point[0]), float(point[1]))]
+
+        for chaikin in self.chaikins:
+            points = [smoothed for p in points for smoothed in chaikin.push(p)]
+
+        return [final for p in points for final in self.rdp.push(p)]
+
+    def extend(self, points: Iterable[PointT]) -> List[PointT]:
+        return [final for point in points for final in self.push(point)]
+
+    def finish(self) -> List[PointT]:
+        """Call on mouse-up: flushes the points held back by every stage."""
+        points = []
+
+        for chaikin in self.chaikins:
+            points = [smoothed for p in points for smoothed in chaikin.push(p)] + chaikin.finish()
+
+        return [final for p in points for final in self.rdp.push(p)] + self.rdp.finish()
+
+
+# main
+if __name__ == '__main__':
+    stroke = load_strokes()['line_2']
+
+    simplifier = StreamingSimplifier()
+    for point in stroke:
+        final = simplifier.push(point)
+        if final:
+            print(f'{tuple(point)} -> {len(final)} final point(s)')
+
+    print(f'Mouse-up -> {len(simplifier.finish())} final point(s)')
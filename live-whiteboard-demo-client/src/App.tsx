@@ -13,7 +13,7 @@ import BoundingBox from "./types/BoundingBox"
 import { drawRect, drawElement, drawCircle } from "./utils/CanvasUtils"
 import { calcBoundingBox, pointInsideBoundingBox } from "./utils/BoundingBoxUtils"
 import { circleInteresectsBox, circleIntersectsEllipse, circleIntersectsStroke, lineSegmentIntersectsCircle, pointInsideBox, pointInsideCircle, throttle } from "./utils/Utils"
-import { translateElement } from "./utils/ShapeUtils"
+import { applyPatch, translateElement } from "./utils/ShapeUtils"
 import { randomColorHex } from "./utils/ColorUtils"
 import chaikinSmooth from "./algorithms/ChaikinSmooth"
 import douglasPeucker from "./algorithms/DouglasPeucker"
@@ -561,6 +561,11 @@ function App() {
 		console.log('[DEBUG] Someone updated drawn element.')
 		updateDrawnElement(data.element, false)
 	}
+	const onDrawnElementPatched = (data: any) => {
+		console.log('[DEBUG] Someone patched drawn element.')
+		const ele = drawnEles.find(ele => ele.id === data.element_id)
+		if (ele) updateDrawnElement(applyPatch({ ...ele }, data.ops), false)
+	}
 	const onDrawnElementsDeleted = (data: any) => {
 		console.log('[DEBUG] Someone deleted drawn element(s).')
 		deleteDrawnElements(data.element_ids, false)
@@ -586,9 +591,15 @@ function App() {
 		socket.on('disconnect', onDisconnect)
 		socket.on('msg', onMsg)
 
-		socket.on('connected_to_room', ({ room_id }) => setRoomId(room_id))
+		socket.on('connected_to_room', ({ room_id, elements }) => {
+			setRoomId(room_id)
+
+			// snapshot of the room's board (oldest first), sent by the server on join
+			if (elements) setDrawnEles([...elements].reverse())
+		})
 		socket.on('drawn_element_added', onDrawnElementAdded)
 		socket.on('drawn_element_updated', onDrawnElementUpdated)
+		socket.on('drawn_element_patched', onDrawnElementPatched)
 		socket.on('drawn_elements_deleted', onDrawnElementsDeleted)
 
 		return () => {
@@ -597,6 +608,7 @@ function App() {
 			socket.off('msg', onMsg)
 			socket.off('drawn_element_added', onDrawnElementAdded)
 			socket.off('drawn_element_updated', onDrawnElementUpdated)
+			socket.off('drawn_element_patched', onDrawnElementPatched)
 			socket.off('drawn_element_deleted', (ele_id: string) => console.log(`[DEBUG] Element deleted: ${ele_id}`))
 		}
 	})
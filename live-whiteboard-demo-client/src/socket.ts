@@ -5,4 +5,5 @@ const DEV_URL = 'http://localhost:8000'
 
 const URL = process.env.NODE_ENV === 'production' ? PROD_URL : DEV_URL
 
-export const socket = io(URL)
\ No newline at end of file
+// strokes are smoothed and simplified before they are sent (see App.tsx), so the server doesn't do it again
+export const socket = io(URL, { auth: { strokes: 'simplified' } })
\ No newline at end of file
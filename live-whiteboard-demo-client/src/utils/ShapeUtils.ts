@@ -33,6 +33,36 @@ function translateElement(element: Element, translation: Translation): Element {
     }
 }
 
+type PatchOp =
+    | ["translate", number, number]
+    | ["set", "lineType" | "lineWidth" | "color" | "fill" | "arrows", any]
+    | ["append", Array<Point>]
+
+function applyPatch(element: Element, ops: Array<PatchOp>): Element {
+    for (const op of ops) {
+        switch (op[0]) {
+            case "translate":
+                element = translateElement(element, { x: op[1], y: op[2] })
+                break
+
+            case "set":
+                element = { ...element, [op[1]]: op[2] }
+                break
+
+            case "append":
+                if (element.name === "stroke") element = { ...element, points: [...element.points, ...op[1]] }
+                break
+        }
+    }
+
+    return element
+}
+
+export type {
+    PatchOp
+}
+
 export {
-    translateElement
+    translateElement,
+    applyPatch
 }
\ No newline at end of file
@@ -0,0 +1,160 @@
+"""
+Compares the threaded WSGI Socket.IO server (``wsgi.py``, served by ``manage.py runserver``) with the asyncio
+one (``asgi.py``, served by uvicorn).
+
+For each server it measures how many clients manage to connect concurrently, how long that takes and the latency of
+a broadcast from one member of a room to all the others, against a throwaway SQLite database.
+
+Usage (from the server directory):
+    python benchmarks/asgi_vs_wsgi.py --clients 200 --broadcasts 50
+"""
+
+# imports
+import argparse
+import asyncio
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import socketio
+
+from workers import temporary_database
+
+SERVER_DIR = Path(__file__).resolve().parent.parent
+ROOM_ID = 'benchmark'
+
+
+# servers
+def start_server(kind: str, port: int) -> subprocess.Popen:
+    if kind == 'wsgi':
+        cmd = [sys.executable, 'manage.py', 'runserver', '--noreload', f'127.0.0.1:{port}']
+    else:
+        cmd = [
+            sys.executable, '-m', 'uvicorn', 'live_whiteboard_demo_server.asgi:application',
+            '--port', str(port), '--log-level', 'warning'
+        ]
+
+    process = subprocess.Popen(cmd, cwd=SERVER_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    wait_for_port(port)
+
+    return process
+
+
+def wait_for_port(port: int, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+
+    while time.monotonic() < deadline:
+        with socket.socket() as s:
+            if s.connect_ex(('127.0.0.1', port)) == 0:
+                return
+        time.sleep(0.1)
+
+    raise TimeoutError(f'Server on port {port} did not start in {timeout} s.')
+
+
+# clients
+async def connect_clients(url: str, n: int, timeout: float) -> List[socketio.AsyncClient]:
+    async def connect_one() -> socketio.AsyncClient | None:
+        client = socketio.AsyncClient(reconnection=False)
+        joined = asyncio.Event()
+        client.on('connected_to_room', lambda data: joined.set())
+
+        try:
+            # like the web client, so the server doesn't simplify the strokes and echo them back to the author
+            await client.connect(url, wait_timeout=timeout, auth={'strokes': 'simplified'})
+            await client.emit('join_room', ROOM_ID)
+            await asyncio.wait_for(joined.wait(), timeout)
+        except (socketio.exceptions.ConnectionError, asyncio.TimeoutError):
+            await client.disconnect()
+            return None
+
+        return client
+
+    clients = await asyncio.gather(*[connect_one() for _ in range(n)])
+
+    return [client for client in clients if client is not None]
+
+
+async def measure_broadcasts(clients: List[socketio.AsyncClient], n: int, timeout: float) -> List[float]:
+    sender, receivers = clients[0], clients[1:]
+    latencies: List[float] = []
+    pending: Dict[str, int] = {}
+    done = asyncio.Event()
+
+    def on_added(data):
+        element = data['element']
+        latencies.append(time.perf_counter() - element['sent_at'])
+
+        pending[element['id']] -= 1
+        if pending[element['id']] == 0:
+            done.set()
+
+    for receiver in receivers:
+        receiver.on('drawn_element_added', on_added)
+
+    for i in range(n):
+        element_id = f'bench-{i}'
+        pending[element_id] = len(receivers)
+        done.clear()
+
+        await sender.emit('add_drawn_element', {
+            'room_id': ROOM_ID,
+            'element': {'name': 'line', 'id': element_id, 'sent_at': time.perf_counter()}
+        })
+
+        try:
+            await asyncio.wait_for(done.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    return latencies
+
+
+async def run(kind: str, port: int, n_clients: int, n_broadcasts: int, timeout: float) -> Dict[str, float]:
+    process = start_server(kind, port)
+
+    try:
+        start = time.perf_counter()
+        clients = await connect_clients(f'http://127.0.0.1:{port}', n_clients, timeout)
+        connect_duration = time.perf_counter() - start
+
+        latencies = await measure_broadcasts(clients, n_broadcasts, timeout) if len(clients) > 1 else []
+
+        await asyncio.gather(*[client.disconnect() for client in clients])
+    finally:
+        process.terminate()
+        process.wait()
+
+    latencies.sort()
+
+    return {
+        'connected': len(clients),
+        'connect_s': connect_duration,
+        'broadcast_p50_ms': statistics.median(latencies) * 1000 if latencies else float('nan'),
+        'broadcast_p99_ms': latencies[int(len(latencies) * 0.99)] * 1000 if latencies else float('nan'),
+        'deliveries': len(latencies)
+    }
+
+
+# main
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--clients', type=int, default=200)
+    parser.add_argument('--broadcasts', type=int, default=50)
+    parser.add_argument('--timeout', type=float, default=10)
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+
+    for kind in ('wsgi', 'asgi'):
+        with temporary_database():
+            result = asyncio.run(run(kind, args.port, args.clients, args.broadcasts, args.timeout))
+
+        print(f'{kind.upper()}:')
+        print(f'\tConnected clients: {result["connected"]}/{args.clients} in {result["connect_s"]:.3f} s')
+        print(f'\tBroadcast latency p50: {result["broadcast_p50_ms"]:.3f} ms')
+        print(f'\tBroadcast latency p99: {result["broadcast_p99_ms"]:.3f} ms')
+        print(f'\tDeliveries: {result["deliveries"]}/{args.broadcasts * (args.clients - 1)}')
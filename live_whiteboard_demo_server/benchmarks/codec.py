@@ -0,0 +1,51 @@
+"""
+Size and speed of the binary geometry codec (``codec.py``) versus the JSON points the client sends today, over
+``algorithms-lab/strokes/*.json``.
+
+Usage (from the server directory):
+    python benchmarks/codec.py
+"""
+
+# imports
+import json
+import sys
+import timeit
+from pathlib import Path
+
+from corpus import load_strokes, long_stroke
+
+SERVER_DIR = Path(__file__).resolve().parent.parent
+
+sys.path.insert(0, str(SERVER_DIR))
+
+from live_whiteboard_demo_server.codec import decode_points, encode_points  # noqa: E402
+
+REPEAT = 200
+
+
+def time_us(func, *args) -> float:
+    return timeit.timeit(lambda: func(*args), number=REPEAT) / REPEAT * 1e6
+
+
+# main
+if __name__ == '__main__':
+    strokes = load_strokes()
+    strokes['long'] = long_stroke(strokes, n_points=2000)
+
+    print(
+        f'{"Stroke":<12}{"Points":>8}{"JSON (B)":>10}{"Binary (B)":>12}{"Ratio":>8}'
+        f'{"JSON enc (us)":>15}{"Bin enc (us)":>14}{"JSON dec (us)":>15}{"Bin dec (us)":>14}{"Max err":>9}'
+    )
+
+    for name, points in strokes.items():
+        as_json = json.dumps(points, separators=(',', ':'))
+        as_binary = encode_points(points)
+
+        decoded = decode_points(as_binary)
+        max_error = max(max(abs(p['x'] - q['x']), abs(p['y'] - q['y'])) for p, q in zip(points, decoded))
+
+        print(
+            f'{name:<12}{len(points):>8}{len(as_json):>10}{len(as_binary):>12}{len(as_json) / len(as_binary):>7.1f}x'
+            f'{time_us(json.dumps, points):>15.1f}{time_us(encode_points, points):>14.1f}'
+            f'{time_us(json.loads, as_json):>15.1f}{time_us(decode_points, as_binary):>14.1f}{max_error:>9.3f}'
+        )
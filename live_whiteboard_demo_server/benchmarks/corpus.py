@@ -0,0 +1,36 @@
+"""Stroke corpus shared by the benchmarks, i.e. ``algorithms-lab/strokes/*.json``."""
+
+# imports
+import json
+from pathlib import Path
+from typing import Dict, List
+
+STROKES_DIR = Path(__file__).resolve().parent.parent.parent / 'algorithms-lab' / 'strokes'
+
+
+def load_strokes() -> Dict[str, List[dict]]:
+    strokes = {}
+
+    for path in sorted(STROKES_DIR.glob('*.json')):
+        try:
+            points = json.loads(path.read_text())
+        except json.JSONDecodeError:
+            continue  # e.g. square.json is only a fragment
+
+        if isinstance(points, list) and len(points) > 1:
+            strokes[path.stem] = points
+
+    return strokes
+
+
+def long_stroke(strokes: Dict[str, List[dict]], n_points: int = 2000) -> List[dict]:
+    """A stroke of ``n_points`` points made by chaining the corpus end to end."""
+    points = []
+    offset = 0
+
+    while len(points) < n_points:
+        for stroke in strokes.values():
+            points.extend({'x': p['x'] + offset, 'y': p['y']} for p in stroke)
+        offset += 10
+
+    return points[:n_points]
@@ -0,0 +1,198 @@
+"""
+Capacity load test: N drawing clients spread over M rooms against locally started server workers.
+
+Every client joins its room and keeps replaying the stroke corpus (``algorithms-lab/strokes/*.json``) at ``--rate``
+messages per second: it adds a stroke, drags it with ``--updates`` updates, and deletes its oldest strokes so it keeps
+at most ``--keep`` on the board. Each element carries the time it was sent, so every receiver measures the end-to-end
+broadcast latency (including the update coalescing tick).
+
+The result is printed as JSON: latency percentiles, messages per second sent and received, and the server RSS.
+Keep ``--rate`` below ``WHITEBOARD_RATE_LIMIT``, or the rate limiter drops the excess. The servers persist the rooms to a
+throwaway SQLite database.
+
+Usage (from the server directory):
+    python benchmarks/load_test.py --clients 64 --rooms 8 --rate 20 --duration 30
+"""
+
+# imports
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import time
+from collections import deque
+from pathlib import Path
+from typing import Dict, List
+
+import socketio
+
+from corpus import load_strokes
+from workers import start_servers, stop_servers, temporary_database
+
+
+# clients
+async def run_clients(ports: List[int], client_ids: List[int], n_rooms: int, duration: float, rate: float,
+                      n_updates: int, keep: int, strokes: List[List[dict]]) -> dict:
+    latencies = []
+    sent = received = 0
+    measuring = False
+    stop = asyncio.Event()
+
+    def on_element(data):
+        nonlocal received
+        if measuring:
+            received += 1
+            latencies.append(time.time() - data['element']['sent_at'])
+
+    def on_deleted(_):
+        nonlocal received
+        if measuring:
+            received += 1
+
+    async def connect(i: int) -> socketio.AsyncClient:
+        client = socketio.AsyncClient(reconnection=False)
+        client.on('drawn_element_added', on_element)
+        client.on('drawn_element_updated', on_element)
+        client.on('drawn_elements_deleted', on_deleted)
+        joined = asyncio.Event()
+        client.on('connected_to_room', lambda _: joined.set())
+
+        # like the web client, so the server doesn't simplify the strokes and echo them back to the author
+        await client.connect(f'http://127.0.0.1:{ports[i % len(ports)]}', transports=['websocket'],
+                             auth={'strokes': 'simplified'})
+        await client.emit('join_room', f'room-{i % n_rooms}')
+        await joined.wait()
+
+        return client
+
+    async def draw(client: socketio.AsyncClient, i: int):
+        nonlocal sent
+        room_id = f'room-{i % n_rooms}'
+        drawn = deque()
+        n = 0
+
+        async def send(event: str, data: dict):
+            nonlocal sent
+            await client.emit(event, data)
+            sent += measuring
+            await asyncio.sleep(1 / rate)
+
+        while not stop.is_set():
+            points = strokes[(i + n) % len(strokes)]
+            element = {'name': 'stroke', 'id': f'{i}-{n}', 'lineWidth': 2, 'color': '#000000', 'points': points}
+            n += 1
+
+            await send('add_drawn_element', {'room_id': room_id, 'element': {**element, 'sent_at': time.time()}})
+            drawn.append(element['id'])
+
+            for step in range(1, n_updates + 1):
+                if stop.is_set():
+                    break
+
+                moved = [{'x': p['x'] + step, 'y': p['y'] + step} for p in points]
+                await send('update_drawn_element', {
+                    'room_id': room_id, 'element': {**element, 'points': moved, 'sent_at': time.time()}
+                })
+
+            if len(drawn) > keep and not stop.is_set():
+                await send('delete_drawn_elements', {'room_id': room_id, 'element_ids': [drawn.popleft()]})
+
+    clients = await asyncio.gather(*[connect(i) for i in client_ids])
+    await asyncio.sleep(1)  # let every process finish joining
+
+    drawers = [asyncio.create_task(draw(client, i)) for client, i in zip(clients, client_ids)]
+    await asyncio.sleep(1)  # warm up
+    measuring = True
+    await asyncio.sleep(duration)
+    measuring = False
+    stop.set()
+    await asyncio.gather(*drawers)
+
+    await asyncio.gather(*[client.disconnect() for client in clients])
+
+    return {'latencies': latencies, 'sent': sent, 'received': received}
+
+
+def client_process(args) -> dict:
+    return asyncio.run(run_clients(*args))
+
+
+# report
+def percentile(values: List[float], q: float) -> float | None:
+    if not values:
+        return None
+
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def rss(pid: int) -> Dict[str, int]:
+    """Current and peak resident set size of a process, in KiB."""
+    status = dict(line.split(':', 1) for line in Path(f'/proc/{pid}/status').read_text().splitlines())
+
+    return {'rss_kib': int(status['VmRSS'].split()[0]), 'peak_rss_kib': int(status['VmHWM'].split()[0])}
+
+
+def load_test(args) -> dict:
+    strokes = list(load_strokes().values())
+
+    os.environ['WHITEBOARD_PERSISTENCE'] = '1' if args.persistence else '0'
+
+    ports = [args.port + i for i in range(args.workers)]
+    n_processes = min(os.cpu_count(), 4, args.clients)
+
+    with temporary_database():
+        processes = start_servers(args.workers, args.port)
+
+        try:
+            with multiprocessing.Pool(n_processes) as pool:
+                results = pool.map(client_process, [(
+                    ports, list(range(p, args.clients, n_processes)), args.rooms, args.duration, args.rate,
+                    args.updates, args.keep, strokes
+                ) for p in range(n_processes)])
+
+            # the broker (if any) is first, the workers are the last ``args.workers`` processes
+            memory = [rss(process.pid) for process in processes[-args.workers:]]
+        finally:
+            stop_servers(processes)
+
+    latencies = sorted(latency for result in results for latency in result['latencies'])
+
+    return {
+        'clients': args.clients,
+        'rooms': args.rooms,
+        'workers': args.workers,
+        'rate': args.rate,
+        'persistence': args.persistence,
+        'duration_s': args.duration,
+        'latency_ms': {
+            name: round(percentile(latencies, q) * 1000, 2) if latencies else None
+            for name, q in (('p50', 0.5), ('p95', 0.95), ('p99', 0.99))
+        },
+        'sent_per_s': round(sum(result['sent'] for result in results) / args.duration, 1),
+        'received_per_s': round(sum(result['received'] for result in results) / args.duration, 1),
+        'server_rss_kib': sum(m['rss_kib'] for m in memory),
+        'server_peak_rss_kib': sum(m['peak_rss_kib'] for m in memory),
+    }
+
+
+# main
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--clients', type=int, default=64)
+    parser.add_argument('--rooms', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=30)
+    parser.add_argument('--rate', type=float, default=20, help='messages per second sent by every client')
+    parser.add_argument('--updates', type=int, default=10, help='updates sent after adding each stroke')
+    parser.add_argument('--keep', type=int, default=20, help='strokes every client keeps on the board')
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--no-persistence', dest='persistence', action='store_false')
+    parser.add_argument('--port', type=int, default=8900)
+    parser.add_argument('--output', help='also write the JSON report to this file')
+    args = parser.parse_args()
+
+    report = json.dumps(load_test(args), indent=4)
+    print(report)
+
+    if args.output:
+        Path(args.output).write_text(report + '\n')
@@ -0,0 +1,96 @@
+"""
+Overhead of the handler instrumentation (``metrics.py``).
+
+Times the metric primitives on their own, then one socket handler dispatched through ``MainNamespace.trigger_event``
+(rate limiter + handler timing) against the plain ``AsyncNamespace`` dispatch of the same handler, and against the
+plain dispatch behind the rate limiter only, so the cost of the metrics is told apart from the limiter's.
+
+Usage (from the server directory):
+    python benchmarks/metrics.py --calls 100000 --repeat 5
+"""
+
+# imports
+import argparse
+import asyncio
+import os
+import sys
+import timeit
+from pathlib import Path
+
+SERVER_DIR = Path(__file__).resolve().parent.parent
+
+
+def bench_primitives(n: int) -> None:
+    from live_whiteboard_demo_server.metrics import Counter, Histogram, TIME_BUCKETS
+
+    histogram = Histogram('h', '', TIME_BUCKETS, ('event',))
+    counter = Counter('c', '', ('event',))
+
+    series = histogram.series_for('update_drawn_element')
+
+    observe = timeit.timeit(lambda: histogram.observe(0.0003, 'update_drawn_element'), number=n) / n
+    series_observe = timeit.timeit(lambda: series.observe(0.0003), number=n) / n
+    inc = timeit.timeit(lambda: counter.inc('update_drawn_element', amount=120), number=n) / n
+
+    print(f'Histogram.observe: {observe * 1e9:.0f} ns')
+    print(f'HistogramSeries.observe (kept at hand): {series_observe * 1e9:.0f} ns')
+    print(f'Counter.inc: {inc * 1e9:.0f} ns')
+
+
+def bench_dispatch(n: int, repeat: int) -> None:
+    import socketio
+    from django.conf import settings
+
+    settings.WHITEBOARD_PERSISTENCE = False
+    settings.WHITEBOARD_RATE_LIMIT = settings.WHITEBOARD_RATE_BURST = float('inf')
+
+    from live_whiteboard_demo_server import asgi
+
+    namespace = asgi.sio.namespace_handlers['/']
+    data = {
+        'room_id': 'room',
+        'element': {'name': 'line', 'id': 'a', 'start': {'x': 0, 'y': 0}, 'end': {'x': 10, 'y': 10}}
+    }
+
+    async def run(dispatch) -> float:
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+
+        for _ in range(n):
+            await dispatch('update_drawn_element', 'sid', data)
+
+        return (loop.time() - start) / n
+
+    async def plain(event, *args):
+        return await socketio.AsyncNamespace.trigger_event(namespace, event, *args)
+
+    async def limited(event, *args):
+        if asgi.limiter.allow(args[0]):
+            return await socketio.AsyncNamespace.trigger_event(namespace, event, *args)
+
+    # best of interleaved runs, the machine's noise is larger than the differences
+    dispatches = {'plain': plain, 'rate limited': limited, 'instrumented': namespace.trigger_event}
+    times = dict.fromkeys(dispatches, float('inf'))
+    for _ in range(repeat):
+        for name, dispatch in dispatches.items():
+            times[name] = min(times[name], asyncio.run(run(dispatch)))
+
+    for name, time in times.items():
+        print(f'update_drawn_element, {name} dispatch: {time * 1e6:.2f} us '
+              f'(+{(time - times["plain"]) * 1e9:.0f} ns, {time / times["plain"] - 1:+.1%})')
+
+    print(f'Metrics alone: +{(times["instrumented"] - times["rate limited"]) * 1e9:.0f} ns per event')
+
+
+# main
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--calls', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(SERVER_DIR))
+    os.environ['DJANGO_SETTINGS_MODULE'] = 'live_whiteboard_demo_server.settings'
+
+    bench_primitives(args.calls)
+    bench_dispatch(args.calls, args.repeat)
@@ -0,0 +1,61 @@
+"""
+Bytes on the wire for moving a stroke: a full ``drawn_element_updated`` resend versus a ``drawn_element_patched``
+translation.
+
+Sizes are of the encoded Socket.IO packets, as sent to every peer of the room.
+
+Usage (from the server directory):
+    python benchmarks/patch_bytes.py
+"""
+
+# imports
+import sys
+from pathlib import Path
+
+from socketio import packet
+
+from corpus import load_strokes, long_stroke
+
+SERVER_DIR = Path(__file__).resolve().parent.parent
+
+sys.path.insert(0, str(SERVER_DIR))
+
+from live_whiteboard_demo_server.patches import apply_patch  # noqa: E402
+
+
+def packet_size(event: str, data: dict) -> int:
+    return len(packet.Packet(packet.EVENT, data=[event, data]).encode())
+
+
+def stroke_element(element_id: str, points: list) -> dict:
+    return {
+        'name': 'stroke',
+        'id': element_id,
+        'points': points,
+        'lineType': 'simple',
+        'lineWidth': 2,
+        'color': '#000000'
+    }
+
+
+def compare(element: dict) -> (int, int):
+    ops = [['translate', 12.5, -7]]
+
+    element = apply_patch(element, ops)
+
+    full = packet_size('drawn_element_updated', {'element': element})
+    patch = packet_size('drawn_element_patched', {'element_id': element['id'], 'ops': ops})
+
+    return full, patch
+
+
+# main
+if __name__ == '__main__':
+    strokes = load_strokes()
+    strokes['long'] = long_stroke(strokes, n_points=2000)
+
+    print(f'{"Stroke":<12}{"Points":>8}{"Full (B)":>12}{"Patch (B)":>12}{"Ratio":>10}')
+
+    for name, points in strokes.items():
+        full, patch = compare(stroke_element(name, points))
+        print(f'{name:<12}{len(points):>8}{full:>12}{patch:>12}{full / patch:>9.1f}x')
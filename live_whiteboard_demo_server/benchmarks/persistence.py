@@ -0,0 +1,86 @@
+"""
+Sustained drawn element ops per second through the socket handlers with the room log (``boards/log.py``) on and off.
+
+The handlers are called directly in a fresh process per mode, against a throwaway SQLite database. With persistence
+on it also reports how fast the background writer drains the ops to disk.
+
+Usage (from the server directory):
+    python benchmarks/persistence.py --ops 50000
+"""
+
+# imports
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SERVER_DIR = Path(__file__).resolve().parent.parent
+
+
+def run(persistence: bool, n_ops: int, db_path: str) -> None:
+    sys.path.insert(0, str(SERVER_DIR))
+    os.environ['DJANGO_SETTINGS_MODULE'] = 'live_whiteboard_demo_server.settings'
+
+    from django.conf import settings
+
+    settings.DATABASES['default']['NAME'] = db_path
+    settings.WHITEBOARD_PERSISTENCE = persistence
+
+    from django.core.management import call_command
+    from live_whiteboard_demo_server import asgi
+
+    call_command('migrate', verbosity=0)
+
+    namespace = asgi.sio.namespace_handlers['/']
+    element = {'name': 'line', 'start': {'x': 0, 'y': 0}, 'end': {'x': 10, 'y': 10}, 'color': '#000000'}
+
+    async def drive():
+        start = time.perf_counter()
+
+        for i in range(n_ops):
+            room_id = f'room-{i % 16}'
+            element_id = str(i % 500)
+
+            match i % 10:
+                case 9:
+                    await namespace.on_delete_drawn_elements('sid', {'room_id': room_id, 'element_ids': [element_id]})
+                case 0 | 1 | 2:
+                    await namespace.on_add_drawn_element('sid', {
+                        'room_id': room_id, 'element': {**element, 'id': element_id}
+                    })
+                case _:
+                    await namespace.on_patch_drawn_element('sid', {
+                        'room_id': room_id, 'element_id': element_id, 'ops': [['translate', 1, 1]]
+                    })
+
+        return time.perf_counter() - start
+
+    duration = asyncio.run(drive())
+    print(f'Persistence {"on" if persistence else "off"}: {n_ops / duration:,.0f} ops/s through the handlers')
+
+    if asgi.log is not None:
+        start = time.perf_counter()
+        asgi.log.stop()
+        drain = time.perf_counter() - start
+
+        print(f'\tWriter: {n_ops / (duration + drain):,.0f} ops/s to disk ({drain:.3f} s to drain after the last op)')
+
+
+# main
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--ops', type=int, default=50000)
+    parser.add_argument('--mode', choices=['on', 'off'])
+    args = parser.parse_args()
+
+    if args.mode is not None:
+        with tempfile.TemporaryDirectory() as tmp:
+            run(args.mode == 'on', args.ops, os.path.join(tmp, 'db.sqlite3'))
+    else:
+        # every mode gets its own process, the settings are read when the server module is imported
+        for mode in ('off', 'on'):
+            subprocess.run([sys.executable, __file__, '--ops', str(args.ops), '--mode', mode], check=True)
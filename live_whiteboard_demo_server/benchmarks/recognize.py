@@ -0,0 +1,69 @@
+"""
+Server-side shape recognition (``recognize.py``) over the stroke corpus: what every stroke is recognized as, the payload
+bytes before and after, and the latency of ``recognize_stroke``. Exits with an error when the p99 latency is over the
+budget, so it can gate changes to the recognizer.
+
+Usage (from the server directory):
+    python benchmarks/recognize.py --tolerance 0.05 --min-score 0.85 --budget-ms 10
+"""
+
+# imports
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+from corpus import load_strokes, long_stroke
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from live_whiteboard_demo_server.recognize import recognize_stroke  # noqa: E402
+
+
+def json_size(element) -> int:
+    return len(json.dumps(element, separators=(',', ':')))
+
+
+# main
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--tolerance', type=float, default=0.05)
+    parser.add_argument('--min-score', type=float, default=0.85)
+    parser.add_argument('--repeat', type=int, default=200)
+    parser.add_argument('--budget-ms', type=float, default=10)
+    args = parser.parse_args()
+
+    strokes = load_strokes()
+    strokes['long'] = long_stroke(strokes)
+
+    print(f'{"stroke":>10} {"points":>7} {"recognized as":>14} {"JSON bytes":>15} {"p50 (us)":>9} {"max (us)":>9}')
+
+    latencies = []
+
+    for name, points in strokes.items():
+        element = {'name': 'stroke', 'id': name, 'points': points, 'lineType': 'simple', 'lineWidth': 2,
+                   'color': '#000000'}
+        shape = recognize_stroke(element, args.tolerance, args.min_score)
+
+        times = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            recognize_stroke(element, args.tolerance, args.min_score)
+            times.append(time.perf_counter() - start)
+
+        times.sort()
+        latencies.extend(times)
+
+        after = json_size(shape if shape is not None else element)
+        print(f'{name:>10} {len(points):>7} {shape["name"] if shape is not None else "-":>14} '
+              f'{json_size(element):>6} -> {after:<6} {times[len(times) // 2] * 1e6:>9.0f} {times[-1] * 1e6:>9.0f}')
+
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1e3
+    p99 = latencies[int(len(latencies) * 0.99)] * 1e3
+
+    print(f'\nLatency: p50 {p50:.3f} ms, p99 {p99:.3f} ms (budget {args.budget_ms:g} ms)')
+
+    if p99 > args.budget_ms:
+        sys.exit(f'p99 latency {p99:.3f} ms is over the {args.budget_ms:g} ms budget')
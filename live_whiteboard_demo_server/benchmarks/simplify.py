@@ -0,0 +1,57 @@
+"""
+Server-side stroke simplification (``simplify.py``) over the stroke corpus: payload bytes before and after, and the
+time it adds to ``add_drawn_element`` per stroke.
+
+Usage (from the server directory):
+    python benchmarks/simplify.py --iterations 4 --epsilon 0.75
+"""
+
+# imports
+import argparse
+import json
+import sys
+import timeit
+from pathlib import Path
+
+from corpus import load_strokes, long_stroke
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from live_whiteboard_demo_server.codec import encode_points  # noqa: E402
+from live_whiteboard_demo_server.simplify import simplify_stroke  # noqa: E402
+
+
+def json_size(points) -> int:
+    return len(json.dumps(points, separators=(',', ':')))
+
+
+# main
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--iterations', type=int, default=4)
+    parser.add_argument('--epsilon', type=float, default=0.75)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    strokes = load_strokes()
+    strokes['long'] = long_stroke(strokes)
+
+    print(f'{"stroke":>10} {"points":>13} {"JSON bytes":>15} {"binary bytes":>13} {"time (us)":>10}')
+
+    total_before = total_after = 0
+    times = []
+
+    for name, points in strokes.items():
+        simplified = simplify_stroke(points, args.iterations, args.epsilon)
+        t = timeit.timeit(lambda: simplify_stroke(points, args.iterations, args.epsilon), number=args.repeat)
+        times.append(t / args.repeat)
+
+        before, after = json_size(points), json_size(simplified)
+        total_before += before
+        total_after += after
+
+        print(f'{name:>10} {len(points):>6} -> {len(simplified):<4} {before:>6} -> {after:<6} '
+              f'{len(encode_points(points)):>5} -> {len(encode_points(simplified)):<5} {times[-1] * 1e6:>10.0f}')
+
+    print(f'\nJSON bytes: {total_before} -> {total_after} ({1 - total_after / total_before:.0%} smaller)')
+    print(f'Per stroke: mean {sum(times) / len(times) * 1e6:.0f} us, max {max(times) * 1e6:.0f} us')
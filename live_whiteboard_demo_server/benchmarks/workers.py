@@ -0,0 +1,185 @@
+"""
+Room fan-out throughput with 1, 2, 4 and 8 server workers sharing rooms through the local broker (``broker.py``).
+
+Each worker is a separate uvicorn process on its own port. Clients are spread round-robin over the workers (and over
+the rooms), so most deliveries cross a worker boundary. Every client keeps sending ``add_drawn_element`` for the
+duration of the run, and the benchmark reports how many broadcasts per second reach their receivers. The workers
+persist the rooms to a throwaway SQLite database.
+
+Usage (from the server directory):
+    python benchmarks/workers.py --clients 64 --rooms 8 --duration 10
+"""
+
+# imports
+import argparse
+import asyncio
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, List
+
+import socketio
+
+SERVER_DIR = Path(__file__).resolve().parent.parent
+BROKER_PATH = os.path.join(tempfile.gettempdir(), f'whiteboard-benchmark-{os.getuid()}', 'broker.sock')
+
+
+# servers
+def wait_for(address, family=socket.AF_INET, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+
+    while time.monotonic() < deadline:
+        with socket.socket(family) as s:
+            if s.connect_ex(address) == 0:
+                return
+        time.sleep(0.1)
+
+    raise TimeoutError(f'{address} did not come up in {timeout} s.')
+
+
+@contextmanager
+def temporary_database() -> Iterator[str]:
+    """
+    A throwaway, migrated SQLite database, which the servers started meanwhile use instead of the development one (they
+    inherit ``WHITEBOARD_DATABASE``).
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ['WHITEBOARD_DATABASE'] = os.path.join(tmp, 'db.sqlite3')
+
+        try:
+            subprocess.run([sys.executable, 'manage.py', 'migrate', '--verbosity', '0'], cwd=SERVER_DIR, check=True)
+            yield os.environ['WHITEBOARD_DATABASE']
+        finally:
+            del os.environ['WHITEBOARD_DATABASE']
+
+
+def start_servers(n_workers: int, base_port: int) -> List[subprocess.Popen]:
+    env = dict(os.environ)
+    processes = []
+
+    if n_workers > 1:
+        env['WHITEBOARD_MESSAGE_QUEUE'] = f'unix://{BROKER_PATH}'
+        processes.append(subprocess.Popen(
+            [sys.executable, '-m', 'live_whiteboard_demo_server.broker', BROKER_PATH], cwd=SERVER_DIR
+        ))
+        wait_for(BROKER_PATH, family=socket.AF_UNIX)
+
+    for i in range(n_workers):
+        processes.append(subprocess.Popen([
+            sys.executable, '-m', 'uvicorn', 'live_whiteboard_demo_server.asgi:application',
+            '--port', str(base_port + i), '--log-level', 'warning'
+        ], cwd=SERVER_DIR, env=env))
+
+    try:
+        for i in range(n_workers):
+            wait_for(('127.0.0.1', base_port + i))
+    except TimeoutError:
+        stop_servers(processes)
+        raise
+
+    return processes
+
+
+def stop_servers(processes: List[subprocess.Popen]) -> None:
+    # workers first, then the broker
+    for process in reversed(processes):
+        process.terminate()
+        process.wait()
+
+
+# clients
+async def run_clients(ports: List[int], client_ids: List[int], n_rooms: int, duration: float, rate: float) -> int:
+    received = 0
+    stop = asyncio.Event()
+
+    def on_added(_):
+        nonlocal received
+        received += 1
+
+    async def run_client(i: int):
+        client = socketio.AsyncClient(reconnection=False)
+        client.on('drawn_element_added', on_added)
+        joined = asyncio.Event()
+        client.on('connected_to_room', lambda _: joined.set())
+
+        # like the web client, so the server doesn't simplify the strokes and echo them back to the author
+        await client.connect(f'http://127.0.0.1:{ports[i % len(ports)]}', transports=['websocket'],
+                             auth={'strokes': 'simplified'})
+        await client.emit('join_room', f'room-{i % n_rooms}')
+        await joined.wait()
+
+        return client
+
+    clients = await asyncio.gather(*[run_client(i) for i in client_ids])
+    await asyncio.sleep(1)  # let every process finish joining
+
+    async def send(client: socketio.AsyncClient, i: int):
+        n = 0
+        while not stop.is_set():
+            await client.emit('add_drawn_element', {
+                'room_id': f'room-{i % n_rooms}',
+                'element': {'name': 'line', 'id': f'{i}-{n}', 'start': {'x': 0, 'y': 0}, 'end': {'x': n, 'y': n}}
+            })
+            n += 1
+            await asyncio.sleep(1 / rate)
+
+    received = 0
+    senders = [asyncio.create_task(send(client, i)) for client, i in zip(clients, client_ids)]
+    await asyncio.sleep(duration)
+    stop.set()
+    await asyncio.gather(*senders)
+
+    await asyncio.sleep(1)  # in-flight deliveries
+    await asyncio.gather(*[client.disconnect() for client in clients])
+
+    return received
+
+
+def client_process(args) -> int:
+    return asyncio.run(run_clients(*args))
+
+
+def measure(n_workers: int, n_clients: int, n_rooms: int, duration: float, rate: float, base_port: int) -> float:
+    ports = [base_port + i for i in range(n_workers)]
+
+    # the clients run in several processes too, so they are not the bottleneck
+    n_processes = min(os.cpu_count(), 4, n_clients)
+
+    with temporary_database():
+        processes = start_servers(n_workers, base_port)
+
+        try:
+            with multiprocessing.Pool(n_processes) as pool:
+                received = sum(pool.map(client_process, [
+                    (ports, list(range(p, n_clients, n_processes)), n_rooms, duration, rate)
+                    for p in range(n_processes)
+                ]))
+        finally:
+            stop_servers(processes)
+
+    return received / duration
+
+
+# main
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--clients', type=int, default=64)
+    parser.add_argument('--rooms', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--rate', type=float, default=50, help='messages per second sent by every client')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--port', type=int, default=8800)
+    args = parser.parse_args()
+
+    offered = args.clients * args.rate * (args.clients / args.rooms - 1)
+    print(f'Offered load: {offered:.0f} deliveries/s')
+
+    for n_workers in args.workers:
+        throughput = measure(n_workers, args.clients, args.rooms, args.duration, args.rate, args.port)
+        print(f'{n_workers} worker(s): {throughput:.0f} deliveries/s')
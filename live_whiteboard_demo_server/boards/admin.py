@@ -0,0 +1,6 @@
+from django.contrib import admin
+
+from boards.models import RoomOp, RoomSnapshot
+
+admin.site.register(RoomOp)
+admin.site.register(RoomSnapshot)
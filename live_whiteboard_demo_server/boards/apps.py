@@ -0,0 +1,18 @@
+from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+
+
+def enable_wal(sender, connection, **kwargs):
+    # the log writer appends from its own thread while the socket server reads rooms, WAL lets both go at once
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode=WAL;')
+            cursor.execute('PRAGMA synchronous=NORMAL;')
+
+
+class BoardsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'boards'
+
+    def ready(self):
+        connection_created.connect(enable_wal)
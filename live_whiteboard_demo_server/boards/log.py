@@ -0,0 +1,158 @@
+"""
+Append-only persistence of the rooms' boards.
+
+Socket handlers only put ops on a queue, a background thread writes them in batches (one transaction per batch) and
+every ``snapshot_every`` ops per room it compacts the room's log into a snapshot. A room is rebuilt from its snapshot
+plus the tail of the log written after it.
+
+An op can be put on the queue with a future, which is resolved with the op's id once its batch is committed; ``flush``
+puts a future alone, which is resolved once everything queued before it is written. Ids only
+grow (and the log is read in one transaction), so a reader which got to ``last_op_id`` has every op with an id up to
+it, and none after it.
+"""
+
+# imports
+import asyncio
+import logging
+import queue
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.db import transaction
+
+from boards.models import RoomOp, RoomSnapshot
+
+logger = logging.getLogger(__name__)
+
+STOP = None
+
+
+def load_elements(room_id: str) -> Tuple[Dict[str, dict], int]:
+    """Returns the room's elements by id and the id of the last op applied to them."""
+    snapshot = RoomSnapshot.objects.filter(room_id=room_id).first()
+
+    elements = {element['id']: element for element in snapshot.elements} if snapshot else {}
+    last_op_id = snapshot.last_op_id if snapshot else 0
+
+    for op in RoomOp.objects.filter(room_id=room_id, id__gt=last_op_id).order_by('id'):
+        if op.op == RoomOp.DELETE:
+            elements.pop(op.element_id, None)
+        else:
+            elements[op.element_id] = op.element
+
+        last_op_id = op.id
+
+    return elements, last_op_id
+
+
+def load_room(room_id: str) -> Tuple[List[dict], int]:
+    """Returns the room's elements and the id of the last op applied to them."""
+    # the snapshot and the ops after it are read together, so a compaction in between can't lose any
+    with transaction.atomic():
+        elements, last_op_id = load_elements(room_id)
+
+    return list(elements.values()), last_op_id
+
+
+def resolve(written: asyncio.Future, op_id: Optional[int]) -> None:
+    if not written.done():
+        written.set_result(op_id)
+
+
+class RoomLogWriter(threading.Thread):
+    def __init__(self, batch_size: int = 500, snapshot_every: int = 1000) -> None:
+        super().__init__(name='room-log-writer', daemon=True)
+
+        self.batch_size = batch_size
+        self.snapshot_every = snapshot_every
+        self.queue = queue.SimpleQueue()
+
+        # ops written per room since its last snapshot
+        self.tail_sizes: Dict[str, int] = {}
+
+    # called from the socket handlers, never blocks
+    def add(self, room_id: str, element: dict, written: Optional[asyncio.Future] = None) -> None:
+        # a shallow copy is enough, patches replace the nested values instead of mutating them
+        self.queue.put((room_id, RoomOp.ADD, element['id'], dict(element), written))
+
+    def update(self, room_id: str, element: dict, written: Optional[asyncio.Future] = None) -> None:
+        self.queue.put((room_id, RoomOp.UPDATE, element['id'], dict(element), written))
+
+    def delete(self, room_id: str, element_ids: Iterable[str], written: Optional[asyncio.Future] = None) -> None:
+        element_ids = list(element_ids)
+
+        # the future is resolved with the last of the ops
+        for i, element_id in enumerate(element_ids):
+            self.queue.put((room_id, RoomOp.DELETE, element_id, None, written if i == len(element_ids) - 1 else None))
+
+        if not element_ids and written is not None:
+            resolve(written, None)
+
+    def flush(self, written: asyncio.Future) -> None:
+        self.queue.put(written)
+
+    def stop(self) -> None:
+        self.queue.put(STOP)
+        self.join()
+
+    # writer thread
+    def run(self) -> None:
+        while True:
+            # whatever piled up while the previous batch was written goes into the next one
+            batch = [self.queue.get()]
+
+            while len(batch) < self.batch_size and not self.queue.empty():
+                batch.append(self.queue.get())
+
+            stopping = STOP in batch
+            flushes = [item for item in batch if isinstance(item, asyncio.Future)]
+            batch = [item for item in batch if item is not STOP and not isinstance(item, asyncio.Future)]
+
+            try:
+                op_ids = self.write(batch)
+            except Exception:
+                logger.exception('Writing %d room ops failed.', len(batch))
+                op_ids = [None] * len(batch)
+
+            # a lost op has no id, its readers can't have it
+            for (*_, written), op_id in zip(batch, op_ids):
+                if written is not None:
+                    written.get_loop().call_soon_threadsafe(resolve, written, op_id)
+
+            for written in flushes:
+                written.get_loop().call_soon_threadsafe(resolve, written, None)
+
+            if stopping:
+                return
+
+    def write(self, batch: List[tuple]) -> List[int]:
+        """Writes the batch, returns the ids of its ops."""
+        if not batch:
+            return []
+
+        with transaction.atomic():
+            ops = RoomOp.objects.bulk_create([
+                RoomOp(room_id=room_id, op=op, element_id=element_id, element=element)
+                for room_id, op, element_id, element, _ in batch
+            ])
+
+        for room_id, *_ in batch:
+            self.tail_sizes[room_id] = self.tail_sizes.get(room_id, 0) + 1
+
+        for room_id in {room_id for room_id, *_ in batch}:
+            if self.tail_sizes[room_id] >= self.snapshot_every:
+                self.compact(room_id)
+
+        return [op.id for op in ops]
+
+    def compact(self, room_id: str) -> None:
+        with transaction.atomic():
+            elements, last_op_id = load_elements(room_id)
+
+            RoomSnapshot.objects.update_or_create(room_id=room_id, defaults={
+                'last_op_id': last_op_id,
+                'elements': list(elements.values())
+            })
+            RoomOp.objects.filter(room_id=room_id, id__lte=last_op_id).delete()
+
+        self.tail_sizes[room_id] = 0
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.4 on 2026-10-18 12:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RoomSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('room_id', models.CharField(max_length=255, unique=True)),
+                ('last_op_id', models.BigIntegerField()),
+                ('elements', models.JSONField(default=list)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='RoomOp',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('room_id', models.CharField(max_length=255)),
+                ('op', models.CharField(choices=[('add', 'Add'), ('update', 'Update'), ('delete', 'Delete')], max_length=6)),
+                ('element_id', models.CharField(max_length=255)),
+                ('element', models.JSONField(null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['room_id', 'id'], name='boards_room_room_id_5f5fd7_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+from django.db import models
+
+
+class RoomOp(models.Model):
+    """One add, update or delete of a drawn element. The log is append-only, ``id`` orders it."""
+
+    ADD = 'add'
+    UPDATE = 'update'
+    DELETE = 'delete'
+    OPS = [(ADD, 'Add'), (UPDATE, 'Update'), (DELETE, 'Delete')]
+
+    room_id = models.CharField(max_length=255)
+    op = models.CharField(max_length=6, choices=OPS)
+    element_id = models.CharField(max_length=255)
+    element = models.JSONField(null=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['room_id', 'id'])]
+
+    def __str__(self):
+        return f'{self.room_id}: {self.op} {self.element_id}'
+
+
+class RoomSnapshot(models.Model):
+    """Compacted state of a room, i.e. all its ops up to and including ``last_op_id`` applied."""
+
+    room_id = models.CharField(max_length=255, unique=True)
+    last_op_id = models.BigIntegerField()
+    elements = models.JSONField(default=list)
+
+    def __str__(self):
+        return f'{self.room_id} @ {self.last_op_id}'
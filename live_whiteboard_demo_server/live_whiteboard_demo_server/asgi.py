@@ -2,15 +2,500 @@
 ASGI config for live_whiteboard_demo_server project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+The Socket.IO server runs natively on asyncio here, so every connection is a
+coroutine instead of a blocking thread (compare with ``wsgi.py``). All traffic
+which is not for Socket.IO is forwarded to the regular Django application.
+
+Run with:
+    uvicorn live_whiteboard_demo_server.asgi:application --port 8000
 
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
 """
 
+# imports
+import asyncio
+import json
 import os
+import time
+from typing import Dict, List, Set, Tuple
 
+import socketio
+from django.conf import settings
 from django.core.asgi import get_asgi_application
 
+from live_whiteboard_demo_server.backpressure import BackpressureServer, RateLimiter
+from live_whiteboard_demo_server.coalescing import UpdateCoalescer
+from live_whiteboard_demo_server.codec import BINARY, decode_element, decode_ops, encode_payload
+from live_whiteboard_demo_server.managers import SharedRoomsMixin, client_manager
+from live_whiteboard_demo_server.metrics import (Gauge, MetricsMixin, dropped_events, fan_out, handler_seconds,
+                                                 registry)
+from live_whiteboard_demo_server.patches import apply_patch
+from live_whiteboard_demo_server.recognize import recognize_stroke
+from live_whiteboard_demo_server.rooms import RoomStore
+from live_whiteboard_demo_server.simplify import simplify_stroke
+
+# ---
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'live_whiteboard_demo_server.settings')
 
-application = get_asgi_application()
+# django ASGI application
+django_app = get_asgi_application()
+
+# the models can only be imported once django is set up
+from boards.log import RoomLogWriter, load_room  # noqa: E402
+
+# socket io server
+class WhiteboardServer(MetricsMixin, BackpressureServer):
+    pass
+
+
+sio = WhiteboardServer(
+    async_mode='asgi',
+    cors_allowed_origins='*',
+    client_manager=client_manager(settings.WHITEBOARD_MESSAGE_QUEUE),
+    slow_queue=settings.WHITEBOARD_SLOW_CLIENT_QUEUE,
+    max_queue=settings.WHITEBOARD_MAX_CLIENT_QUEUE,
+    drain_hz=settings.WHITEBOARD_UPDATE_FLUSH_HZ
+)
+
+# inbound events allowed per client
+limiter = RateLimiter(
+    settings.WHITEBOARD_RATE_LIMIT,
+    settings.WHITEBOARD_RATE_BURST,
+    release_hz=settings.WHITEBOARD_UPDATE_FLUSH_HZ
+)
+
+# authoritative board state of every room
+rooms = RoomStore()
+
+# clients which negotiated the binary geometry codec
+binary_sids: Set[str] = set()
+
+# clients which smooth and simplify their strokes themselves, the others' strokes are simplified by the server
+simplifying_sids: Set[str] = set()
+
+# persisted room log, rooms are loaded from it when they are first joined
+log = RoomLogWriter(
+    batch_size=settings.WHITEBOARD_LOG_BATCH_SIZE,
+    snapshot_every=settings.WHITEBOARD_SNAPSHOT_EVERY
+) if settings.WHITEBOARD_PERSISTENCE else None
+loading_rooms: Dict[str, asyncio.Future] = {}
+# (event, data, room) of the other workers' changes to the rooms being loaded, applied once they are
+remote_changes: Dict[str, List[Tuple[str, dict, str]]] = {}
+
+
+async def write_to_log(op: str, room_id: str, *args) -> int | None:
+    """
+    Puts a change on the room log. When other workers share the rooms, it is broadcast only once it's written, so a
+    worker which reads the room from the database later has it: this waits for the write and returns the op's id.
+    """
+    if log is None:
+        return None
+
+    if settings.WHITEBOARD_MESSAGE_QUEUE is None:
+        getattr(log, op)(room_id, *args)
+        return None
+
+    written = asyncio.get_running_loop().create_future()
+    getattr(log, op)(room_id, *args, written=written)
+    return await written
+
+
+async def ensure_room_loaded(room_id: str):
+    if log is None or room_id in rooms:
+        return
+
+    # the database is read in a worker thread, so the event loop never waits for the disk
+    if room_id not in loading_rooms:
+        loading_rooms[room_id] = asyncio.ensure_future(asyncio.to_thread(load_room, room_id))
+
+    try:
+        elements, last_op_id = await asyncio.shield(loading_rooms[room_id])
+    finally:
+        loading_rooms.pop(room_id, None)
+        changes = remote_changes.pop(room_id, [])
+
+    if room_id not in rooms:
+        rooms.load(room_id, elements)
+
+        # adds, updates and deletes carry the whole new state and are simply applied again, but a patch applied twice
+        # would e.g. move an element twice: the ones the database had are skipped
+        for event, data, room in changes:
+            if event != 'drawn_element_patched' or data.get('op_id') is None or data['op_id'] > last_op_id:
+                apply_remote_emit(event, data, room)
+
+
+# besides the room itself, every client is in exactly one of these, so each codec can be addressed on its own
+def json_room(room_id: str) -> str:
+    return f'{room_id}/json'
+
+
+def binary_room(room_id: str) -> str:
+    return f'{room_id}/{BINARY}'
+
+
+def room_members(room_id: str) -> dict:
+    """The clients of this worker in the room."""
+    return sio.manager.rooms.get('/', {}).get(room_id, {})
+
+
+def observe_fan_out(event: str, room_id: str, skip_sid: str | None):
+    members = room_members(room_id)
+    fan_out.observe(len(members) - (skip_sid in members), event)
+
+
+async def emit_to_room(event: str, data: dict, room_id: str, skip_sid: str | None = None):
+    observe_fan_out(event, room_id, skip_sid)
+
+    # with a message queue the binary members may be connected to another worker, so it can't be skipped
+    send_binary = settings.WHITEBOARD_MESSAGE_QUEUE is not None or binary_room(room_id) in sio.manager.rooms.get('/', {})
+
+    # both payloads are built before the first await, so they are of the element as it is now, whatever the handlers
+    # which run meanwhile do to the room
+    binary_data = encode_payload(data) if send_binary else None
+    await sio.emit(event, data, room=json_room(room_id), skip_sid=skip_sid)
+
+    if send_binary:
+        await sio.emit(event, binary_data, room=binary_room(room_id), skip_sid=skip_sid)
+
+
+async def flush_element_update(room_id: str, sid: str, element: dict):
+    await write_to_log('update', room_id, element)
+    await emit_to_room('drawn_element_updated', {
+        'element': element
+    }, room_id, skip_sid=sid)
+
+
+async def evict_room(room_id: str):
+    """
+    Drops a room nobody on this worker is in any more, once all its changes are in the room log: it's read from the
+    database again when it's next needed. Its per-room metrics series go with it.
+    """
+    # the updates still waiting for the broadcast tick are sent (to the other workers' clients) and logged first
+    for sid, element in updates.pop_room(room_id).values():
+        await flush_element_update(room_id, sid, element)
+
+    written = asyncio.get_running_loop().create_future()
+    log.flush(written)
+    await written
+
+    # somebody may have joined meanwhile
+    if not room_members(room_id) and room_id not in updates.pending:
+        rooms.evict(room_id)
+
+
+def apply_remote_emit(event: str, data: dict, room: str):
+    """Applies the board changes broadcast by the other workers to this worker's room state."""
+    if not isinstance(room, str):
+        return
+
+    # deletes are sent to the whole room, the other changes to each codec's room (the JSON one is applied)
+    if event == 'drawn_elements_deleted':
+        room_id = room
+    else:
+        room_id, _, codec = room.rpartition('/')
+        if codec != 'json':
+            return
+
+    if log is not None and room_id not in rooms:
+        # the changes are written before they're broadcast, but maybe after the room started to be read from the
+        # database, so they are applied after it; a room which isn't being loaded is read (with them) when it's needed
+        if room_id in loading_rooms:
+            remote_changes.setdefault(room_id, []).append((event, data, room))
+        return
+
+    match event:
+        case 'drawn_element_added':
+            rooms.add(room_id, data['element'])
+        case 'drawn_element_updated':
+            rooms.update(room_id, data['element'])
+        case 'drawn_element_patched':
+            if (element := rooms.get(room_id, data['element_id'])) is not None:
+                rooms.update(room_id, apply_patch(element, data['ops']))
+        case 'drawn_elements_deleted':
+            rooms.delete(room_id, data['element_ids'])
+            updates.discard(room_id, data['element_ids'])
+
+
+def deferred_update(sid: str, element_id: str) -> dict | None:
+    """The update which brings a slow client up to date with an element, once its queue has drained."""
+    for room_id in sio.rooms(sid):
+        if (element := rooms.get(room_id, element_id)) is not None:
+            data = {'element': element}
+            return encode_payload(data) if sid in binary_sids else data
+
+    return None
+
+
+# drawn element updates waiting for the next broadcast tick
+updates = UpdateCoalescer(flush_element_update, flush_hz=settings.WHITEBOARD_UPDATE_FLUSH_HZ)
+
+if isinstance(sio.manager, SharedRoomsMixin):
+    sio.manager.on_remote_emit = apply_remote_emit
+
+sio.deferred_update = deferred_update
+
+registry.register(Gauge(
+    'whiteboard_connected_clients', 'Clients connected to this worker.',
+    lambda: {(): len(sio.eio.sockets)}
+))
+# the per-room series are collected from the rooms at every scrape, so an evicted room's are gone with it
+registry.register(Gauge(
+    'whiteboard_room_clients', 'Clients in a room connected to this worker.',
+    lambda: {(room_id,): len(room_members(room_id)) for room_id in rooms.rooms},
+    ('room',)
+))
+registry.register(Gauge(
+    'whiteboard_room_elements', 'Drawn elements on a room\'s board.',
+    lambda: {(room_id,): len(elements) for room_id, elements in rooms.rooms.items()},
+    ('room',)
+))
+
+
+def updated_element_id(data=None, *args) -> str | None:
+    """The id of the element an ``update_drawn_element`` is about, None if it's malformed."""
+    try:
+        return str(data['element']['id'])
+    except (KeyError, TypeError):
+        return None
+
+
+def too_many_points(element: dict) -> bool:
+    return element.get('name') == 'stroke' and len(element.get('points', ())) > settings.WHITEBOARD_STROKE_MAX_POINTS
+
+
+def invalid_element(sid: str, error: Exception) -> dict:
+    """Drops the element (e.g. its points don't decode): the acknowledgement tells the client why."""
+    sio.logger.warning('Dropping an invalid element from client %s: %r', sid, error)
+    return {'error': f'Invalid element: {error!r}'}
+
+
+def stroke_too_long(sid: str, element: dict) -> dict:
+    """Drops the stroke: the acknowledgement tells the client why (if it asked for one)."""
+    sio.logger.warning('Dropping a stroke of %d points from client %s', len(element['points']), sid)
+    return {'error': f'Too many points: {len(element["points"])} (at most {settings.WHITEBOARD_STROKE_MAX_POINTS})'}
+
+
+# events
+class MainNamespace(socketio.AsyncNamespace):
+    def __init__(self, namespace=None):
+        super().__init__(namespace)
+
+        # only the events with a handler get their own label, so clients can't add series by making events up, and
+        # their timing series are kept at hand
+        self.timers = {name[3:]: handler_seconds.series_for(name[3:]) for name in dir(self) if name.startswith('on_')}
+
+    async def trigger_event(self, event, *args):
+        if event in ('connect', 'disconnect'):
+            return await self.handle_event(event, *args)
+
+        sid = args[0]
+        if not limiter.allow(sid, sio.logger):
+            # beyond a client's rate, only the latest update of every element is kept, it's handled once the client
+            # has tokens again; the other events can't be skipped, so the client is told they were refused
+            if event == 'update_drawn_element' and (element_id := updated_element_id(*args[1:])) is not None:
+                limiter.hold(sid, element_id, (event, *args))
+                return
+
+            dropped_events.inc(event if event in self.timers else 'other')
+            return {'error': f'Rate limit exceeded: at most {settings.WHITEBOARD_RATE_LIMIT} events/s'}
+
+        # the held back updates go first, the event may be e.g. a patch of their element
+        if sid in limiter.held:
+            for held in limiter.release(sid):
+                await self.handle_event(*held)
+
+        return await self.handle_event(event, *args)
+
+    async def handle_event(self, event, *args):
+        timer = self.timers.get(event)
+
+        # events without a handler do nothing, so they aren't timed
+        if timer is None:
+            return await super().trigger_event(event, *args)
+
+        start = time.perf_counter()
+        try:
+            return await super().trigger_event(event, *args)
+        finally:
+            timer.observe(time.perf_counter() - start)
+
+    def on_connect(self, sid, environ, auth=None):
+        # the broadcast ticks need a running event loop, so they are started by the first connection
+        updates.start(sio)
+        sio.start_draining()
+        limiter.start(sio, self.handle_event)
+
+        if auth and auth.get('codec') == BINARY:
+            binary_sids.add(sid)
+        if auth and auth.get('strokes') == 'simplified':
+            simplifying_sids.add(sid)
+
+    async def on_join_room(self, sid, room_id):
+        await ensure_room_loaded(room_id)
+        self.enter_room(sid, room_id)
+
+        data = {
+            'room_id': room_id,
+            'elements': rooms.snapshot(room_id)
+        }
+
+        if sid in binary_sids:
+            self.enter_room(sid, binary_room(room_id))
+            data = encode_payload(data)
+        else:
+            self.enter_room(sid, json_room(room_id))
+
+        await self.emit('connected_to_room', data, to=sid)
+
+    async def on_send_msg(self, sid, data: str | dict):
+        if isinstance(data, str):
+            data: dict = json.loads(data)
+
+        await self.emit('msg', {
+            'text': data['text'],
+            'sid': sid
+        }, room=data['room_id'], skip_sid=sid)
+
+    async def on_add_drawn_element(self, sid, data):
+        try:
+            element = decode_element(data['element'])
+        except (KeyError, TypeError, ValueError) as error:
+            return invalid_element(sid, error)
+
+        if too_many_points(element):
+            return stroke_too_long(sid, element)
+
+        # a room this worker has not loaded yet would otherwise start empty, and never be read from the database
+        await ensure_room_loaded(data['room_id'])
+
+        simplified = False
+        if element.get('name') == 'stroke' and sid not in simplifying_sids:
+            # in a thread, long strokes take tens of ms and the other clients would wait for them
+            points = await asyncio.to_thread(
+                simplify_stroke,
+                element['points'],
+                settings.WHITEBOARD_STROKE_ITERATIONS,
+                settings.WHITEBOARD_STROKE_EPSILON
+            )
+
+            simplified = points is not element['points']
+            element = {**element, 'points': points}
+
+        rooms.add(data['room_id'], element)
+        await write_to_log('add', data['room_id'], element)
+
+        await emit_to_room('drawn_element_added', {
+            'element': element
+        }, data['room_id'], skip_sid=sid)
+
+        # the author gets the simplified stroke too, so its board matches everybody else's
+        if simplified:
+            update = {'element': element}
+            await self.emit('drawn_element_updated', encode_payload(update) if sid in binary_sids else update, to=sid)
+
+    async def on_recognize_stroke(self, sid, data):
+        try:
+            element = decode_element(data['element'])
+        except (KeyError, TypeError, ValueError) as error:
+            return invalid_element(sid, error)
+
+        if too_many_points(element):
+            return stroke_too_long(sid, element)
+
+        # only answers the author, who adds the shape (or the stroke, when it's None) with add_drawn_element
+        return {
+            'element': recognize_stroke(
+                element,
+                settings.WHITEBOARD_RECOGNITION_TOLERANCE,
+                settings.WHITEBOARD_RECOGNITION_MIN_SCORE
+            )
+        }
+
+    async def on_update_drawn_element(self, sid, data):
+        try:
+            element = decode_element(data['element'])
+        except (KeyError, TypeError, ValueError) as error:
+            return invalid_element(sid, error)
+
+        if too_many_points(element):
+            return stroke_too_long(sid, element)
+
+        await ensure_room_loaded(data['room_id'])
+        rooms.update(data['room_id'], element)
+        updates.push(data['room_id'], sid, element)
+
+    async def on_patch_drawn_element(self, sid, data):
+        # an invalid patch is dropped, and the client told so in the acknowledgement (if it asked for one)
+        try:
+            room_id, element_id = data['room_id'], data['element_id']
+            await ensure_room_loaded(room_id)
+
+            element = rooms.get(room_id, element_id)
+            if element is None:
+                return
+
+            ops = decode_ops(data['ops'])
+            element = apply_patch(element, ops)
+            if too_many_points(element):
+                return stroke_too_long(sid, element)
+        except (KeyError, TypeError, ValueError) as error:
+            sio.logger.warning('Dropping an invalid patch from client %s: %r', sid, error)
+            return {'error': f'Invalid patch: {error!r}'}
+
+        # a new dict, so the broadcasts of the previous version still waiting to be sent are left as they were
+        rooms.update(room_id, element)
+
+        # peers have not seen the pending full update yet, so it is sent with the patch already applied instead
+        # (to everyone but its author, unless somebody else authored the pending update)
+        pending = updates.pop(room_id, element_id)
+        if pending is not None:
+            updates.push(room_id, sid if pending[0] == sid else None, element)
+            return
+
+        data = {
+            'element_id': element_id,
+            'ops': ops
+        }
+
+        # a worker which is reading the room from the database tells by the id whether it has the patch already
+        if (op_id := await write_to_log('update', room_id, element)) is not None:
+            data['op_id'] = op_id
+
+        await emit_to_room('drawn_element_patched', data, room_id, skip_sid=sid)
+
+    async def on_delete_drawn_elements(self, sid, data):
+        await ensure_room_loaded(data['room_id'])
+        rooms.delete(data['room_id'], data['element_ids'])
+        updates.discard(data['room_id'], data['element_ids'])
+        await write_to_log('delete', data['room_id'], data['element_ids'])
+
+        observe_fan_out('drawn_elements_deleted', data['room_id'], sid)
+        await self.emit('drawn_elements_deleted', {
+            'element_ids': data['element_ids']
+        }, room=data['room_id'], skip_sid=sid)
+
+    def on_disconnect(self, sid):
+        binary_sids.discard(sid)
+        simplifying_sids.discard(sid)
+        limiter.forget(sid)
+
+        # without the room log, a room's board would be lost, so only persisted rooms are dropped
+        if log is not None:
+            for room_id in sio.rooms(sid):
+                if room_id in rooms and room_members(room_id).keys() <= {sid}:
+                    sio.start_background_task(evict_room, room_id)
+
+
+sio.register_namespace(MainNamespace('/'))
+
+if log is not None:
+    log.start()
+
+# socket.io + django ASGI application
+application = socketio.ASGIApp(
+    sio,
+    other_asgi_app=django_app,
+    # flushes the room log ops still queued
+    on_shutdown=log.stop if log is not None else None
+)
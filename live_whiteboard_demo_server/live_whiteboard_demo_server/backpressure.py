@@ -0,0 +1,190 @@
+"""
+Per-client flow control, so a single client can't degrade a whole room.
+
+Inbound, every client gets a token bucket and the events it sends beyond its rate are refused, except element updates:
+the latest one of every element is held back and handled once the client has tokens again, so the end of a drag is
+never lost. Outbound, the depth of every client's engine.io packet queue is watched. A slow consumer stops getting
+element updates and patches; only the ids of the changed elements are remembered, and the latest version of each is
+sent once its queue has drained, so intermediate states are skipped instead of piling up in server memory. Adds and
+deletes can't be dropped, so a client whose queue still grows past the hard limit is disconnected (it gets the room
+snapshot again when it rejoins).
+"""
+
+# imports
+import time
+from typing import Awaitable, Callable, Dict, Hashable, List, Set
+
+import socketio
+
+from live_whiteboard_demo_server.metrics import deferred_updates
+
+# (sid, element id) -> payload of a 'drawn_element_updated' with the element's current version for that client
+DeferredUpdate = Callable[[str, str], dict | None]
+
+# events which only move an element to a newer version, so a later version makes them redundant
+COALESCED_EVENTS = {'drawn_element_updated', 'drawn_element_patched'}
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def take(self) -> bool:
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+        if self.tokens < 1:
+            return False
+
+        self.tokens -= 1
+        return True
+
+
+class RateLimiter:
+    """
+    A token bucket per client. ``rate`` is in events per second, ``burst`` is how many may arrive at once.
+
+    An event which is made redundant by a newer one of the same ``key`` (e.g. the updates of an element) can be held
+    back instead of refused: only the latest is kept, and it's handed back by ``release``, either before the client's
+    next allowed event or by the ``release_hz`` tick, once the client has a token again.
+    """
+
+    def __init__(self, rate: float, burst: float, release_hz: float = 30) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.interval = 1 / release_hz
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.limited: Set[str] = set()
+        # sid -> key -> (event, *args) of the latest event held back
+        self.held: Dict[str, Dict[Hashable, tuple]] = {}
+        self.started = False
+
+    def allow(self, sid: str, logger=None) -> bool:
+        if sid not in self.buckets:
+            self.buckets[sid] = TokenBucket(self.rate, self.burst)
+
+        if self.buckets[sid].take():
+            self.limited.discard(sid)
+            return True
+
+        # logged once per burst, not once per refused event
+        if sid not in self.limited and logger is not None:
+            logger.warning('Client %s exceeds %s events/s, refusing its events.', sid, self.rate)
+
+        self.limited.add(sid)
+        return False
+
+    def hold(self, sid: str, key: Hashable, event: tuple) -> None:
+        self.held.setdefault(sid, {})[key] = event
+
+    def release(self, sid: str) -> List[tuple]:
+        return list(self.held.pop(sid, {}).values())
+
+    def forget(self, sid: str) -> None:
+        self.buckets.pop(sid, None)
+        self.limited.discard(sid)
+        self.held.pop(sid, None)
+
+    def start(self, sio: socketio.AsyncServer, handle: Callable[..., Awaitable]) -> None:
+        """Hands the held back events to ``handle(event, *args)`` once their clients have a token again."""
+        if self.started:
+            return
+
+        self.started = True
+        sio.start_background_task(self._run, sio, handle)
+
+    async def _run(self, sio: socketio.AsyncServer, handle: Callable[..., Awaitable]) -> None:
+        while True:
+            await sio.sleep(self.interval)
+
+            # one token for all the held back events of a client, there's at most one per element
+            for sid in [sid for sid in self.held if self.allow(sid)]:
+                for event in self.release(sid):
+                    try:
+                        await handle(*event)
+                    except Exception:
+                        sio.logger.exception('Handling a held back %s event failed.', event[0])
+
+
+class BackpressureServer(socketio.AsyncServer):
+    """
+    Socket.IO server which holds back element updates from clients with more than ``slow_queue`` packets waiting to
+    be sent, and disconnects clients with more than ``max_queue``.
+
+    ``deferred_update`` builds the update which replaces the held back ones, it's called once the queue has drained.
+    """
+
+    def __init__(self, *args, slow_queue: int, max_queue: int, drain_hz: float, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.slow_queue = slow_queue
+        self.max_queue = max_queue
+        self.drain_interval = 1 / drain_hz
+        self.deferred_update: DeferredUpdate | None = None
+        # eio sid -> ids of the elements whose updates were held back
+        self.deferred: Dict[str, Set[str]] = {}
+        self.dropping: Set[str] = set()
+        self.draining = False
+
+    def queue_depth(self, eio_sid: str) -> int:
+        socket = self.eio.sockets.get(eio_sid)
+
+        return socket.queue.qsize() if socket is not None else 0
+
+    async def _emit_internal(self, eio_sid, event, data, namespace=None, id=None):
+        depth = self.queue_depth(eio_sid)
+
+        if depth >= self.max_queue:
+            if eio_sid not in self.dropping:
+                self.dropping.add(eio_sid)
+                self.logger.warning('Client %s has %d packets queued, disconnecting it.', eio_sid, depth)
+                self.start_background_task(self.eio.disconnect, eio_sid)
+            return
+
+        if event in COALESCED_EVENTS:
+            element_id = data['element']['id'] if 'element' in data else data['element_id']
+            deferred = self.deferred.get(eio_sid)
+
+            # once an element is held back, its patches must wait too (they'd apply to a version the client lacks)
+            if depth >= self.slow_queue or (deferred is not None and element_id in deferred):
+                self.deferred.setdefault(eio_sid, set()).add(element_id)
+                deferred_updates.inc()
+                return
+        elif event == 'drawn_elements_deleted' and eio_sid in self.deferred:
+            self.deferred[eio_sid].difference_update(data['element_ids'])
+
+        await super()._emit_internal(eio_sid, event, data, namespace, id)
+
+    async def drain(self) -> None:
+        for eio_sid in list(self.deferred):
+            if eio_sid not in self.eio.sockets:
+                del self.deferred[eio_sid]
+                self.dropping.discard(eio_sid)
+            elif self.queue_depth(eio_sid) < self.slow_queue // 2:
+                element_ids = self.deferred.pop(eio_sid)
+                sid = self.manager.sid_from_eio_sid(eio_sid, '/')
+
+                for element_id in element_ids:
+                    if sid is not None and (data := self.deferred_update(sid, element_id)) is not None:
+                        await self._emit_internal(eio_sid, 'drawn_element_updated', data, '/')
+
+        self.dropping.intersection_update(self.eio.sockets)
+
+    def start_draining(self) -> None:
+        if self.draining:
+            return
+
+        self.draining = True
+        self.start_background_task(self._drain_forever)
+
+    async def _drain_forever(self) -> None:
+        while True:
+            await self.sleep(self.drain_interval)
+
+            try:
+                await self.drain()
+            except Exception:
+                self.logger.exception('Sending deferred updates failed.')
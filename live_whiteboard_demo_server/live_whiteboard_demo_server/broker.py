@@ -0,0 +1,84 @@
+"""
+Tiny local message broker for running several server workers on one machine without Redis.
+
+Every frame a worker sends is relayed to all the connected workers (including the sender, as the Socket.IO pub/sub
+managers expect). A frame is a 4-byte big-endian length followed by the payload.
+
+The workers exchange pickles, so nobody but the user running them may reach the broker: its socket is created with mode
+0600 in a directory which belongs to that user and is closed to everyone else, and the workers refuse to connect to a
+socket in any other directory (one another user could have put there first).
+
+Run with (the default path is ``DEFAULT_PATH``):
+    python -m live_whiteboard_demo_server.broker /tmp/whiteboard-1000/broker.sock
+"""
+
+# imports
+import asyncio
+import os
+import struct
+import sys
+import tempfile
+from typing import Set
+
+HEADER = struct.Struct('>I')
+DEFAULT_PATH = os.path.join(tempfile.gettempdir(), f'whiteboard-{os.getuid()}', 'broker.sock')
+
+
+async def read_frame(reader: asyncio.StreamReader) -> bytes:
+    (length,) = HEADER.unpack(await reader.readexactly(HEADER.size))
+
+    return await reader.readexactly(length)
+
+
+def write_frame(writer: asyncio.StreamWriter, payload: bytes) -> None:
+    writer.write(HEADER.pack(len(payload)) + payload)
+
+
+def check_private(path: str) -> None:
+    """Raises ``PermissionError`` unless the directory of the socket ``path`` is this user's, with mode 0700."""
+    directory = os.path.dirname(os.path.abspath(path))
+    info = os.stat(directory)
+
+    if info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise PermissionError(f'{directory} must belong to this user and be closed to the others (mode 0700)')
+
+
+class Broker:
+    def __init__(self) -> None:
+        self.writers: Set[asyncio.StreamWriter] = set()
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.writers.add(writer)
+
+        try:
+            while True:
+                frame = HEADER.pack(len(payload := await read_frame(reader))) + payload
+
+                for subscriber in self.writers:
+                    subscriber.write(frame)
+
+                # a subscriber which can't keep up slows down the publishers instead of growing the buffers
+                await asyncio.gather(*[subscriber.drain() for subscriber in self.writers], return_exceptions=True)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.writers.discard(writer)
+            writer.close()
+
+    async def serve(self, path: str = DEFAULT_PATH) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), mode=0o700, exist_ok=True)
+        check_private(path)
+
+        if os.path.exists(path):
+            os.unlink(path)
+
+        server = await asyncio.start_unix_server(self.handle, path=path)
+        os.chmod(path, 0o600)
+
+        async with server:
+            await server.serve_forever()
+
+
+# main
+if __name__ == '__main__':
+    asyncio.run(Broker().serve(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_PATH))
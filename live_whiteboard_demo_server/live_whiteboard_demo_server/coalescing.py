@@ -0,0 +1,63 @@
+# imports
+import asyncio
+from typing import Awaitable, Callable, Dict, Iterable, Tuple
+
+import socketio
+
+# (room id, sender sid, element) -> emitted update
+Emitter = Callable[[str, str, dict], Awaitable[None]]
+
+
+class UpdateCoalescer:
+    """
+    Buffers ``update_drawn_element`` broadcasts and flushes them on a fixed tick.
+
+    Only the latest version of every element is kept per room, so while a selection is dragged the peers get at most
+    one update per element per tick instead of one per mouse move. Intermediate states never reach the wire.
+    """
+
+    def __init__(self, emit: Emitter, flush_hz: float) -> None:
+        self.emit = emit
+        self.interval = 1 / flush_hz
+        self.pending: Dict[str, Dict[str, Tuple[str, dict]]] = {}
+        self.started = False
+
+    def push(self, room_id: str, sid: str, element: dict) -> None:
+        self.pending.setdefault(room_id, {})[element['id']] = (sid, element)
+
+    def pop(self, room_id: str, element_id: str) -> Tuple[str, dict] | None:
+        return self.pending.get(room_id, {}).pop(element_id, None)
+
+    def pop_room(self, room_id: str) -> Dict[str, Tuple[str, dict]]:
+        return self.pending.pop(room_id, {})
+
+    def discard(self, room_id: str, element_ids: Iterable[str]) -> None:
+        # a pending update must not resurrect an element which has been deleted in the meantime
+        for element_id in element_ids:
+            self.pop(room_id, element_id)
+
+    async def flush(self) -> None:
+        pending, self.pending = self.pending, {}
+
+        # side by side, so an emit which waits (e.g. for the room log) doesn't hold up the others
+        await asyncio.gather(*(
+            self.emit(room_id, sid, element)
+            for room_id, updates in pending.items()
+            for sid, element in updates.values()
+        ))
+
+    def start(self, sio: socketio.AsyncServer) -> None:
+        if self.started:
+            return
+
+        self.started = True
+        sio.start_background_task(self._run, sio)
+
+    async def _run(self, sio: socketio.AsyncServer) -> None:
+        while True:
+            await sio.sleep(self.interval)
+
+            try:
+                await self.flush()
+            except Exception:
+                sio.logger.exception('Flushing coalesced updates failed.')
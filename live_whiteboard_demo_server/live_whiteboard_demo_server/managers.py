@@ -0,0 +1,89 @@
+"""
+Client managers which let several server workers share rooms through a message queue.
+
+Every ``emit(..., room=...)`` is published on the queue and delivered by each worker to the members of the room it has
+connected, and the workers apply each other's board changes, so the room snapshots stay complete too.
+
+``WHITEBOARD_MESSAGE_QUEUE`` picks the backend:
+    None                            single process, no queue
+    'unix:///tmp/whiteboard-1000/broker.sock'
+                                    local broker, see ``broker.py`` (its socket must be in a private directory)
+    'redis://localhost:6379/0'      Redis (needs the ``redis`` package)
+"""
+
+# imports
+import asyncio
+import pickle
+from typing import Any, Callable
+
+import socketio
+from socketio.asyncio_pubsub_manager import AsyncPubSubManager
+
+from live_whiteboard_demo_server.broker import DEFAULT_PATH, check_private, read_frame, write_frame
+
+# (event, data, room) of an emit published by another worker
+RemoteEmitListener = Callable[[str, Any, Any], None]
+
+
+class SharedRoomsMixin:
+    """Reports the emits published by the other workers, so they can be applied to this worker's room state."""
+
+    on_remote_emit: RemoteEmitListener | None = None
+
+    async def _handle_emit(self, message):
+        if message.get('host_id') != self.host_id and self.on_remote_emit is not None:
+            self.on_remote_emit(message['event'], message['data'], message.get('room'))
+
+        await super()._handle_emit(message)
+
+
+class AsyncUnixSocketManager(SharedRoomsMixin, AsyncPubSubManager):
+    """Pub/sub client manager backed by the local broker in ``broker.py``."""
+
+    name = 'unix'
+
+    def __init__(self, url: str = f'unix://{DEFAULT_PATH}', channel: str = 'socketio', write_only: bool = False,
+                 logger=None) -> None:
+        super().__init__(channel=channel, write_only=write_only, logger=logger)
+        self.path = url.removeprefix('unix://')
+        self.reader: asyncio.StreamReader | None = None
+        self.writer: asyncio.StreamWriter | None = None
+        self.connecting = asyncio.Lock()
+
+    async def _connect(self) -> None:
+        async with self.connecting:
+            if self.writer is None or self.writer.is_closing():
+                # whoever listens on the socket is sent pickles and sends pickles back, which run code when loaded
+                check_private(self.path)
+                self.reader, self.writer = await asyncio.open_unix_connection(self.path)
+
+    async def _publish(self, data) -> None:
+        await self._connect()
+
+        write_frame(self.writer, pickle.dumps(data))
+        await self.writer.drain()
+
+    async def _listen(self):
+        while True:
+            try:
+                await self._connect()
+                yield await read_frame(self.reader)
+            except (asyncio.IncompleteReadError, ConnectionError, FileNotFoundError, PermissionError) as e:
+                self._get_logger().error('Cannot receive from the broker at %s (%s), retrying in 1 s.', self.path, e)
+                self.writer = None
+                await asyncio.sleep(1)
+
+
+class AsyncSharedRoomsRedisManager(SharedRoomsMixin, socketio.AsyncRedisManager):
+    pass
+
+
+def client_manager(url: str | None) -> socketio.AsyncManager | None:
+    if url is None:
+        return None
+    if url.startswith('unix://'):
+        return AsyncUnixSocketManager(url)
+    if url.startswith('redis://') or url.startswith('rediss://'):
+        return AsyncSharedRoomsRedisManager(url)
+
+    raise ValueError(f'Unsupported message queue: {url}')
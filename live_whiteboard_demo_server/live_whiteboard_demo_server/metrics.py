@@ -0,0 +1,170 @@
+"""
+In-process metrics of the Socket.IO server, rendered in the Prometheus text format by the ``metrics/`` view.
+
+Recording is a couple of dict lookups and additions, so it can stay on in the hot path. Values which are cheap to read
+from the server state at any time (connected clients, room sizes) are gauges collected when scraped instead.
+"""
+
+# imports
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Tuple
+
+# label values -> value, read when the metrics are scraped
+Collector = Callable[[], Dict[Tuple[str, ...], float]]
+
+# handler times in seconds
+TIME_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+# receivers of a broadcast
+FAN_OUT_BUCKETS = (0, 1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+
+def escape_label_value(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = '') -> str:
+    labels = [f'{name}="{escape_label_value(value)}"' for name, value in zip(names, values)]
+    if extra:
+        labels.append(extra)
+
+    return '{' + ','.join(labels) + '}' if labels else ''
+
+
+class Metric:
+    kind = 'untyped'
+
+    def __init__(self, name: str, description: str, labels: Tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.description = description
+        self.labels = labels
+
+    def samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        return '\n'.join([f'# HELP {self.name} {self.description}', f'# TYPE {self.name} {self.kind}', *self.samples()])
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def __init__(self, name: str, description: str, labels: Tuple[str, ...] = ()) -> None:
+        super().__init__(name, description, labels)
+        self.values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def samples(self) -> Iterable[str]:
+        for labels, value in self.values.items():
+            yield f'{self.name}{format_labels(self.labels, labels)} {value}'
+
+
+class Gauge(Metric):
+    kind = 'gauge'
+
+    def __init__(self, name: str, description: str, collect: Collector, labels: Tuple[str, ...] = ()) -> None:
+        super().__init__(name, description, labels)
+        self.collect = collect
+
+    def samples(self) -> Iterable[str]:
+        for labels, value in self.collect().items():
+            yield f'{self.name}{format_labels(self.labels, labels)} {value}'
+
+
+class HistogramSeries:
+    """The counts of one set of label values of a histogram. Hot paths can keep it at hand instead of looking it up."""
+
+    __slots__ = ('buckets', 'counts', 'total')
+
+    def __init__(self, buckets: Tuple[float, ...]) -> None:
+        self.buckets = buckets
+        # per bucket counts, the last one is +Inf
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name: str, description: str, buckets: Tuple[float, ...],
+                 labels: Tuple[str, ...] = ()) -> None:
+        super().__init__(name, description, labels)
+        self.buckets = buckets
+        self.series: Dict[Tuple[str, ...], HistogramSeries] = {}
+
+    def series_for(self, *labels: str) -> HistogramSeries:
+        if (series := self.series.get(labels)) is None:
+            series = self.series[labels] = HistogramSeries(self.buckets)
+
+        return series
+
+    def observe(self, value: float, *labels: str) -> None:
+        self.series_for(*labels).observe(value)
+
+    def samples(self) -> Iterable[str]:
+        for labels, series in self.series.items():
+            cumulative = 0
+
+            for bound, count in zip([*self.buckets, '+Inf'], series.counts):
+                cumulative += count
+                bucket_labels = format_labels(self.labels, labels, f'le="{bound}"')
+                yield f'{self.name}_bucket{bucket_labels} {cumulative}'
+
+            yield f'{self.name}_sum{format_labels(self.labels, labels)} {series.total}'
+            yield f'{self.name}_count{format_labels(self.labels, labels)} {cumulative}'
+
+
+class Registry:
+    def __init__(self) -> None:
+        self.metrics: List[Metric] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        return '\n'.join(metric.render() for metric in self.metrics) + '\n'
+
+
+registry = Registry()
+
+handler_seconds: Histogram = registry.register(Histogram(
+    'whiteboard_handler_seconds', 'Time spent in the socket event handlers.', TIME_BUCKETS, ('event',)
+))
+received_bytes: Counter = registry.register(Counter(
+    'whiteboard_received_bytes_total', 'Payload bytes received from the clients.'
+))
+sent_bytes: Counter = registry.register(Counter(
+    'whiteboard_sent_bytes_total', 'Payload bytes sent to the clients.', ('event',)
+))
+fan_out: Histogram = registry.register(Histogram(
+    'whiteboard_fan_out', 'Receivers connected to this worker per room broadcast.', FAN_OUT_BUCKETS, ('event',)
+))
+dropped_events: Counter = registry.register(Counter(
+    'whiteboard_dropped_events_total', 'Inbound events refused by the rate limiter.', ('event',)
+))
+deferred_updates: Counter = registry.register(Counter(
+    'whiteboard_deferred_updates_total', 'Element updates held back from slow clients.'
+))
+
+
+class MetricsMixin:
+    """Counts the payload bytes a Socket.IO server receives and sends, per engine.io message."""
+
+    async def _handle_eio_message(self, eio_sid, data):
+        received_bytes.inc(amount=len(data))
+        await super()._handle_eio_message(eio_sid, data)
+
+    async def _send_packet(self, eio_sid, pkt):
+        event = pkt.data[0] if isinstance(pkt.data, list) and pkt.data and isinstance(pkt.data[0], str) else ''
+        encoded_packet = pkt.encode()
+
+        for ep in encoded_packet if isinstance(encoded_packet, list) else [encoded_packet]:
+            sent_bytes.inc(event, amount=len(ep))
+            await self.eio.send(eio_sid, ep)
+
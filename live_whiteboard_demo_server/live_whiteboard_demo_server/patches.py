@@ -0,0 +1,73 @@
+"""
+Compact patches for drawn elements.
+
+A patch is a list of operations, each one a short list:
+    ['translate', dx, dy]       moves the element (same as ``translateElement`` in the client)
+    ['set', field, value]       sets one of the style fields
+    ['append', points]          appends points (``{'x': ..., 'y': ...}``) to a stroke
+
+An invalid patch raises ``ValueError``.
+"""
+
+# imports
+from typing import Any, List
+
+STYLE_FIELDS = {'lineType', 'lineWidth', 'color', 'fill', 'arrows'}
+
+# points one append may add, a client sends the points of a stroke being drawn a few at a time
+MAX_APPENDED_POINTS = 1000
+
+
+def is_point(point: Any) -> bool:
+    return isinstance(point, dict) and all(
+        isinstance(point.get(axis), int | float) and not isinstance(point[axis], bool) for axis in ('x', 'y')
+    )
+
+
+def translate_element(element: dict, dx: float, dy: float) -> None:
+    match element['name']:
+        case 'line' | 'rectangle':
+            element['start'] = {'x': element['start']['x'] + dx, 'y': element['start']['y'] + dy}
+            element['end'] = {'x': element['end']['x'] + dx, 'y': element['end']['y'] + dy}
+        case 'ellipse':
+            element['center'] = {'x': element['center']['x'] + dx, 'y': element['center']['y'] + dy}
+        case 'stroke':
+            element['points'] = [{'x': p['x'] + dx, 'y': p['y'] + dy} for p in element['points']]
+
+
+def validate_patch(element: dict, ops: List[list]) -> None:
+    for op in ops:
+        match op:
+            case ['translate', int() | float(), int() | float()]:
+                pass
+            case ['set', str() as field, _] if field in STYLE_FIELDS:
+                pass
+            case ['append', list() as points] if element['name'] == 'stroke':
+                if len(points) > MAX_APPENDED_POINTS:
+                    raise ValueError(f'Too many points appended: {len(points)} (at most {MAX_APPENDED_POINTS})')
+                if not all(is_point(point) for point in points):
+                    raise ValueError(f'Invalid points appended to a stroke: {points!r}')
+            case _:
+                raise ValueError(f'Invalid patch operation for a {element["name"]}: {op!r}')
+
+
+def apply_patch(element: dict, ops: List[list]) -> dict:
+    """
+    ``element`` with ``ops`` applied, as a new dict: the element itself may still be waiting to be broadcast, so it is
+    never changed. The whole patch is validated first, so it is applied all or nothing.
+    """
+    validate_patch(element, ops)
+
+    # the operations replace fields, they never change them in place, so a shallow copy is enough
+    element = dict(element)
+
+    for op in ops:
+        match op:
+            case ['translate', dx, dy]:
+                translate_element(element, dx, dy)
+            case ['set', field, value]:
+                element[field] = value
+            case ['append', points]:
+                element['points'] = element['points'] + points
+
+    return element
@@ -0,0 +1,245 @@
+"""
+Server-side shape recognition: a finished stroke which is close enough to a line, a rectangle or an ellipse is turned
+into that element, so a handful of numbers is broadcast instead of hundreds of points. Lines and the sides of
+rectangles come from a point Hough transform (``hough_points`` below), ellipses from a least squares fit. The client's
+rectangles and ellipses are axis-aligned, so rotated ones are no match.
+
+``hough_points`` is this module's own, not the lab's ``my_hough.hough_points_np``: the server doesn't depend on the lab
+(nor on Numba or OpenCV), and it votes with weighted samples in rhos of half the tolerance, relative to the stroke's
+bounding box, instead of with pixels in 1 px rhos over the whole canvas.
+"""
+
+# imports
+import math
+from typing import List, Tuple
+
+import numpy as np
+
+NUM_THETAS = 180
+
+# strokes are sampled every this many px, or coarser for long strokes so the cost is bounded
+MIN_STEP = 2.0
+MAX_SAMPLES = 256
+
+# strokes smaller than this (bounding box diagonal, px) are left alone, e.g. dots
+MIN_DIAGONAL = 10
+
+# strokes whose ends are closer than this fraction of their bounding box diagonal are closed
+CLOSED_GAP = 0.25
+
+# the sides of a rectangle are at least this many rhos (half the tolerance) apart
+MIN_SIDE = 4
+
+# the sides of a rectangle may be this far (radians) from horizontal / vertical
+SIDE_ANGLE = math.radians(10)
+
+# style of the recognized shape when the stroke lacks it, the client's defaults
+DEFAULT_STYLE = {'lineType': 'simple', 'lineWidth': 3, 'color': '#000000'}
+
+THETAS = np.linspace(-np.pi / 2, np.pi / 2, NUM_THETAS, endpoint=False)
+COS_THETAS = np.cos(THETAS)
+SIN_THETAS = np.sin(THETAS)
+VERTICAL = np.abs(THETAS) <= SIDE_ANGLE
+NEGATIVE_HORIZONTAL = THETAS <= -np.pi / 2 + SIDE_ANGLE
+POSITIVE_HORIZONTAL = THETAS >= np.pi / 2 - SIDE_ANGLE
+
+
+def sample_stroke(points: np.ndarray) -> (np.ndarray, np.ndarray):
+    """
+    Points evenly spaced along the stroke (every ``MIN_STEP`` px, at most ``MAX_SAMPLES`` of them), and their weights:
+    the length of the stroke around them, so they weigh the stroke's length in total whatever its points are.
+    """
+    deltas = np.diff(points, axis=0)
+    distances = np.concatenate([[0], np.cumsum(np.hypot(deltas[:, 0], deltas[:, 1]))])
+    n_samples = min(MAX_SAMPLES, max(1, math.ceil(distances[-1] / MIN_STEP))) + 1
+
+    along = np.linspace(0, distances[-1], n_samples)
+    samples = np.stack([np.interp(along, distances, points[:, 0]), np.interp(along, distances, points[:, 1])], axis=1)
+
+    weights = np.full(n_samples, distances[-1] / (n_samples - 1))
+    weights[[0, -1]] /= 2
+
+    return samples, weights
+
+
+def hough_points(samples: np.ndarray, weights: np.ndarray, rho_step: float, n_rhos: int) -> np.ndarray:
+    """
+    The weighted votes of the samples (relative to the stroke's bounding box) for every (rho, theta), with rhos of
+    ``rho_step`` px from -n_rhos to n_rhos, summed over the 2 rhos on both sides: with ``rho_step`` half the tolerance, a
+    cell is the length of stroke within the tolerance of its line.
+    """
+    rho_is = np.rint((samples[:, :1] * COS_THETAS + samples[:, 1:] * SIN_THETAS) / rho_step).astype(np.intp) + n_rhos
+    accumulator = np.bincount(
+        (rho_is * NUM_THETAS + np.arange(NUM_THETAS)).ravel(),
+        weights=np.repeat(weights, NUM_THETAS),
+        minlength=(2 * n_rhos + 1) * NUM_THETAS
+    ).reshape(2 * n_rhos + 1, NUM_THETAS)
+
+    summed = accumulator.copy()
+    summed[1:] += accumulator[:-1]
+    summed[2:] += accumulator[:-2]
+    summed[:-1] += accumulator[1:]
+    summed[:-2] += accumulator[2:]
+
+    return summed
+
+
+def two_sides(profile: np.ndarray, min_distance: int) -> (int, int):
+    """The two strongest rhos of a profile which are at least ``min_distance`` apart, in order."""
+    first = int(profile.argmax())
+
+    others = profile.copy()
+    others[max(0, first - min_distance + 1):first + min_distance] = -1
+    second = int(others.argmax())
+
+    return min(first, second), max(first, second)
+
+
+def refine_sides(samples: np.ndarray, weights: np.ndarray, axis: int, low: float, high: float, other_low: float,
+                 other_high: float, tolerance: float) -> (float, float):
+    """
+    The two sides along ``axis`` at the weighted mean of the samples close to them, leaving out the corners (the
+    samples within ``tolerance`` of the other two sides).
+    """
+    coordinates, others = samples[:, axis], samples[:, 1 - axis]
+    between = (others > other_low + tolerance) & (others < other_high - tolerance)
+    sides = []
+
+    for side in (low, high):
+        near = between & (np.abs(coordinates - side) <= tolerance)
+        sides.append(float(weights[near] @ coordinates[near] / weights[near].sum()) if near.any() else side)
+
+    return sides[0], sides[1]
+
+
+def rectangle_distances(samples: np.ndarray, x1: float, y1: float, x2: float, y2: float) -> np.ndarray:
+    x, y = samples[:, 0], samples[:, 1]
+
+    # inside: to the nearest side, outside: to the nearest point of the outline
+    inside = np.minimum(np.minimum(x - x1, x2 - x), np.minimum(y - y1, y2 - y))
+    dx = np.maximum(np.maximum(x1 - x, x - x2), 0)
+    dy = np.maximum(np.maximum(y1 - y, y - y2), 0)
+
+    return np.where(inside > 0, inside, np.hypot(dx, dy))
+
+
+def fit_ellipse(samples: np.ndarray, weights: np.ndarray) -> Tuple[float, float, float, float] | None:
+    """
+    The axis-aligned ellipse a * x^2 + c * y^2 + d * x + e * y = 1 nearest to the samples (weighted least squares):
+    its center and radii, or None when the samples aren't on one.
+    """
+    # around the samples' mean, which is inside the ellipse, so the equation can't be = 0
+    mean = weights @ samples / weights.sum()
+    x, y = (samples - mean).T
+    design = np.stack([x * x, y * y, x, y], axis=1) * weights[:, None]
+
+    (a, c, d, e), *_ = np.linalg.lstsq(design, weights, rcond=None)
+    if a <= 0 or c <= 0:
+        return None
+
+    cx, cy = -d / (2 * a), -e / (2 * c)
+    f = 1 + a * cx * cx + c * cy * cy
+
+    return cx + mean[0], cy + mean[1], math.sqrt(f / a), math.sqrt(f / c)
+
+
+def ellipse_distances(samples: np.ndarray, cx: float, cy: float, rx: float, ry: float) -> np.ndarray:
+    """About the distances to the ellipse: its equation over the length of its gradient (Sampson distances)."""
+    u, v = (samples[:, 0] - cx) / rx, (samples[:, 1] - cy) / ry
+    gradient = 2 * np.hypot(u / rx, v / ry)
+
+    return np.abs(u * u + v * v - 1) / np.maximum(gradient, 1e-12)
+
+
+def recognize_stroke(element: dict, tolerance: float, min_score: float) -> dict | None:
+    """
+    The line, rectangle or ellipse element the stroke element was meant to be (with its id, line type, width and
+    color), or None. A shape matches when at least ``min_score`` of the stroke's length is within ``tolerance`` (a
+    fraction of the stroke's bounding box diagonal) of it; open strokes can only be lines, closed ones (ends closer
+    than ``CLOSED_GAP`` of the diagonal) rectangles or ellipses, whichever fits the stroke best.
+    """
+    points: List[dict] = element['points']
+    if len(points) < 2:
+        return None
+
+    points = np.array([(p['x'], p['y']) for p in points], dtype=np.float64)
+    origin = points.min(axis=0)
+    points = points - origin
+
+    width, height = points.max(axis=0)
+    diagonal = math.hypot(width, height)
+    if diagonal < MIN_DIAGONAL:
+        return None
+
+    samples, weights = sample_stroke(points)
+    length = weights.sum()
+    tolerance_px = max(1.0, tolerance * diagonal)
+    rho_step = tolerance_px / 2
+    n_rhos = int(math.ceil(diagonal / rho_step)) + 1
+
+    accumulator = hough_points(samples, weights, rho_step, n_rhos)
+    closed = math.hypot(*(points[-1] - points[0])) <= CLOSED_GAP * diagonal
+
+    style = {'id': element.get('id'), **{field: element.get(field, default) for field, default in DEFAULT_STYLE.items()}}
+
+    def to_point(xy) -> dict:
+        return {'x': float(xy[0] + origin[0]), 'y': float(xy[1] + origin[1])}
+
+    if not closed:
+        # the strongest line, if enough of the stroke is close to it
+        rho_i, theta_i = np.unravel_index(accumulator.argmax(), accumulator.shape)
+        if accumulator[rho_i, theta_i] < min_score * length:
+            return None
+
+        normal = np.array([COS_THETAS[theta_i], SIN_THETAS[theta_i]])
+        rho = (rho_i - n_rhos) * rho_step
+        on_line = np.abs(samples @ normal - rho) <= tolerance_px
+        on_line, on_line_weights = samples[on_line], weights[on_line]
+
+        # the line through the samples close to it (weighted total least squares), the ends are the farthest samples
+        # close to that one along it, in the order they were drawn
+        mean = on_line_weights @ on_line / on_line_weights.sum()
+        direction = np.linalg.svd((on_line - mean) * np.sqrt(on_line_weights)[:, None], full_matrices=False)[2][0]
+        normal = np.array([-direction[1], direction[0]])
+
+        along = (samples - mean) @ direction
+        along = along[np.abs((samples - mean) @ normal) <= tolerance_px]
+        start, end = (mean + along[i] * direction for i in sorted((int(along.argmin()), int(along.argmax()))))
+
+        return {'name': 'line', **style, 'start': to_point(start), 'end': to_point(end), 'arrows': False}
+
+    matches = []
+
+    # the sides are the two strongest vertical lines (rho = x) and the two strongest horizontal ones (rho = -y at
+    # theta = -pi / 2, y at pi / 2), so the profiles are indexed by x and y
+    x_profile = accumulator[n_rhos:, VERTICAL].max(axis=1)
+    y_profile = np.maximum(
+        accumulator[n_rhos::-1, NEGATIVE_HORIZONTAL].max(axis=1),
+        accumulator[n_rhos:, POSITIVE_HORIZONTAL].max(axis=1)
+    )
+    x1, x2 = (x * rho_step for x in two_sides(x_profile, MIN_SIDE))
+    y1, y2 = (y * rho_step for y in two_sides(y_profile, MIN_SIDE))
+    x1, x2 = refine_sides(samples, weights, 0, x1, x2, y1, y2, tolerance_px)
+    y1, y2 = refine_sides(samples, weights, 1, y1, y2, x1, x2, tolerance_px)
+    score = weights[rectangle_distances(samples, x1, y1, x2, y2) <= tolerance_px].sum()
+    matches.append((score, {'name': 'rectangle', **style, 'start': to_point((x1, y1)), 'end': to_point((x2, y2)),
+                            'fill': False}))
+
+    ellipse = fit_ellipse(samples, weights)
+
+    # an ellipse reaching farther than the stroke does, e.g. fitted to the two sides of an out-and-back stroke, is no
+    # match however close to it the stroke is
+    if ellipse is not None and (
+            ellipse[0] - ellipse[2] < -tolerance_px or ellipse[0] + ellipse[2] > width + tolerance_px or
+            ellipse[1] - ellipse[3] < -tolerance_px or ellipse[1] + ellipse[3] > height + tolerance_px
+    ):
+        ellipse = None
+
+    if ellipse is not None:
+        cx, cy, rx, ry = ellipse
+        score = weights[ellipse_distances(samples, cx, cy, rx, ry) <= tolerance_px].sum()
+        matches.append((score, {'name': 'ellipse', **style, 'center': to_point((cx, cy)), 'radiusX': rx,
+                                'radiusY': ry, 'fill': False}))
+
+    score, match = max(matches, key=lambda m: m[0])
+    return match if score >= min_score * length else None
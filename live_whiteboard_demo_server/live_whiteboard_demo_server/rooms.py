@@ -0,0 +1,45 @@
+# imports
+from typing import Dict, Iterable, List
+
+
+class RoomStore:
+    """
+    Authoritative, in-memory state of every room's board.
+
+    Elements are kept per room in a dict keyed by element id, so add/update/delete are O(1) and a snapshot for a
+    late joiner is a single O(board) pass. Dicts keep insertion order, i.e. the snapshot is oldest element first.
+    """
+
+    def __init__(self) -> None:
+        self.rooms: Dict[str, Dict[str, dict]] = {}
+
+    def __contains__(self, room_id: str) -> bool:
+        return room_id in self.rooms
+
+    def load(self, room_id: str, elements: List[dict]) -> None:
+        self.rooms[room_id] = {element['id']: element for element in elements}
+
+    def elements(self, room_id: str) -> Dict[str, dict]:
+        return self.rooms.setdefault(room_id, {})
+
+    def get(self, room_id: str, element_id: str) -> dict | None:
+        return self.rooms.get(room_id, {}).get(element_id)
+
+    def add(self, room_id: str, element: dict) -> None:
+        self.elements(room_id)[element['id']] = element
+
+    def update(self, room_id: str, element: dict) -> None:
+        # updates of elements the server has not seen (e.g. drawn before a restart) are treated as adds
+        self.elements(room_id)[element['id']] = element
+
+    def delete(self, room_id: str, element_ids: Iterable[str]) -> None:
+        elements = self.elements(room_id)
+
+        for element_id in element_ids:
+            elements.pop(element_id, None)
+
+    def evict(self, room_id: str) -> None:
+        self.rooms.pop(room_id, None)
+
+    def snapshot(self, room_id: str) -> List[dict]:
+        return list(self.rooms.get(room_id, {}).values())
@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 # Base directory
@@ -20,7 +21,8 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
-    'corsheaders'
+    'corsheaders',
+    'boards'
 ]
 
 MIDDLEWARE = [
@@ -56,10 +58,11 @@ WSGI_APPLICATION = 'live_whiteboard_demo_server.wsgi.application'
 
 
 # Database
+# WHITEBOARD_DATABASE in the environment points it to another file, e.g. a throwaway one for the benchmarks
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': os.environ.get('WHITEBOARD_DATABASE', BASE_DIR / 'db.sqlite3'),
     }
 }
 
@@ -100,3 +103,43 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # --- Added by me ---
 CORS_ALLOW_ALL_ORIGINS = True
 CORS_ALLOW_CREDENTIALS = True
+
+# --- Whiteboard ---
+# drawn element updates are coalesced per element and broadcast at this rate (Hz)
+WHITEBOARD_UPDATE_FLUSH_HZ = 30
+
+# message queue shared by the workers when running more than one (see managers.py), e.g.
+# 'unix:///tmp/whiteboard-1000/broker.sock' (start broker.py first, the directory must be private to the user) or
+# 'redis://localhost:6379/0'
+WHITEBOARD_MESSAGE_QUEUE = os.environ.get('WHITEBOARD_MESSAGE_QUEUE')
+
+# every add, update and delete is appended to the room log in the database (see boards/log.py), in batches of at most
+# this many ops, and each room's log is compacted into a snapshot every this many ops (WHITEBOARD_PERSISTENCE=0 in the
+# environment turns it off)
+WHITEBOARD_PERSISTENCE = os.environ.get('WHITEBOARD_PERSISTENCE', '1') != '0'
+WHITEBOARD_LOG_BATCH_SIZE = 500
+WHITEBOARD_SNAPSHOT_EVERY = 1000
+
+# strokes from clients which don't simplify them themselves are smoothed with this many Chaikin iterations and then
+# simplified with Ramer-Douglas-Peucker with this epsilon (px), like the client does (see simplify.py)
+WHITEBOARD_STROKE_ITERATIONS = 4
+WHITEBOARD_STROKE_EPSILON = 0.75
+
+# strokes (added, updated or appended to) with more points than this are dropped, so one client can't keep the server
+# busy simplifying and broadcasting them
+WHITEBOARD_STROKE_MAX_POINTS = 5000
+
+# a finished stroke is recognized as a line, a rectangle or an ellipse (see recognize.py) when at least this fraction of
+# its length is within a tolerance (this fraction of its bounding box diagonal) of the shape
+WHITEBOARD_RECOGNITION_MIN_SCORE = 0.85
+WHITEBOARD_RECOGNITION_TOLERANCE = 0.05
+
+# every client may send this many events per second (bursts of up to WHITEBOARD_RATE_BURST), the rest are refused
+# (only the latest update of every element is kept, and handled once the client is back under the rate)
+WHITEBOARD_RATE_LIMIT = 200
+WHITEBOARD_RATE_BURST = 400
+
+# outgoing packets queued for a client: past the first limit it only gets the latest version of the elements which
+# changed (see backpressure.py), past the second it is disconnected
+WHITEBOARD_SLOW_CLIENT_QUEUE = 64
+WHITEBOARD_MAX_CLIENT_QUEUE = 4096
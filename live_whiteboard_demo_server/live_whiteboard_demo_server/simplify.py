@@ -0,0 +1,104 @@
+"""
+Server-side stroke simplification: Chaikin smoothing followed by Ramer-Douglas-Peucker, the same pipeline the client
+runs before sending a stroke (see ``algorithms-lab/1. Smoothing Strokes...py``). Strokes from clients which don't
+simplify them themselves are normalized with it before they are broadcast.
+
+The lab keeps its own kernels (``algorithms-lab/Utils.py``, ``my_rdp.py``) to experiment with, this is the one which is
+deployed.
+"""
+
+# imports
+from typing import List, Tuple
+
+import numpy as np
+
+from live_whiteboard_demo_server.codec import SCALE
+
+
+def chaikin_smooth(points: np.ndarray, iterations: int) -> np.ndarray:
+    """Chaikin's corner cutting, keeping the end points. Every iteration doubles the number of points."""
+    for _ in range(iterations):
+        L = points.repeat(2, axis=0)
+        R = np.empty_like(L)
+
+        R[0] = L[0]
+        R[2::2] = L[1:-1:2]
+        R[1:-1:2] = L[2::2]
+        R[-1] = L[-1]
+
+        points = L * 0.75 + R * 0.25
+
+    return points
+
+
+def rdp_mask(points: np.ndarray, epsilon: float, starts: np.ndarray | None = None,
+             ends: np.ndarray | None = None) -> np.ndarray:
+    """
+    Ramer-Douglas-Peucker, a level of the recursion at a time: the distances of the points of all the segments still
+    to split are computed together, so there are a few NumPy calls per level instead of Python code per segment.
+    Returns which points are kept. ``starts`` and ``ends`` (the whole array by default) are the first and last points
+    of the segments to simplify, e.g. of many strokes concatenated, which are then all done in one call.
+
+    The distances are computed exactly like ``rdp.pldist`` does, so the results are the same as the ``rdp`` package's.
+    """
+    if starts is None:
+        starts, ends = np.array([0]), np.array([len(points) - 1])
+
+    x, y = points[:, 0].astype(np.float64), points[:, 1].astype(np.float64)
+    keep = np.zeros(len(points), dtype=bool)
+    keep[starts] = keep[ends] = True
+
+    while True:
+        long = ends - starts >= 2
+        starts, ends = starts[long], ends[long]
+        if len(starts) == 0:
+            return keep
+
+        # the inner points of all the segments, one after the other
+        lengths = ends - starts - 1
+        offsets = np.cumsum(lengths) - lengths
+        segment = np.repeat(np.arange(len(starts)), lengths)
+        inner = np.arange(len(segment)) - offsets[segment] + starts[segment] + 1
+
+        sx, sy = x[starts][segment], y[starts][segment]
+        dx, dy = (x[ends] - x[starts])[segment], (y[ends] - y[starts])[segment]
+        px, py = x[inner], y[inner]
+
+        same = (dx == 0) & (dy == 0)
+        distances = np.where(
+            same,
+            np.sqrt((px - sx) ** 2 + (py - sy) ** 2),
+            np.abs(dx * (sy - py) - dy * (sx - px)) / np.where(same, 1, np.sqrt(dx * dx + dy * dy))
+        )
+
+        # the farthest point (the first one on ties, like the strict `d > dmax` of `rdp`) splits its segment, if it's
+        # farther than epsilon
+        farthest = np.maximum.reduceat(distances, offsets)
+        first = np.minimum.reduceat(
+            np.where(distances == farthest[segment], np.arange(len(distances)), len(distances)),
+            offsets
+        )
+
+        split = farthest > epsilon
+        index = inner[first[split]]
+        keep[index] = True
+
+        starts, ends = np.concatenate([starts[split], index]), np.concatenate([index, ends[split]])
+
+
+def simplify_stroke(points: List[dict], iterations: int, epsilon: float) -> List[dict]:
+    """The simplified points, or ``points`` itself when that wouldn't make the stroke any shorter."""
+    if len(points) < 3:
+        return points
+
+    xy = chaikin_smooth(np.array([(p['x'], p['y']) for p in points], dtype=np.float64), iterations)
+    xy = xy[rdp_mask(xy, epsilon)]
+
+    # smoothing adds points, on a short stroke (e.g. a small circle) RDP may not drop as many
+    if len(xy) >= len(points):
+        return points
+
+    # no finer than what the binary codec can carry, so both codecs deliver the same stroke
+    xy = np.round(xy * SCALE) / SCALE
+
+    return [{'x': x, 'y': y} for x, y in xy.tolist()]
@@ -0,0 +1,97 @@
+"""
+Tests of the Socket.IO server. The handlers of ``asgi.py`` are called directly, and what they emit is recorded and
+applied to fake peers instead of being sent.
+
+Run with (from the server directory):
+    python manage.py test
+"""
+
+# imports
+import asyncio
+import copy
+import itertools
+from collections import defaultdict
+from typing import Dict, List, Tuple
+from unittest import mock
+
+from django.conf import settings
+from django.test import SimpleTestCase
+
+from live_whiteboard_demo_server.codec import decode_element, decode_ops
+from live_whiteboard_demo_server.patches import apply_patch
+
+# the room log would write to the database from its own thread
+settings.WHITEBOARD_PERSISTENCE = False
+
+from live_whiteboard_demo_server import asgi  # noqa: E402
+
+
+class Peer:
+    """A client's copy of a room's board, kept up to date with the events it receives."""
+
+    def __init__(self) -> None:
+        self.elements: Dict[str, dict] = {}
+
+    def receive(self, event: str, data: dict) -> None:
+        match event:
+            case 'drawn_element_added' | 'drawn_element_updated':
+                element = decode_element(data['element'])
+                self.elements[element['id']] = element
+            case 'drawn_element_patched':
+                if data['element_id'] in self.elements:
+                    element = self.elements[data['element_id']]
+                    self.elements[data['element_id']] = apply_patch(element, decode_ops(data['ops']))
+            case 'drawn_elements_deleted':
+                for element_id in data['element_ids']:
+                    self.elements.pop(element_id, None)
+
+
+class RecordedEmits:
+    """
+    Stands in for ``sio.emit``: every emit is recorded and delivered to the peer of its room (or client). Like a real
+    send, the payload is serialized only after yielding to the event loop, so other handlers can run in between.
+    """
+
+    def __init__(self) -> None:
+        self.peers: Dict[str, Peer] = defaultdict(Peer)
+        # (event, data, room or sid)
+        self.sent: List[Tuple[str, dict, str]] = []
+
+    async def emit(self, event, data=None, to=None, room=None, skip_sid=None, namespace=None, callback=None,
+                   **kwargs):
+        await asyncio.sleep(0)
+
+        data = copy.deepcopy(data)
+        self.sent.append((event, data, to or room))
+        self.peers[to or room].receive(event, data)
+
+
+class ServerTestCase(SimpleTestCase):
+    """Starts every test with empty rooms, no clients and the emits recorded in ``self.emits``."""
+
+    eio_sids = itertools.count()
+
+    def setUp(self) -> None:
+        asgi.rooms.rooms.clear()
+        asgi.updates.pending.clear()
+        asgi.binary_sids.clear()
+        asgi.simplifying_sids.clear()
+        asgi.sio.manager.rooms.clear()
+        asgi.loading_rooms.clear()
+        asgi.remote_changes.clear()
+
+        self.namespace = asgi.sio.namespace_handlers['/']
+        self.emits = RecordedEmits()
+
+        emit = mock.patch.object(asgi.sio, 'emit', self.emits.emit)
+        emit.start()
+        self.addCleanup(emit.stop)
+
+    async def join(self, room_id: str, binary: bool = False) -> str:
+        """Connects a client (which uses the binary codec or not) and joins it to the room. Returns its sid."""
+        sid = asgi.sio.manager.connect(f'eio-{next(self.eio_sids)}', '/')
+        if binary:
+            asgi.binary_sids.add(sid)
+
+        await self.namespace.on_join_room(sid, room_id)
+        return sid
@@ -0,0 +1,136 @@
+# imports
+import asyncio
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from live_whiteboard_demo_server import asgi
+from live_whiteboard_demo_server.backpressure import BackpressureServer, RateLimiter
+from live_whiteboard_demo_server.tests import ServerTestCase
+
+SLOW_QUEUE = 4
+MAX_QUEUE = 16
+
+
+class StalledServer(BackpressureServer):
+    """Queues the packets of its clients like engine.io does, but nothing ever sends them."""
+
+    async def _send_packet(self, eio_sid, pkt):
+        self.eio.sockets[eio_sid].queue.put_nowait(pkt.data)
+
+
+def take_all(queue: asyncio.Queue) -> list:
+    packets = []
+    while not queue.empty():
+        packets.append(queue.get_nowait())
+
+    return packets
+
+
+class BackpressureTestCase(SimpleTestCase):
+    def setUp(self) -> None:
+        self.server = StalledServer(async_mode='asgi', slow_queue=SLOW_QUEUE, max_queue=MAX_QUEUE, drain_hz=30)
+        self.queue = asyncio.Queue()
+        self.server.eio.sockets['eio-slow'] = SimpleNamespace(queue=self.queue)
+        self.sid = self.server.manager.connect('eio-slow', '/')
+
+        # the latest version of every element
+        self.elements = {}
+        self.server.deferred_update = lambda sid, element_id: (
+            {'element': self.elements[element_id]} if element_id in self.elements else None
+        )
+
+    async def update(self, x: int) -> None:
+        self.elements['a'] = {'id': 'a', 'x': x}
+        await self.server.emit('drawn_element_updated', {'element': self.elements['a']}, to=self.sid)
+
+    async def test_slow_client_gets_only_the_latest_version(self):
+        for x in range(10):
+            await self.update(x)
+
+        # the updates past the slow threshold were held back
+        self.assertEqual(take_all(self.queue), [
+            ['drawn_element_updated', {'element': {'id': 'a', 'x': x}}] for x in range(SLOW_QUEUE)
+        ])
+        self.assertEqual(self.server.deferred, {'eio-slow': {'a'}})
+
+        # the queue is empty now, but a held back element waits for its deferred update
+        await self.update(10)
+        await self.server.emit('drawn_element_patched', {'element_id': 'a', 'ops': []}, to=self.sid)
+        self.assertTrue(self.queue.empty())
+
+        await self.server.drain()
+        self.assertEqual(take_all(self.queue), [['drawn_element_updated', {'element': {'id': 'a', 'x': 10}}]])
+        self.assertEqual(self.server.deferred, {})
+
+    async def test_stalled_client_is_disconnected(self):
+        with mock.patch.object(self.server, 'start_background_task') as start_background_task:
+            # adds can't be held back, so they pile up until the hard limit
+            for i in range(MAX_QUEUE + 10):
+                await self.server.emit('drawn_element_added', {'element': {'id': str(i)}}, to=self.sid)
+
+        self.assertEqual(self.queue.qsize(), MAX_QUEUE)
+        start_background_task.assert_called_once_with(self.server.eio.disconnect, 'eio-slow')
+
+
+def line(element_id: str, x: int = 0) -> dict:
+    return {
+        'name': 'line',
+        'id': element_id,
+        'start': {'x': x, 'y': 0},
+        'end': {'x': x + 10, 'y': 10},
+        'lineType': 'simple',
+        'lineWidth': 2,
+        'color': '#000000',
+        'arrows': False
+    }
+
+
+class RateLimitTestCase(ServerTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+
+        # a burst of 2 events, and no more for a good while
+        self.limiter = RateLimiter(rate=0.001, burst=2)
+        limiter = mock.patch.object(asgi, 'limiter', self.limiter)
+        limiter.start()
+        self.addCleanup(limiter.stop)
+
+    async def test_add_over_the_limit_is_refused(self):
+        sid = await self.join('room')
+        await self.namespace.trigger_event('add_drawn_element', sid, {'room_id': 'room', 'element': line('a')})
+        await self.namespace.trigger_event('add_drawn_element', sid, {'room_id': 'room', 'element': line('b')})
+
+        result = await self.namespace.trigger_event('add_drawn_element', sid, {'room_id': 'room', 'element': line('c')})
+
+        self.assertIn('error', result)
+        self.assertEqual(asgi.rooms.snapshot('room'), [line('a'), line('b')])
+
+    async def test_latest_update_over_the_limit_is_held_back(self):
+        sid = await self.join('room')
+        await self.namespace.trigger_event('add_drawn_element', sid, {'room_id': 'room', 'element': line('a')})
+
+        # the drag goes on past the limit: its last update is kept
+        for x in range(1, 6):
+            result = await self.namespace.trigger_event('update_drawn_element', sid, {
+                'room_id': 'room',
+                'element': line('a', x)
+            })
+            self.assertIsNone(result)
+
+        self.assertEqual(asgi.rooms.get('room', 'a'), line('a', 1))
+        self.assertEqual(self.limiter.held, {sid: {'a': (
+            'update_drawn_element', sid, {'room_id': 'room', 'element': line('a', 5)}
+        )}})
+
+        # it's handled before the client's next event
+        self.limiter.buckets[sid].tokens = 1
+        await self.namespace.trigger_event('patch_drawn_element', sid, {
+            'room_id': 'room',
+            'element_id': 'a',
+            'ops': [['translate', 1, 0]]
+        })
+
+        self.assertEqual(asgi.rooms.get('room', 'a'), line('a', 6))
+        self.assertEqual(self.limiter.held, {})
@@ -0,0 +1,73 @@
+# imports
+import asyncio
+import os
+import stat
+import tempfile
+
+from django.test import SimpleTestCase
+
+from live_whiteboard_demo_server.broker import Broker
+from live_whiteboard_demo_server.managers import AsyncUnixSocketManager
+
+
+class BrokerTestCase(SimpleTestCase):
+    def setUp(self) -> None:
+        # a temporary directory is private to this user (mode 0700), like the broker's default one
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'broker.sock')
+
+    async def start_broker(self, path: str) -> asyncio.Task:
+        broker = asyncio.create_task(Broker().serve(path))
+
+        for _ in range(100):
+            if os.path.exists(path) or broker.done():
+                break
+            await asyncio.sleep(0.01)
+
+        return broker
+
+    async def test_emit_reaches_the_other_worker(self):
+        broker = await self.start_broker(self.path)
+        sender = AsyncUnixSocketManager(f'unix://{self.path}')
+        receiver = AsyncUnixSocketManager(f'unix://{self.path}')
+
+        received = []
+        delivered = asyncio.Event()
+        receiver.on_remote_emit = lambda event, data, room: (received.append((event, data, room)), delivered.set())
+        listener = asyncio.create_task(receiver._thread())
+
+        try:
+            # the receiver has to be subscribed before anything is published
+            await receiver._connect()
+            await asyncio.sleep(0.05)
+
+            data = {'element': {'id': 'a', 'points': b'\x01\x02'}}
+            await sender.emit('drawn_element_added', data, room='room')
+            await asyncio.wait_for(delivered.wait(), timeout=5)
+
+            self.assertEqual(received, [('drawn_element_added', data, 'room')])
+            self.assertEqual(stat.S_IMODE(os.stat(self.path).st_mode), 0o600)
+        finally:
+            listener.cancel()
+            for manager in (sender, receiver):
+                if manager.writer is not None:
+                    manager.writer.close()
+                    await manager.writer.wait_closed()
+
+            # the broker's handlers see the disconnects before it goes away
+            await asyncio.sleep(0.05)
+            broker.cancel()
+            await asyncio.gather(listener, broker, return_exceptions=True)
+
+    async def test_shared_directory_is_refused(self):
+        shared = os.path.dirname(self.path)
+        os.chmod(shared, 0o755)
+
+        broker = await self.start_broker(self.path)
+        with self.assertRaises(PermissionError):
+            await broker
+
+        # nor do the workers connect to a socket someone else could have put there
+        with self.assertRaises(PermissionError):
+            await AsyncUnixSocketManager(f'unix://{self.path}')._publish({'method': 'emit'})
@@ -0,0 +1,52 @@
+# imports
+import asyncio
+
+from live_whiteboard_demo_server import asgi
+from live_whiteboard_demo_server.tests import ServerTestCase
+
+UPDATES = 200
+FLUSHES = 20
+
+
+def rectangle(x: int) -> dict:
+    return {
+        'name': 'rectangle',
+        'id': 'rectangle',
+        'start': {'x': x, 'y': 10},
+        'end': {'x': x + 100, 'y': 60},
+        'lineType': 'simple',
+        'lineWidth': 2,
+        'color': '#000000',
+        'fill': False
+    }
+
+
+class CoalescingTestCase(ServerTestCase):
+    async def test_flooded_updates_converge_to_the_last_one(self):
+        author = await self.join('room')
+        await self.join('room', binary=True)
+        await self.namespace.on_add_drawn_element(author, {'room_id': 'room', 'element': rectangle(0)})
+
+        # the rectangle is dragged while the ticks flush the updates
+        async def drag():
+            for x in range(1, UPDATES + 1):
+                await self.namespace.on_update_drawn_element(author, {'room_id': 'room', 'element': rectangle(x)})
+                await asyncio.sleep(0)
+
+        async def tick():
+            for _ in range(FLUSHES):
+                await asgi.updates.flush()
+                await asyncio.sleep(0)
+
+        await asyncio.gather(drag(), tick())
+        await asgi.updates.flush()
+
+        expected = rectangle(UPDATES)
+        self.assertEqual(asgi.rooms.get('room', 'rectangle'), expected)
+        self.assertEqual(self.emits.peers[asgi.json_room('room')].elements, {'rectangle': expected})
+        self.assertEqual(self.emits.peers[asgi.binary_room('room')].elements, {'rectangle': expected})
+
+        # at most one update per element per tick reached the peers
+        sent = [event for event, _, room in self.emits.sent if room == asgi.json_room('room')]
+        self.assertLessEqual(sent.count('drawn_element_updated'), FLUSHES + 1)
+        self.assertEqual(asgi.updates.pending, {})
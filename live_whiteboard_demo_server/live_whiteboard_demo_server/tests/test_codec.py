@@ -0,0 +1,65 @@
+# imports
+import time
+
+from django.test import SimpleTestCase
+
+from live_whiteboard_demo_server import asgi
+from live_whiteboard_demo_server.codec import MAX_VARINT_BYTES, decode_points, encode_points
+from live_whiteboard_demo_server.tests import ServerTestCase
+
+
+class CodecTestCase(SimpleTestCase):
+    def test_round_trip(self):
+        for points in (
+                [],
+                [{'x': 0.0, 'y': 0.0}],
+                [{'x': 10.5, 'y': -3.0}, {'x': -1e6, 'y': 1e6}, {'x': 0.5, 'y': 0.0}],
+                [{'x': i / 2, 'y': (i % 7) * 13.5} for i in range(2000)]
+        ):
+            self.assertEqual(decode_points(encode_points(points)), points)
+
+    def test_quantized_to_half_pixels(self):
+        self.assertEqual(decode_points(encode_points([{'x': 1.3, 'y': 2.8}])), [{'x': 1.5, 'y': 3.0}])
+
+    def test_malformed_buffers_are_rejected(self):
+        valid = encode_points([{'x': 1, 'y': 2}, {'x': 300, 'y': -400}])
+
+        for data in (
+                b'',
+                valid[:-1],  # truncated varint
+                valid[:-2],  # truncated point
+                valid + b'\x00',  # trailing data
+                b'\x05\x00\x00',  # fewer points than announced
+                b'\x01' + b'\xff' * MAX_VARINT_BYTES + b'\x00\x00',  # overlong varint
+        ):
+            with self.assertRaises(ValueError, msg=data):
+                decode_points(data)
+
+    def test_long_runs_of_continuation_bytes_are_rejected_fast(self):
+        start = time.perf_counter()
+        with self.assertRaises(ValueError):
+            decode_points(b'\xff' * 1_000_000 + b'\x00')
+
+        self.assertLess(time.perf_counter() - start, 1)
+
+
+class MalformedElementTestCase(ServerTestCase):
+    async def test_malformed_points_are_dropped(self):
+        author = await self.join('room')
+        element = {'name': 'stroke', 'id': 'stroke', 'points': b'\x05\x00', 'lineType': 'simple', 'lineWidth': 2,
+                   'color': '#000000'}
+
+        for handler in (self.namespace.on_add_drawn_element, self.namespace.on_update_drawn_element,
+                        self.namespace.on_recognize_stroke):
+            result = await handler(author, {'room_id': 'room', 'element': element})
+            self.assertIn('error', result)
+
+        self.assertIsNone(asgi.rooms.get('room', 'stroke'))
+
+        await self.namespace.on_add_drawn_element(author, {
+            'room_id': 'room', 'element': {**element, 'points': encode_points([{'x': 1, 'y': 2}])}
+        })
+        result = await self.namespace.on_patch_drawn_element(author, {
+            'room_id': 'room', 'element_id': 'stroke', 'ops': [['append', b'\xff']]
+        })
+        self.assertIn('error', result)
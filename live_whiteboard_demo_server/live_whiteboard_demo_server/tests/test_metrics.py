@@ -0,0 +1,56 @@
+# imports
+from unittest import mock
+
+from django.test import SimpleTestCase
+from django.urls import reverse
+
+from live_whiteboard_demo_server.metrics import Counter, dropped_events, handler_seconds, registry
+from live_whiteboard_demo_server.tests import ServerTestCase, asgi
+
+
+class MetricsTestCase(SimpleTestCase):
+    def test_label_values_are_escaped(self):
+        counter = Counter('c', 'A counter.', ('event',))
+        counter.inc('say "hi"\\\nbye')
+
+        self.assertIn('c{event="say \\"hi\\"\\\\\\nbye"} 1', counter.render())
+
+    def test_metrics_view(self):
+        response = self.client.get(reverse('metrics'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'# TYPE whiteboard_handler_seconds histogram', response.content)
+
+
+class EventLabelsTestCase(ServerTestCase):
+    async def test_only_handled_events_get_their_own_label(self):
+        sid = asgi.sio.manager.connect('eio-metrics', '/')
+        joins = sum(handler_seconds.series_for('join_room').counts)
+        await self.namespace.trigger_event('join_room', sid, 'room')
+        await self.namespace.trigger_event('made_up_event', sid, {})
+
+        self.assertEqual(sum(handler_seconds.series_for('join_room').counts), joins + 1)
+        self.assertNotIn(('made_up_event',), handler_seconds.series)
+
+        others = dropped_events.values.get(('other',), 0)
+        with mock.patch.object(asgi.limiter, 'allow', return_value=False):
+            await self.namespace.trigger_event('made_up_event', sid, {})
+            await self.namespace.trigger_event('another_made_up_event', sid, {})
+
+        self.assertEqual(dropped_events.values[('other',)], others + 2)
+        self.assertNotIn(('made_up_event',), dropped_events.values)
+
+
+class RoomSeriesTestCase(ServerTestCase):
+    async def test_evicted_rooms_have_no_series(self):
+        log = mock.Mock()
+        log.flush.side_effect = lambda written: written.set_result(None)
+
+        with mock.patch.object(asgi, 'log', log):
+            sid = await self.join('gone')
+            self.assertIn('whiteboard_room_elements{room="gone"} 0', registry.render())
+
+            await asgi.sio.manager.disconnect(sid, '/')
+            await asgi.evict_room('gone')
+
+        self.assertNotIn('room="gone"', registry.render())
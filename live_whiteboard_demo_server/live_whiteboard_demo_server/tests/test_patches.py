@@ -0,0 +1,91 @@
+# imports
+import asyncio
+
+from live_whiteboard_demo_server import asgi
+from live_whiteboard_demo_server.patches import MAX_APPENDED_POINTS
+from live_whiteboard_demo_server.tests import ServerTestCase
+
+
+def line(element_id: str = 'line') -> dict:
+    return {
+        'name': 'line',
+        'id': element_id,
+        'start': {'x': 10, 'y': 20},
+        'end': {'x': 110, 'y': 220},
+        'lineType': 'simple',
+        'lineWidth': 2,
+        'color': '#000000',
+        'arrows': False
+    }
+
+
+def stroke(element_id: str = 'stroke') -> dict:
+    return {
+        'name': 'stroke',
+        'id': element_id,
+        'points': [{'x': 0, 'y': 0}, {'x': 10, 'y': 10}],
+        'lineWidth': 2,
+        'color': '#000000'
+    }
+
+
+class PatchTestCase(ServerTestCase):
+    async def test_patch_does_not_change_a_broadcast_in_flight(self):
+        author = await self.join('room')
+        await self.join('room', binary=True)
+
+        # the add is still being sent to the room when the patch comes in
+        await asyncio.gather(
+            self.namespace.on_add_drawn_element(author, {'room_id': 'room', 'element': line()}),
+            self.namespace.on_patch_drawn_element(author, {
+                'room_id': 'room',
+                'element_id': 'line',
+                'ops': [['translate', 5, -10]]
+            })
+        )
+
+        expected = {**line(), 'start': {'x': 15, 'y': 10}, 'end': {'x': 115, 'y': 210}}
+
+        self.assertEqual(asgi.rooms.get('room', 'line'), expected)
+        self.assertEqual(self.emits.peers[asgi.json_room('room')].elements, {'line': expected})
+        self.assertEqual(self.emits.peers[asgi.binary_room('room')].elements, {'line': expected})
+
+    async def test_invalid_patch_is_dropped(self):
+        author = await self.join('room')
+        await self.namespace.on_add_drawn_element(author, {'room_id': 'room', 'element': line()})
+        sent = len(self.emits.sent)
+
+        for data in (
+                {'room_id': 'room', 'element_id': 'line', 'ops': [['explode']]},
+                {'room_id': 'room', 'element_id': 'line', 'ops': [['append', [{'x': 1, 'y': 2}]]]},
+                {'room_id': 'room', 'element_id': 'line'},
+                {'room_id': 'room'}
+        ):
+            result = await self.namespace.on_patch_drawn_element(author, data)
+            self.assertIn('error', result)
+
+        self.assertEqual(asgi.rooms.get('room', 'line'), line())
+        self.assertEqual(len(self.emits.sent), sent)
+
+    async def test_invalid_append_is_dropped(self):
+        author = await self.join('room')
+        asgi.simplifying_sids.add(author)
+        await self.namespace.on_add_drawn_element(author, {'room_id': 'room', 'element': stroke()})
+        sent = len(self.emits.sent)
+
+        for points in (
+                [1, 'a', None],
+                [{'x': 1}],
+                [{'x': 1, 'y': '2'}],
+                [{'x': True, 'y': 2}],
+                [{'x': 1, 'y': 2}] * (MAX_APPENDED_POINTS + 1)
+        ):
+            result = await self.namespace.on_patch_drawn_element(author, {
+                'room_id': 'room',
+                'element_id': 'stroke',
+                'ops': [['append', points]]
+            })
+            self.assertIn('error', result)
+
+        self.assertEqual(asgi.rooms.get('room', 'stroke'), stroke())
+        self.assertEqual(len(self.emits.sent), sent)
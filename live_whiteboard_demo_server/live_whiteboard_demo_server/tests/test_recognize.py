@@ -0,0 +1,36 @@
+# imports
+import math
+
+from django.test import SimpleTestCase
+
+from live_whiteboard_demo_server.recognize import DEFAULT_STYLE, recognize_stroke
+
+TOLERANCE = 0.05
+MIN_SCORE = 0.85
+
+
+def stroke(points: list) -> dict:
+    return {'name': 'stroke', 'id': 'stroke', 'points': [{'x': x, 'y': y} for x, y in points]}
+
+
+class RecognizeTestCase(SimpleTestCase):
+    def test_circle_is_an_ellipse(self):
+        points = [(200 + 50 * math.cos(a / 20), 100 + 50 * math.sin(a / 20)) for a in range(126)]
+        shape = recognize_stroke(stroke(points), TOLERANCE, MIN_SCORE)
+
+        self.assertEqual(shape['name'], 'ellipse')
+        self.assertAlmostEqual(shape['radiusX'], 50, delta=2)
+        self.assertAlmostEqual(shape['radiusY'], 50, delta=2)
+
+    def test_out_and_back_stroke_is_no_ellipse(self):
+        # its ends are close, but the ellipse through its two sides would be much longer than it
+        points = [(x, 0) for x in range(0, 101, 2)] + [(x, 3) for x in range(100, -1, -2)]
+        shape = recognize_stroke(stroke(points), TOLERANCE, MIN_SCORE)
+
+        self.assertTrue(shape is None or shape['name'] != 'ellipse', shape)
+
+    def test_missing_style_gets_the_defaults(self):
+        shape = recognize_stroke(stroke([(x, 2 * x) for x in range(50)]), TOLERANCE, MIN_SCORE)
+
+        self.assertEqual(shape['name'], 'line')
+        self.assertEqual({field: shape[field] for field in DEFAULT_STYLE}, DEFAULT_STYLE)
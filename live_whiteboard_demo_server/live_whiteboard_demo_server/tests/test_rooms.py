@@ -0,0 +1,150 @@
+# imports
+import asyncio
+import threading
+from unittest import mock
+
+from django.test import override_settings
+
+from live_whiteboard_demo_server import asgi
+from live_whiteboard_demo_server.tests import ServerTestCase
+
+
+def line(element_id: str) -> dict:
+    return {
+        'name': 'line',
+        'id': element_id,
+        'start': {'x': 0, 'y': 0},
+        'end': {'x': 10, 'y': 10},
+        'lineType': 'simple',
+        'lineWidth': 2,
+        'color': '#000000',
+        'arrows': False
+    }
+
+
+class RoomLoadingTestCase(ServerTestCase):
+    """The rooms are persisted: the room log is a fake, and the database holds ``self.stored`` for every room."""
+
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.stored = [line('stored')]
+        # reading the database waits for this
+        self.loaded = threading.Event()
+        self.addCleanup(self.loaded.set)
+
+        def load_room(room_id: str) -> tuple:
+            self.loaded.wait()
+            return list(self.stored), 10
+
+        for patch in (mock.patch.object(asgi, 'log', mock.Mock()), mock.patch.object(asgi, 'load_room', load_room)):
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def sid(self) -> str:
+        return asgi.sio.manager.connect(f'eio-{next(self.eio_sids)}', '/')
+
+    async def leave(self, sid: str) -> None:
+        """Disconnects the client like the server does, and waits for the background tasks it starts."""
+        tasks = []
+        with mock.patch.object(asgi.sio, 'start_background_task', lambda *args: tasks.append(asyncio.ensure_future(
+            args[0](*args[1:])
+        ))):
+            self.namespace.on_disconnect(sid)
+            await asgi.sio.manager.disconnect(sid, '/')
+
+        await asyncio.gather(*tasks)
+
+    async def test_changes_load_the_room_first(self):
+        self.loaded.set()
+
+        await self.namespace.on_add_drawn_element(self.sid(), {'room_id': 'room', 'element': line('added')})
+        await self.namespace.on_delete_drawn_elements(self.sid(), {'room_id': 'other', 'element_ids': ['none']})
+
+        self.assertEqual(asgi.rooms.snapshot('room'), [line('stored'), line('added')])
+        self.assertEqual(asgi.rooms.snapshot('other'), [line('stored')])
+
+    async def test_remote_changes_during_a_load_are_applied_after_it(self):
+        join = asyncio.ensure_future(self.namespace.on_join_room(self.sid(), 'room'))
+        while 'room' not in asgi.loading_rooms:
+            await asyncio.sleep(0)
+
+        asgi.apply_remote_emit('drawn_element_added', {'element': line('remote')}, asgi.json_room('room'))
+        asgi.apply_remote_emit('drawn_element_added', {'element': line('remote')}, asgi.binary_room('room'))
+        asgi.apply_remote_emit('drawn_elements_deleted', {'element_ids': ['stored']}, 'room')
+
+        self.loaded.set()
+        await join
+
+        self.assertEqual(asgi.rooms.snapshot('room'), [line('remote')])
+        self.assertEqual(asgi.remote_changes, {})
+
+    async def test_remote_patches_the_database_had_are_not_applied_again(self):
+        join = asyncio.ensure_future(self.namespace.on_join_room(self.sid(), 'room'))
+        while 'room' not in asgi.loading_rooms:
+            await asyncio.sleep(0)
+
+        # the room is read up to op 10: the first patch is in the database already, the second isn't
+        for op_id in (10, 11):
+            asgi.apply_remote_emit('drawn_element_patched', {
+                'element_id': 'stored',
+                'ops': [['translate', 5, 0]],
+                'op_id': op_id
+            }, asgi.json_room('room'))
+
+        self.stored = [{**line('stored'), 'start': {'x': 5, 'y': 0}, 'end': {'x': 15, 'y': 10}}]
+        self.loaded.set()
+        await join
+
+        self.assertEqual(asgi.rooms.get('room', 'stored'), {**line('stored'), 'start': {'x': 10, 'y': 0},
+                                                            'end': {'x': 20, 'y': 10}})
+
+    @override_settings(WHITEBOARD_MESSAGE_QUEUE='redis://')
+    async def test_changes_are_broadcast_once_written(self):
+        self.loaded.set()
+        sid = await self.join('room')
+
+        futures = []
+        asgi.log.update.side_effect = lambda room_id, element, written: futures.append(written)
+
+        patch = asyncio.ensure_future(self.namespace.on_patch_drawn_element(sid, {
+            'room_id': 'room',
+            'element_id': 'stored',
+            'ops': [['translate', 5, 0]]
+        }))
+        while not futures:
+            await asyncio.sleep(0)
+
+        sent = len(self.emits.sent)
+        await asyncio.sleep(0.01)
+        self.assertEqual(len(self.emits.sent), sent)
+
+        futures[0].set_result(42)
+        await patch
+
+        event, data, _ = self.emits.sent[-1]
+        self.assertEqual((event, data['op_id']), ('drawn_element_patched', 42))
+
+    async def test_remote_changes_to_unloaded_rooms_are_left_to_the_database(self):
+        asgi.apply_remote_emit('drawn_element_added', {'element': line('remote')}, asgi.json_room('room'))
+        asgi.apply_remote_emit('drawn_elements_deleted', {'element_ids': ['stored']}, 'room')
+
+        self.assertNotIn('room', asgi.rooms)
+
+    async def test_rooms_are_dropped_once_their_last_member_left(self):
+        self.loaded.set()
+        asgi.log.flush.side_effect = lambda written: written.set_result(None)
+
+        first, second = await self.join('room'), await self.join('room')
+        moved = {**line('stored'), 'start': {'x': 5, 'y': 0}}
+        await self.namespace.on_update_drawn_element(first, {'room_id': 'room', 'element': moved})
+
+        await self.leave(first)
+        self.assertIn('room', asgi.rooms)
+
+        # the pending update is logged before the room is dropped
+        await self.leave(second)
+        self.assertNotIn('room', asgi.rooms)
+        asgi.log.update.assert_called_once_with('room', moved)
+        self.assertLess(asgi.log.method_calls.index(mock.call.update('room', moved)),
+                        asgi.log.method_calls.index(mock.call.flush(mock.ANY)))
@@ -0,0 +1,77 @@
+# imports
+import math
+
+from django.conf import settings
+from django.test import override_settings
+
+from live_whiteboard_demo_server import asgi
+from live_whiteboard_demo_server.simplify import simplify_stroke
+from live_whiteboard_demo_server.tests import ServerTestCase
+
+
+def stroke(n_points: int) -> dict:
+    return {
+        'name': 'stroke',
+        'id': 'stroke',
+        'points': [{'x': i, 'y': (i % 7) * 3} for i in range(n_points)],
+        'lineType': 'simple',
+        'lineWidth': 2,
+        'color': '#000000'
+    }
+
+
+class SimplifyTestCase(ServerTestCase):
+    async def test_strokes_are_simplified_for_everybody(self):
+        author = await self.join('room')
+        await self.join('room', binary=True)
+
+        await self.namespace.on_add_drawn_element(author, {'room_id': 'room', 'element': stroke(100)})
+
+        points = simplify_stroke(stroke(100)['points'], settings.WHITEBOARD_STROKE_ITERATIONS,
+                                 settings.WHITEBOARD_STROKE_EPSILON)
+        expected = {**stroke(100), 'points': points}
+
+        self.assertEqual(asgi.rooms.get('room', 'stroke'), expected)
+        self.assertEqual(self.emits.peers[asgi.json_room('room')].elements, {'stroke': expected})
+        self.assertEqual(self.emits.peers[asgi.binary_room('room')].elements, {'stroke': expected})
+        self.assertEqual(self.emits.peers[author].elements, {'stroke': expected})
+
+    async def test_strokes_are_never_made_longer(self):
+        author = await self.join('room')
+
+        # smoothing a small circle gives more points than RDP drops
+        circle = {**stroke(0), 'points': [
+            {'x': 50 * math.cos(i * math.pi / 5), 'y': 50 * math.sin(i * math.pi / 5)} for i in range(11)
+        ]}
+        await self.namespace.on_add_drawn_element(author, {'room_id': 'room', 'element': circle})
+
+        self.assertEqual(asgi.rooms.get('room', 'stroke'), circle)
+        # nor is the author sent an update
+        self.assertEqual([event for event, _, _ in self.emits.sent if event != 'connected_to_room'],
+                         ['drawn_element_added'])
+
+    @override_settings(WHITEBOARD_STROKE_MAX_POINTS=50)
+    async def test_too_long_strokes_are_dropped(self):
+        author = await self.join('room')
+        sent = len(self.emits.sent)
+
+        result = await self.namespace.on_add_drawn_element(author, {'room_id': 'room', 'element': stroke(51)})
+        self.assertIn('error', result)
+
+        await self.namespace.on_add_drawn_element(author, {'room_id': 'room', 'element': stroke(50)})
+        element = asgi.rooms.get('room', 'stroke')
+        self.assertIsNotNone(element)
+
+        result = await self.namespace.on_patch_drawn_element(author, {
+            'room_id': 'room',
+            'element_id': 'stroke',
+            'ops': [['append', stroke(51)['points']]]
+        })
+        self.assertIn('error', result)
+        self.assertIs(asgi.rooms.get('room', 'stroke'), element)
+
+        result = await self.namespace.on_update_drawn_element(author, {'room_id': 'room', 'element': stroke(51)})
+        self.assertIn('error', result)
+        self.assertIs(asgi.rooms.get('room', 'stroke'), element)
+
+        self.assertEqual(len(self.emits.sent), sent + 2)
@@ -17,6 +17,9 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path
 
+from live_whiteboard_demo_server import views
+
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('metrics/', views.metrics, name='metrics'),
 ]
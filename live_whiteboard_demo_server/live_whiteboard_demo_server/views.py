@@ -0,0 +1,9 @@
+# imports
+from django.http import HttpResponse
+
+from live_whiteboard_demo_server.metrics import registry
+
+
+def metrics(request):
+    """Metrics of this worker's Socket.IO server, in the Prometheus text format."""
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -17,7 +17,7 @@ sio = socketio.Server(cors_allowed_origins="*")
 
 # events
 class MainNamespace(socketio.Namespace):
-    def on_connect(self, sid, environ):
+    def on_connect(self, sid, environ, auth=None):
         pass
 
     @staticmethod